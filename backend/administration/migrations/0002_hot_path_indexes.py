@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administration', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='campus',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['name', 'id'], name='campus_active_name'),
+        ),
+        migrations.AddIndex(
+            model_name='class',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['name', 'id'], name='class_active_name'),
+        ),
+        migrations.AddIndex(
+            model_name='program',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['name', 'id'], name='program_active_name'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:13
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_active_enrollments(apps, schema_editor):
+    Class = apps.get_model('administration', 'Class')
+    StudentEnrollment = apps.get_model('students', 'StudentEnrollment')
+    counts = (
+        StudentEnrollment.objects.filter(is_active=True)
+        .values_list('enrolled_class_id').annotate(n=Count('id')).order_by()
+    )
+    for class_id, n in counts:
+        Class.objects.filter(pk=class_id).update(active_count=n)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administration', '0002_hot_path_indexes'),
+        ('students', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='class',
+            name='active_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Active Students'),
+        ),
+        migrations.RunPython(count_active_enrollments, migrations.RunPython.noop),
+    ]
@@ -13,6 +13,9 @@ class Campus(TimeStampedModel):
         verbose_name = _("Campus")
         verbose_name_plural = _("Campuses")
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['name', 'id'], condition=models.Q(is_active=True), name='campus_active_name'),
+        ]
 
     def __str__(self):
         return self.name
@@ -31,6 +34,9 @@ class Program(TimeStampedModel):
         verbose_name = _("Program")
         verbose_name_plural = _("Programs")
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['name', 'id'], condition=models.Q(is_active=True), name='program_active_name'),
+        ]
 
     def __str__(self):
         return self.name
@@ -47,12 +53,17 @@ class Class(TimeStampedModel):
     program = models.ForeignKey(Program, on_delete=models.RESTRICT, related_name='classes')
     shift = models.CharField(max_length=20, choices=SHIFT_CHOICES, verbose_name=_("Shift"))
     capacity = models.PositiveIntegerField(default=30, verbose_name=_("Class Capacity"))
+    # Active enrollments, kept current by students.occupancy
+    active_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("Active Students"))
     is_active = models.BooleanField(default=True, verbose_name=_("Active Status"))
 
     class Meta:
         verbose_name = _("Class")
         verbose_name_plural = _("Classes")
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['name', 'id'], condition=models.Q(is_active=True), name='class_active_name'),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['name', 'campus', 'program', 'shift'], 
@@ -64,6 +75,11 @@ class Class(TimeStampedModel):
         return f"{self.name} - {self.program.name} ({self.shift})"
 
     def clean(self):
-        # Validation: Check if campus has capacity (Optional strictly, but good for business logic)
-        # Note: Simple check here, more complex logic might go in service layer
-        pass
+        # Enrollment-time capacity checks live in students.occupancy; here we
+        # only stop a hard-enforced class from being shrunk below its roster
+        from django.conf import settings
+        if (
+            getattr(settings, 'CLASS_CAPACITY_ENFORCEMENT', 'off') == 'hard'
+            and self.pk and self.capacity < self.active_count
+        ):
+            raise ValidationError({'capacity': _("Capacity cannot be below the %(count)s active students.") % {'count': self.active_count}})
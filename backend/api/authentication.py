@@ -0,0 +1,115 @@
+"""
+JWT authentication without a user query per request.
+
+MyTokenObtainPairSerializer puts `username`, `isAdmin` and `isStaff` in every
+token, so a verified token already says everything IsStaffUser and
+UserMeView need. ClaimsJWTAuthentication builds a ClaimsUser from those
+claims and only loads the User row for tokens that lack them (issued before
+the claims existed) or that predate a change to the user's account.
+
+Those changes are remembered in the cache, so the claims are only trusted
+when every worker sees the same cache (settings.JWT_TRUST_CLAIMS, 'auto' by
+default: not with the per-process locmem or dummy backends); otherwise every
+request loads the user. Saves and deletes are picked up through signals;
+QuerySet.update() sends none, so call `revoke_tokens()` after one. Token
+refreshes re-read the claims from the user (MyTokenRefreshSerializer), so
+a new access token never carries claims the account no longer has.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from core.generations import get_cache, is_shared
+
+CLAIMS = ('username', 'isAdmin', 'isStaff')
+# Changes that must not wait for the access token to expire
+SECURITY_FIELDS = {'username', 'password', 'is_active', 'is_staff', 'is_superuser'}
+
+
+def _changed_key(user_id):
+    return f'auth:changed:{user_id}'
+
+
+def claims_trusted():
+    mode = str(getattr(settings, 'JWT_TRUST_CLAIMS', 'auto')).lower()
+    if mode in ('1', 'true', 'yes'):
+        return True
+    if mode in ('0', 'false', 'no'):
+        return False
+    # A change recorded by one worker must be seen by all of them
+    return is_shared()
+
+
+class ClaimsUser(TokenUser):
+    """
+    A user backed by the token's claims: is_superuser and is_staff come from
+    `isAdmin` and `isStaff`, and str() is the username, like User.
+    """
+    def __str__(self):
+        return self.username
+
+    @property
+    def id(self):
+        user_id = self.token[api_settings.USER_ID_CLAIM]
+        return int(user_id) if str(user_id).isdigit() else user_id
+
+    @property
+    def pk(self):
+        return self.id
+
+    @property
+    def is_staff(self):
+        return bool(self.token.get('isStaff'))
+
+    @property
+    def is_superuser(self):
+        return bool(self.token.get('isAdmin'))
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if (
+            claims_trusted()
+            and all(claim in validated_token for claim in CLAIMS)
+            and api_settings.USER_ID_CLAIM in validated_token
+        ):
+            changed = get_cache().get(_changed_key(validated_token[api_settings.USER_ID_CLAIM]))
+            if changed is None or validated_token.get('iat', 0) > changed:
+                return ClaimsUser(validated_token)
+        # Old token format, a per-process cache, or the account changed
+        # since the token was issued: the database has the final word
+        return super().get_user(validated_token)
+
+
+def revoke_tokens(user_ids):
+    """
+    Send the access tokens issued to these users so far through the
+    database. Call it after changing users with QuerySet.update().
+    """
+    # Remembered as long as a token issued before the change can live
+    timeout = int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()) + 1
+    now = int(time.time())
+    get_cache().set_many({_changed_key(str(user_id)): now for user_id in user_ids}, timeout)
+
+
+def _user_saved(sender, instance, created=False, update_fields=None, **kwargs):
+    if created:
+        return  # no tokens yet
+    if update_fields is not None and not SECURITY_FIELDS & set(update_fields):
+        return  # e.g. update_last_login on every sign-in
+    revoke_tokens([instance.pk])
+
+
+def _user_deleted(sender, instance, **kwargs):
+    revoke_tokens([instance.pk])
+
+
+def connect_signals():
+    User = get_user_model()
+    post_save.connect(_user_saved, sender=User, dispatch_uid='api.authentication.user_saved')
+    post_delete.connect(_user_deleted, sender=User, dispatch_uid='api.authentication.user_deleted')
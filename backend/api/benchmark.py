@@ -0,0 +1,220 @@
+"""
+Load benchmark for the hot API endpoints.
+
+Each scenario is requested repeatedly, in-process through Django's test
+client (the default) or over HTTP against a running server, authenticated
+with a JWT for an admin user. The report has p50/p95/p99 latency, throughput
+and queries per request for every scenario, as JSON that `compare()` checks
+against a stored baseline. In-process writes (enroll, change-class) are
+rolled back when the scenario ends.
+
+Query counts come from the Server-Timing header (config.middleware), so
+they are reported in both modes as long as telemetry is on.
+"""
+import json
+import re
+import statistics
+import urllib.error
+import urllib.request
+from time import perf_counter
+
+from django.conf import settings
+from django.db import transaction
+from django.test import Client, override_settings
+
+from administration.models import Class
+from students.models import Student, StudentEnrollment
+
+from api.serializers_auth import MyTokenObtainPairSerializer
+
+SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+class Scenario:
+    def __init__(self, name, method, write=False):
+        self.name = name
+        self.method = method
+        self.write = write
+
+    def requests(self, fixtures):
+        """Yield (path, payload) forever."""
+        raise NotImplementedError
+
+
+class Get(Scenario):
+    def __init__(self, name, path):
+        super().__init__(name, 'GET')
+        self.path = path
+
+    def requests(self, fixtures):
+        student_ids = fixtures['student_ids']
+        n = 0
+        while True:
+            yield self.path.format(student=student_ids[n % len(student_ids)]), None
+            n += 1
+
+
+class Enroll(Scenario):
+    """Enroll a different not-yet-enrolled student each time."""
+    def __init__(self):
+        super().__init__('enroll', 'POST', write=True)
+
+    def requests(self, fixtures):
+        class_id = fixtures['class_ids'][0]
+        for student_id in fixtures['not_in_class']:
+            yield f'/api/students/{student_id}/enroll/', {'class_id': class_id}
+
+
+class ChangeClass(Scenario):
+    """Move a different actively enrolled student each time."""
+    def __init__(self):
+        super().__init__('change_class', 'POST', write=True)
+
+    def requests(self, fixtures):
+        for student_id, old_class_id in fixtures['active']:
+            new_class_id = next(pk for pk in fixtures['class_ids'] if pk != old_class_id)
+            yield f'/api/students/{student_id}/change-class/', {
+                'old_class_id': old_class_id, 'new_class_id': new_class_id, 'reason': 'Benchmark',
+            }
+
+
+SCENARIOS = [
+    Get('student_list', '/api/students/'),
+    Get('student_list_expanded', '/api/students/?expand=active_enrollments'),
+    Get('student_detail', '/api/students/{student}/'),
+    Get('student_search', '/api/students/search/?q=muhammad'),
+    Get('dashboard', '/api/dashboard/stats/'),
+    Enroll(),
+    ChangeClass(),
+]
+
+
+def load_fixtures(limit):
+    class_ids = list(Class.objects.filter(is_active=True).order_by('id').values_list('id', flat=True)[:10])
+    if len(class_ids) < 2:
+        raise ValueError("The benchmark needs at least two classes (run seed_scale first).")
+    return {
+        'class_ids': class_ids,
+        'student_ids': list(Student.objects.order_by('?').values_list('id', flat=True)[:limit]),
+        'not_in_class': list(
+            Student.objects.exclude(enrollments__enrolled_class_id=class_ids[0], enrollments__is_active=True)
+            .order_by('id').values_list('id', flat=True)[:limit]
+        ),
+        'active': list(
+            StudentEnrollment.objects.filter(is_active=True).order_by('id')
+            .values_list('student_id', 'enrolled_class_id')[:limit]
+        ),
+    }
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+class InProcessTransport:
+    def __init__(self, token):
+        self.client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def request(self, method, path, payload):
+        if method == 'GET':
+            response = self.client.get(path)
+        else:
+            response = self.client.post(path, json.dumps(payload), content_type='application/json')
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response.status_code, response.headers.get('Server-Timing', '')
+
+
+class HTTPTransport:
+    def __init__(self, token, base_url):
+        self.token = token
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, payload):
+        data = json.dumps(payload).encode() if payload is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method, headers={
+            'Authorization': f'Bearer {self.token}', 'Content-Type': 'application/json',
+        })
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status, response.headers.get('Server-Timing', '')
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers.get('Server-Timing', '')
+
+
+def _run(scenario, transport, fixtures, iterations, warmup):
+    requests = scenario.requests(fixtures)
+    latencies, queries, errors = [], [], 0
+    started = perf_counter()
+    for n, (path, payload) in zip(range(warmup + iterations), requests):
+        start = perf_counter()
+        status, timing = transport.request(scenario.method, path, payload)
+        elapsed = perf_counter() - start
+        if n < warmup:
+            started = perf_counter()
+            continue
+        latencies.append(elapsed)
+        errors += status >= 400
+        match = SERVER_TIMING_QUERIES.search(timing)
+        if match:
+            queries.append(int(match.group(1)))
+    total = perf_counter() - started
+
+    if not latencies:
+        return {'requests': 0, 'note': 'not enough data for this scenario'}
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'throughput_rps': round(len(latencies) / total, 1) if total else None,
+        'queries': statistics.median(queries) if queries else None,
+        'max_queries': max(queries) if queries else None,
+    }
+
+
+def run_benchmark(user, iterations=200, warmup=10, base_url=None, names=None):
+    token = str(MyTokenObtainPairSerializer.get_token(user).access_token)
+    transport = HTTPTransport(token, base_url) if base_url else InProcessTransport(token)
+    fixtures = load_fixtures(warmup + iterations)
+
+    results = {}
+    # The test client's host, which only the test runner allows by default
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        for scenario in SCENARIOS:
+            if names and scenario.name not in names:
+                continue
+            if scenario.write and not base_url:
+                # Keep the data set unchanged between runs
+                with transaction.atomic():
+                    results[scenario.name] = _run(scenario, transport, fixtures, iterations, warmup)
+                    transaction.set_rollback(True)
+            else:
+                results[scenario.name] = _run(scenario, transport, fixtures, iterations, warmup)
+    return {
+        'mode': 'http' if base_url else 'in-process',
+        'iterations': iterations,
+        'students': Student.objects.count(),
+        'scenarios': results,
+    }
+
+
+def compare(report, baseline, tolerance=0.2):
+    """
+    Regressions against a baseline report: p95 latency more than `tolerance`
+    slower, or more queries per request. Returns a list of messages.
+    """
+    regressions = []
+    for name, current in report['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous or not current.get('requests') or not previous.get('requests'):
+            continue
+        if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current.get('queries') is not None and previous.get('queries') is not None and current['queries'] > previous['queries']:
+            regressions.append(f"{name}: queries {previous['queries']} -> {current['queries']}")
+    return regressions
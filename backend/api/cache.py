@@ -0,0 +1,98 @@
+"""
+Response cache for read-only viewset actions.
+
+Entries are keyed on path, query parameters, the caller's role and the
+current generations of the models the view depends on (core.generations),
+so any write to one of those models makes the old entries unreachable.
+Only the cache API shared by every Django backend is used, so locmem and
+file caches work as well as Redis/Memcached.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from rest_framework.response import Response
+
+from core.generations import get_cache, get_generations
+
+HITS_KEY = 'resp:hits'
+MISSES_KEY = 'resp:misses'
+
+
+def cache_timeout():
+    return getattr(settings, 'API_CACHE_TIMEOUT', 0)
+
+
+def user_role(user):
+    if user.is_superuser:
+        return 'admin'
+    if user.is_staff:
+        return 'staff'
+    return 'user' if user.is_authenticated else 'anon'
+
+
+def response_cache_key(request, models):
+    parts = {
+        'path': request.path,
+        'query': sorted(request.query_params.lists()),
+        'role': user_role(request.user),
+        'generations': get_generations(models),
+    }
+    digest = hashlib.sha1(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+    return f'resp:{digest}'
+
+
+def _count(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def response_cache_stats():
+    cache = get_cache()
+    counts = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits, misses = counts.get(HITS_KEY, 0), counts.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / total, 4) if total else None,
+    }
+
+
+class CachedResponseMixin:
+    """
+    Cache `list` and `retrieve` responses. Set `cache_models` to every model
+    whose data ends up in the response.
+    """
+    cache_models = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        timeout = cache_timeout()
+        if not timeout or not self.cache_models:
+            return handler(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = response_cache_key(request, self.cache_models)
+        cached = cache.get(key)
+        if cached is not None:
+            _count(HITS_KEY)
+            response = Response(cached['data'], status=cached['status'])
+            response['X-Cache'] = 'HIT'
+            return response
+
+        _count(MISSES_KEY)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, {'data': response.data, 'status': response.status_code}, timeout)
+        response['X-Cache'] = 'MISS'
+        return response
@@ -0,0 +1,192 @@
+"""
+Conditional requests (ETag / Last-Modified) for the API.
+
+Validators come from TimeStampedModel.updated_at and cost one small query
+(none when the response cache already holds them): `max(updated_at)` and
+the row count for a list, `updated_at` for a single object. Models that
+only contribute related data to a response (a student's classes, a class's
+campus) are covered by their generation counters (core.generations), which
+are only trustworthy when the cache is shared between processes; with a
+per-process cache such responses get no validators at all. A matching
+If-None-Match / If-Modified-Since returns 304 before anything is
+serialized.
+
+ETags of resources with dependencies read "<own>.<dependencies>". If-Match
+on a write only compares the own part, so a change elsewhere (someone
+enrolling in a class) is not mistaken for a lost update; a stale one
+returns 412.
+"""
+import hashlib
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags, quote_etag
+
+from core.generations import get_cache, get_generations, is_shared
+
+from api.cache import cache_timeout, response_cache_key
+
+
+def _digest(*parts):
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+
+def make_etag(*parts):
+    return quote_etag(_digest(*parts))
+
+
+def generation_etag(*parts, models):
+    """
+    An ETag that also changes with the generations of `models`, or None when
+    the generations are not shared between processes.
+    """
+    if not is_shared():
+        return None
+    return make_etag(*parts, get_generations(models))
+
+
+def set_validators(response, etag, last_modified=None):
+    """
+    Attach validators to a successful (or 304) response. `Cache-Control:
+    no-cache` makes clients revalidate every time instead of trusting a
+    stale copy.
+    """
+    if 200 <= response.status_code < 300 or response.status_code == 304:
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def conditional_response(request, etag, last_modified=None):
+    """
+    The 304 or 412 response the request's preconditions call for, or None.
+    """
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None and response.status_code == 304:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def _timestamp(value):
+    return int(value.timestamp()) if value is not None else None
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified support for `list` and `retrieve`, and If-Match
+    checks for `update`, `partial_update` and `destroy`. Models in
+    `cache_models` other than the viewset's own are treated as dependencies.
+    Last-Modified is only sent when there are none, since their changes do
+    not show in the resource's own timestamps.
+    """
+    cache_models = ()
+
+    def etag_dependencies(self):
+        own = self.get_queryset().model
+        return [model for model in self.cache_models if model is not own]
+
+    def _own_tag(self, version):
+        return _digest(self.get_queryset().model._meta.label_lower, version)
+
+    def _validators(self, version):
+        own = self._own_tag(version)
+        dependencies = self.etag_dependencies()
+        if not dependencies:
+            return quote_etag(own), _timestamp(version[0])
+        if not is_shared():
+            # Other processes' writes to the dependencies can't be seen
+            return None, None
+        return quote_etag(f'{own}.{_digest(get_generations(dependencies))}'), None
+
+    def list_validators(self):
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None).order_by()
+        summary = queryset.aggregate(last=Max('updated_at'), count=Count('pk'))
+        return self._validators([summary['last'], summary['count']])
+
+    def object_version(self):
+        """
+        [updated_at, lookup value] of the requested object, or None when it
+        does not exist.
+        """
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None).order_by()
+        try:
+            updated_at = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]}).values_list('updated_at', flat=True).first()
+        except (TypeError, ValueError, DjangoValidationError):
+            # Malformed id: the handler's get_object() answers 404
+            return None
+        if updated_at is None:
+            return None
+        return [updated_at, self.kwargs[lookup_url_kwarg]]
+
+    def object_validators(self):
+        version = self.object_version()
+        return (None, None) if version is None else self._validators(version)
+
+    def cached_validators(self, validators, request):
+        """
+        Validators only change when one of `cache_models` is written, so with
+        the response cache on they are kept under the same generations and a
+        revalidation costs no query at all.
+        """
+        if not cache_timeout() or not self.cache_models:
+            return validators()
+        cache = get_cache()
+        key = response_cache_key(request, self.cache_models) + ':validators'
+        cached = cache.get(key)
+        if cached is None:
+            cached = validators()
+            cache.set(key, cached, cache_timeout())
+        return cached
+
+    def conditional(self, validators, handler, request, *args, **kwargs):
+        etag, last_modified = self.cached_validators(validators, request)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+        response = conditional_response(request, etag, last_modified)
+        if response is not None:
+            return response
+        return set_validators(handler(request, *args, **kwargs), etag, last_modified)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(self.list_validators, super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(self.object_validators, super().retrieve, request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        return self.checked_write(super().update, request, *args, **kwargs)
+
+    def destroy(self, request, *args, **kwargs):
+        return self.checked_write(super().destroy, request, *args, **kwargs)
+
+    def if_match_failed(self, request):
+        """
+        Whether If-Match names none of the object's current versions. Only
+        the own part of each ETag is compared.
+        """
+        version = self.object_version()
+        if version is None:
+            return False  # the handler answers 404
+        tags = parse_etags(request.META['HTTP_IF_MATCH'])
+        if '*' in tags:
+            return False
+        own = self._own_tag(version)
+        return not any(tag.strip('"').split('.')[0] == own for tag in tags)
+
+    def checked_write(self, handler, request, *args, **kwargs):
+        # Lost-update protection: only when the client sends If-Match
+        if 'HTTP_IF_MATCH' in request.META and self.if_match_failed(request):
+            return HttpResponse(status=412)
+        response = handler(request, *args, **kwargs)
+        if request.method in ('PUT', 'PATCH'):
+            # The new validators, so the client can chain its next write
+            etag, last_modified = self.object_validators()
+            if etag is not None:
+                set_validators(response, etag, last_modified)
+        return response
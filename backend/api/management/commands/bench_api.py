@@ -0,0 +1,69 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from api.benchmark import SCENARIOS, compare, run_benchmark
+
+
+class Command(BaseCommand):
+    help = "Benchmark the hot API endpoints: latency percentiles, throughput and queries per request."
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenarios', nargs='*', help=f"Only run these ({', '.join(s.name for s in SCENARIOS)}).")
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--url', help="Benchmark a running server (e.g. http://localhost:8000) instead of in-process.")
+        parser.add_argument('--user', help="Username to authenticate as (default: the first superuser).")
+        parser.add_argument('--no-cache', action='store_true', help="Disable the API response cache (in-process only).")
+        parser.add_argument('--output', help="Write the JSON report to this file.")
+        parser.add_argument('--baseline', help="Compare against a previous JSON report.")
+        parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed p95 slowdown against the baseline (0.2 = 20%%).")
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        unknown = set(options['scenarios']) - {s.name for s in SCENARIOS}
+        if unknown:
+            raise CommandError(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+
+        User = get_user_model()
+        users = User.objects.filter(username=options['user']) if options['user'] else User.objects.filter(is_superuser=True)
+        user = users.order_by('id').first()
+        if user is None:
+            raise CommandError("No user to authenticate as; create a superuser or pass --user.")
+
+        cache_settings = {'API_CACHE_TIMEOUT': 0} if options['no_cache'] else {}
+        try:
+            with override_settings(**cache_settings):
+                report = run_benchmark(
+                    user, iterations=max(1, options['iterations']), warmup=max(0, options['warmup']),
+                    base_url=options['url'], names=options['scenarios'],
+                )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for name, result in report['scenarios'].items():
+            if not result['requests']:
+                self.stdout.write(self.style.WARNING(f"{name:24} {result['note']}"))
+                continue
+            self.stdout.write(
+                f"{name:24} p50 {result['p50_ms']:8.2f}ms  p95 {result['p95_ms']:8.2f}ms  p99 {result['p99_ms']:8.2f}ms  "
+                f"{result['throughput_rps']:8.1f} req/s  queries {result['queries']}"
+                + (self.style.ERROR(f"  {result['errors']} errors") if result['errors'] else '')
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Wrote {options['output']}")
+
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                regressions = compare(report, json.load(f), options['tolerance'])
+            for message in regressions:
+                self.stdout.write(self.style.ERROR(f"REGRESSION  {message}"))
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f"{len(regressions)} regression(s) against {options['baseline']}.")
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
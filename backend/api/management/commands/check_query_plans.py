@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.query_plans import check_query_plans
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the registered hot queries and fail if any of them scans more than it registered."
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help="Only check these queries.")
+        parser.add_argument('--show-plans', action='store_true', help="Print every plan, not just failures.")
+
+    def handle(self, *args, **options):
+        results = check_query_plans(options['names'])
+        failures = [result for result in results if not result.ok]
+
+        for result in results:
+            if result.ok:
+                self.stdout.write(f"OK    {result.name}")
+            else:
+                self.stdout.write(self.style.ERROR(f"FAIL  {result.name}: {', '.join(result.problems)}"))
+            if options['show_plans'] or not result.ok:
+                self.stdout.write('      ' + result.plan.replace('\n', '\n      '))
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot query(ies) scan more than they registered.")
+        self.stdout.write(self.style.SUCCESS(f"All {len(results)} hot queries use indexes."))
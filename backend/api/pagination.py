@@ -0,0 +1,182 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from functools import reduce
+from operator import and_, or_
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on the full ordering of the queryset.
+
+    The ordering is taken from the queryset's explicit order_by() or the
+    model's Meta.ordering, with 'id' appended as a tie-breaker, e.g.
+    Student -> (name, id) and StudentEnrollment -> (-start_date, id).
+    Each page is a single `WHERE (ordering) > (cursor) ... LIMIT n` query,
+    so fetch time does not depend on depth and no COUNT(*) is issued.
+
+    Clients that still expect a bare list can pass `?paginate=false`.
+    """
+    page_size = api_settings.PAGE_SIZE or 50
+    max_page_size = 200
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    opt_out_query_param = 'paginate'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(self.opt_out_query_param, '').lower() in ('false', '0', 'off'):
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor['r'])
+
+        if cursor:
+            queryset = queryset.filter(self.keyset_filter(cursor['p'], reverse))
+        ordering = [self._flip(field) for field in self.ordering] if reverse else self.ordering
+        results = list(queryset.order_by(*ordering)[:self.page_size + 1])
+
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_ordering(self, queryset):
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not all(isinstance(field, str) for field in ordering):
+            raise ImproperlyConfigured("KeysetPagination only supports field-name orderings.")
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            ordering.append('id')
+        return ordering
+
+    def keyset_filter(self, position, reverse=False):
+        """
+        Build `(f1, f2, ...) > (v1, v2, ...)` as nested OR/AND conditions,
+        honouring the direction of each ordering field.
+        """
+        if len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        clauses = []
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            equal = [Q(**{other.lstrip('-'): value}) for other, value in zip(self.ordering[:index], position)]
+            clauses.append(reduce(and_, equal + [Q(**{f'{name}__{lookup}': position[index]})]))
+
+        # Redundant bound on the leading field so the database can seek
+        # into the index instead of walking it from the start
+        first = self.ordering[0]
+        bound = 'lte' if first.startswith('-') != reverse else 'gte'
+        return Q(**{f'{first.lstrip("-")}__{bound}': position[0]}) & reduce(or_, clauses)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, item, reverse):
+        position = [self._position_value(item, field.lstrip('-')) for field in self.ordering]
+        payload = json.dumps({'p': position, 'r': int(reverse)}, default=str, separators=(',', ':'))
+        token = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+            if not isinstance(cursor['p'], list):
+                raise ValueError
+            return {'p': cursor['p'], 'r': bool(cursor.get('r'))}
+        except (binascii.Error, ValueError, KeyError, TypeError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _position_value(self, item, path):
+        if isinstance(item, dict):
+            return item[path]
+        value = item
+        for attr in path.split('__'):
+            value = getattr(value, attr)
+        return value
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+            {
+                'name': self.opt_out_query_param,
+                'required': False,
+                'in': 'query',
+                'description': "Pass 'false' to receive the full unpaginated list.",
+                'schema': {'type': 'string'},
+            },
+        ]
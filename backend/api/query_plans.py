@@ -0,0 +1,242 @@
+"""
+Registry of the API's hot queries and an EXPLAIN-based check that each of
+them is answered from an index rather than a full table scan.
+
+Register a query with @hot_query; the function returns the queryset exactly
+as the view or service builds it (values are placeholders, only the plan
+matters). `check_query_plans()` explains every registered query against the
+default database (SQLite or PostgreSQL) and reports what is wrong with it:
+a full table scan, a walk over an index the query did not register, or
+sorting the rows of such a walk (the walk is then not cut off by LIMIT).
+"""
+import itertools
+import json
+import re
+from dataclasses import dataclass, field
+from datetime import date
+
+from django.db import connection, transaction
+from django.db.models import Count
+
+from administration.models import Campus, Program, Class
+from students.models import Student, StudentEnrollment, AuditLog
+from students.search import search_students
+from students.rosters import roster_as_of
+
+from api.pagination import KeysetPagination
+
+HOT_QUERIES = {}
+
+
+def hot_query(name, allow_index_walks=()):
+    """
+    Register a hot query. `allow_index_walks` names the indexes whose walk
+    is bounded by design: an ordered walk cut off by LIMIT, or a walk over a
+    partial index that only holds the rows being asked for. A table scan
+    never is.
+    """
+    def register(func):
+        HOT_QUERIES[name] = (func, set(allow_index_walks))
+        return func
+    return register
+
+
+@dataclass
+class PlanResult:
+    name: str
+    plan: str
+    problems: list = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return not self.problems
+
+
+# --- Registered queries ------------------------------------------------------
+
+@hot_query('student_list_first_page', allow_index_walks={'student_name_id'})
+def _student_list_first_page():
+    return Student.objects.order_by('name', 'id')[:51]
+
+
+@hot_query('student_list_after_cursor')
+def _student_list_after_cursor():
+    paginator = KeysetPagination()
+    paginator.ordering = ['name', 'id']
+    return Student.objects.filter(paginator.keyset_filter(['M', 1])).order_by('name', 'id')[:51]
+
+
+@hot_query('students_by_status')
+def _students_by_status():
+    return Student.objects.filter(status='Active').order_by('name', 'id')[:51]
+
+
+@hot_query('student_active_enrollments_prefetch')
+def _student_active_enrollments_prefetch():
+    return StudentEnrollment.objects.filter(student_id__in=[1, 2, 3], is_active=True)
+
+
+@hot_query('student_history')
+def _student_history():
+    return StudentEnrollment.objects.filter(student_id=1).order_by('-start_date', 'id')[:51]
+
+
+@hot_query('enrollment_close_in_class')
+def _enrollment_close_in_class():
+    # change_class closes the enrollment through the unique_active_enrollment index
+    return StudentEnrollment.objects.filter(student_id=1, enrolled_class_id=1, is_active=True)
+
+
+@hot_query('class_current_students')
+def _class_current_students():
+    return (
+        StudentEnrollment.objects.filter(enrolled_class_id=1, is_active=True)
+        .select_related('student').order_by('student__name', 'id')[:51]
+    )
+
+
+@hot_query('class_roster_as_of')
+def _class_roster_as_of():
+    return roster_as_of(date(2024, 3, 15), 'class', 1)[:51]
+
+
+@hot_query('campus_roster_as_of')
+def _campus_roster_as_of():
+    return roster_as_of(date(2024, 3, 15), 'campus', 1)[:51]
+
+
+@hot_query('class_active_enrollments')
+def _class_active_enrollments():
+    return StudentEnrollment.objects.filter(enrolled_class_id=1, is_active=True)
+
+
+@hot_query('dashboard_campus_breakdown', allow_index_walks={'unique_active_enrollment'})
+def _dashboard_campus_breakdown():
+    return (
+        StudentEnrollment.objects.filter(is_active=True)
+        .values('enrolled_class__campus')
+        .annotate(n=Count('student', distinct=True))
+    )
+
+
+@hot_query('active_campuses', allow_index_walks={'campus_active_name'})
+def _active_campuses():
+    return Campus.objects.filter(is_active=True).order_by('name', 'id')[:51]
+
+
+@hot_query('active_programs', allow_index_walks={'program_active_name'})
+def _active_programs():
+    return Program.objects.filter(is_active=True).order_by('name', 'id')[:51]
+
+
+@hot_query('active_classes', allow_index_walks={'class_active_name'})
+def _active_classes():
+    return Class.objects.filter(is_active=True).select_related('campus', 'program').order_by('name', 'id')[:51]
+
+
+@hot_query('audit_log_for_student')
+def _audit_log_for_student():
+    return AuditLog.objects.filter(student_id=1).order_by('-timestamp', '-id')[:51]
+
+
+@hot_query('audit_log_for_actor')
+def _audit_log_for_actor():
+    return AuditLog.objects.filter(actor_id=1).order_by('-timestamp', '-id')[:51]
+
+
+@hot_query('search_by_name')
+def _search_by_name():
+    return search_students('ali')[:51]
+
+
+@hot_query('search_by_mobile')
+def _search_by_mobile():
+    return search_students('03001234567')[:51]
+
+
+# --- Plan inspection ---------------------------------------------------------
+
+# "SCAN t" reads every row; "SCAN t USING [COVERING] INDEX i" walks a whole
+# index, which is only acceptable where the query registered it as bounded
+SQLITE_SCAN = re.compile(r'^SCAN (\w+)(?: USING (?:COVERING )?INDEX (\w+))?$')
+SQLITE_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+_explain_ids = itertools.count()
+
+
+def _explain_sqlite(sql, params):
+    # The sqlite3 module caches statements by their text, and a cached
+    # EXPLAIN keeps the plan it was prepared with even after an index is
+    # created or dropped: a unique comment makes every call plan afresh
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN /* {next(_explain_ids)} */ {sql}', params)
+        details = [str(row[-1]) for row in cursor.fetchall()]
+    scans = [m.groups() for m in map(SQLITE_SCAN.match, details) if m]
+    return '\n'.join(details), scans, SQLITE_SORT in details
+
+
+def _explain_postgresql(sql, params):
+    # Tiny test tables make sequential scans the cheapest plan, so disable
+    # them: a Seq Scan that survives means there is no usable index
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    scans = []
+    sorts = []
+
+    def walk(node):
+        if node.get('Node Type') == 'Seq Scan':
+            scans.append((node['Relation Name'], None))
+        elif node.get('Node Type') in ('Index Scan', 'Index Only Scan') and 'Index Cond' not in node:
+            scans.append((node['Relation Name'], node['Index Name']))
+        elif node.get('Node Type') == 'Sort':
+            sorts.append(node)
+        for child in node.get('Plans', ()):
+            walk(child)
+
+    walk(plan[0]['Plan'])
+    return json.dumps(plan, indent=2), scans, bool(sorts)
+
+
+EXPLAINERS = {
+    'sqlite': _explain_sqlite,
+    'postgresql': _explain_postgresql,
+}
+
+
+def explain(queryset):
+    """
+    Return (plan text, [(table, index walked or None for a table scan)],
+    whether rows are sorted outside an index).
+    """
+    explainer = EXPLAINERS.get(connection.vendor)
+    if explainer is None:
+        raise NotImplementedError(f"No plan inspection for {connection.vendor}.")
+    sql, params = queryset.query.sql_with_params()
+    return explainer(sql, params)
+
+
+def plan_problems(scans, sorts, allow_index_walks=()):
+    problems = []
+    for table, index in scans:
+        if index is None:
+            problems.append(f"full scan of {table}")
+        elif index not in allow_index_walks:
+            problems.append(f"{table} walked through {index}")
+    if sorts and scans:
+        # The walk does not deliver the order, so LIMIT can't cut it short
+        problems.append("walked rows sorted in a temporary B-tree")
+    return problems
+
+
+def check_query_plans(names=None):
+    results = []
+    for name, (func, allow_index_walks) in sorted(HOT_QUERIES.items()):
+        if names and name not in names:
+            continue
+        plan, scans, sorts = explain(func())
+        results.append(PlanResult(name, plan, plan_problems(scans, sorts, allow_index_walks)))
+    return results
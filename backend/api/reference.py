@@ -0,0 +1,65 @@
+"""
+Reference data bundle: every active campus, program and class in one
+payload, for the frontend's dropdowns and lookups.
+
+The bundle is tagged with a version, a hash of its content, so the version
+only changes when something in the bundle does (a class's active_count is
+left out; it moves with every enrollment). Bundles are cached under the
+Campus, Program and Class generations: a write to any of them makes the
+next request rebuild the bundle (three queries), and one that changed
+nothing visible keeps the old version.
+"""
+import hashlib
+import json
+
+from core.generations import get_cache, get_generations
+from administration.models import Campus, Program, Class
+
+from api.cache import cache_timeout
+
+REFERENCE_MODELS = (Campus, Program, Class)
+
+
+def _version(data):
+    return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()[:20]
+
+
+def build_reference():
+    campuses = list(
+        Campus.objects.filter(is_active=True).order_by('name', 'id').values('id', 'name', 'location', 'capacity')
+    )
+    programs = list(
+        Program.objects.filter(is_active=True).order_by('name', 'id').values('id', 'name', 'description')
+    )
+    classes = [
+        {
+            'id': row['id'], 'name': row['name'],
+            'campus': row['campus_id'], 'campus_name': row['campus__name'],
+            'program': row['program_id'], 'program_name': row['program__name'],
+            'shift': row['shift'], 'capacity': row['capacity'],
+        }
+        # One pre-joined query instead of a campus and program lookup per class
+        for row in Class.objects.filter(is_active=True).order_by('name', 'id').values(
+            'id', 'name', 'campus_id', 'campus__name', 'program_id', 'program__name', 'shift', 'capacity'
+        )
+    ]
+    data = {'campuses': campuses, 'programs': programs, 'classes': classes}
+    return {'version': _version(data), **data}
+
+
+def reference_bundle():
+    """
+    The current bundle, from the cache when none of its models changed.
+    """
+    timeout = cache_timeout()
+    if not timeout:
+        return build_reference()
+
+    cache = get_cache()
+    generations = json.dumps(get_generations(REFERENCE_MODELS), sort_keys=True)
+    key = f"reference:{hashlib.sha1(generations.encode()).hexdigest()}"
+    bundle = cache.get(key)
+    if bundle is None:
+        bundle = build_reference()
+        cache.set(key, bundle, timeout)
+    return bundle
@@ -0,0 +1,32 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+class PassthroughRenderer(BaseRenderer):
+    """
+    For views that build their own (streaming) response. Registering the
+    renderer lets `?format=` and Accept negotiation select the view; error
+    payloads are still rendered as JSON.
+    """
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or isinstance(data, bytes):
+            return data
+        return json.dumps(data).encode()
+
+
+class CSVRenderer(PassthroughRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class XLSXRenderer(PassthroughRenderer):
+    media_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    format = 'xlsx'
+
+
+class HTMLPassthroughRenderer(PassthroughRenderer):
+    media_type = 'text/html'
+    format = 'html'
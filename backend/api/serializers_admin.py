@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from administration.models import Campus, Program, Class
+from api.serializers_base import DynamicFieldsMixin
 
 class CampusSerializer(serializers.ModelSerializer):
     class Meta:
@@ -11,7 +12,7 @@ class ProgramSerializer(serializers.ModelSerializer):
         model = Program
         fields = ['id', 'name', 'description', 'is_active', 'created_at']
 
-class ClassSerializer(serializers.ModelSerializer):
+class ClassSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     campus_name = serializers.CharField(source='campus.name', read_only=True)
     program_name = serializers.CharField(source='program.name', read_only=True)
 
@@ -20,5 +21,6 @@ class ClassSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'name', 'campus', 'campus_name', 
             'program', 'program_name', 'shift', 
-            'capacity', 'is_active', 'created_at'
+            'capacity', 'active_count', 'is_active', 'created_at'
         ]
+        read_only_fields = ['active_count']
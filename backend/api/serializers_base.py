@@ -0,0 +1,48 @@
+from rest_framework.permissions import SAFE_METHODS
+
+
+class DynamicFieldsMixin:
+    """
+    Lets clients shape a serializer's output through query parameters:
+
+    - `?fields=id,name` keeps only the listed fields.
+    - `?expand=history` adds fields listed in Meta.expandable_fields,
+      which are left out by default because they are expensive.
+
+    Only applies to the top-level serializer of a read request; nested
+    serializers and writes always use the full field set.
+    """
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or self.parent is not None:
+            return
+
+        selected = self.selected_fields(request)
+        for name in set(self.fields) - selected:
+            self.fields.pop(name)
+
+    @classmethod
+    def selected_fields(cls, request):
+        """
+        Names of the fields that will be rendered for this request, so views
+        can skip joins and prefetches for everything else.
+        """
+        declared = set(cls.Meta.fields)
+        if request.method not in SAFE_METHODS:
+            return declared
+        expandable = set(getattr(cls.Meta, 'expandable_fields', ()))
+
+        requested = cls._param_set(request, cls.fields_query_param)
+        expand = cls._param_set(request, cls.expand_query_param) & expandable
+
+        base = (requested & declared) if requested else (declared - expandable)
+        return base | expand
+
+    @staticmethod
+    def _param_set(request, name):
+        value = request.query_params.get(name, '')
+        return {item.strip() for item in value.split(',') if item.strip()}
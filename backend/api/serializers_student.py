@@ -1,6 +1,7 @@
 from rest_framework import serializers
-from students.models import Student, StudentEnrollment
+from students.models import Student, StudentEnrollment, MonthlySnapshot, MonthlyRosterEntry, AuditLog
 from api.serializers_admin import ClassSerializer
+from api.serializers_base import DynamicFieldsMixin
 
 class StudentEnrollmentSerializer(serializers.ModelSerializer):
     enrolled_class_details = ClassSerializer(source='enrolled_class', read_only=True)
@@ -10,7 +11,16 @@ class StudentEnrollmentSerializer(serializers.ModelSerializer):
         fields = ['id', 'student', 'enrolled_class', 'enrolled_class_details', 'start_date', 'end_date', 'is_active']
         read_only_fields = ['is_active', 'start_date', 'end_date']
 
-class StudentSerializer(serializers.ModelSerializer):
+# Joins needed to serialize an enrollment's class without extra queries
+ENROLLMENT_RELATED = ('enrolled_class__campus', 'enrolled_class__program')
+
+
+class StudentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """
+    Reads enrollments from the `prefetched_active_enrollments` and
+    `prefetched_history` attributes set up by StudentViewSet.get_queryset.
+    Falls back to querying when the student was not loaded through it.
+    """
     # Show active enrollments directly on student object
     active_enrollments = serializers.SerializerMethodField()
     history = serializers.SerializerMethodField()
@@ -24,10 +34,93 @@ class StudentSerializer(serializers.ModelSerializer):
         ]
 
     def get_active_enrollments(self, obj):
-        active = obj.enrollments.filter(is_active=True)
+        active = getattr(obj, 'prefetched_active_enrollments', None)
+        if active is None:
+            active = obj.enrollments.filter(is_active=True).select_related(*ENROLLMENT_RELATED)
         return StudentEnrollmentSerializer(active, many=True).data
 
     def get_history(self, obj):
         # Return all enrollments ordered by start_date desc
-        history = obj.enrollments.all().order_by('-start_date')
+        history = getattr(obj, 'prefetched_history', None)
+        if history is None:
+            history = obj.enrollments.select_related(*ENROLLMENT_RELATED).order_by('-start_date', 'id')
         return StudentEnrollmentSerializer(history, many=True).data
+
+
+class StudentListSerializer(StudentSerializer):
+    """
+    Lean register row. Enrollment trees are only rendered when asked for
+    with `?expand=active_enrollments,history`.
+    """
+    class Meta(StudentSerializer.Meta):
+        fields = [
+            'id', 'name', 'father_name', 'mobile_number', 'status',
+            'active_enrollments', 'history'
+        ]
+        expandable_fields = ['active_enrollments', 'history']
+
+
+class MonthlySnapshotSerializer(serializers.ModelSerializer):
+    month = serializers.DateField(format='%Y-%m')
+    scope_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = MonthlySnapshot
+        fields = ['month', 'scope', 'scope_id', 'scope_name', 'student_count', 'joined_count', 'left_count', 'built_at']
+
+    def get_scope_name(self, obj):
+        # Names are resolved in one query per page by SnapshotViewSet
+        return self.context.get('scope_names', {}).get((obj.scope, obj.scope_id))
+
+
+class MonthlyRosterEntrySerializer(serializers.ModelSerializer):
+    month = serializers.DateField(format='%Y-%m')
+    student_name = serializers.CharField(source='student.name', read_only=True)
+    father_name = serializers.CharField(source='student.father_name', read_only=True)
+    class_name = serializers.CharField(source='enrolled_class.name', read_only=True)
+    start_date = serializers.DateField(source='enrollment.start_date', read_only=True)
+    end_date = serializers.DateField(source='enrollment.end_date', read_only=True)
+
+    class Meta:
+        model = MonthlyRosterEntry
+        fields = [
+            'month', 'student', 'student_name', 'father_name',
+            'enrolled_class', 'class_name', 'enrollment', 'start_date', 'end_date'
+        ]
+
+
+class RosterEnrollmentSerializer(serializers.ModelSerializer):
+    """One row of a class, campus or program roster (students.rosters)."""
+    student_name = serializers.CharField(source='student.name', read_only=True)
+    father_name = serializers.CharField(source='student.father_name', read_only=True)
+    class_name = serializers.CharField(source='enrolled_class.name', read_only=True)
+
+    class Meta:
+        model = StudentEnrollment
+        fields = [
+            'id', 'student', 'student_name', 'father_name', 'enrolled_class', 'class_name',
+            'start_date', 'end_date', 'status', 'is_active'
+        ]
+
+
+class ClassStudentSerializer(serializers.ModelSerializer):
+    """A current member of a class, read through their active enrollment."""
+    id = serializers.IntegerField(source='student_id', read_only=True)
+    name = serializers.CharField(source='student.name', read_only=True)
+    father_name = serializers.CharField(source='student.father_name', read_only=True)
+    mobile_number = serializers.CharField(source='student.mobile_number', read_only=True)
+    status = serializers.CharField(source='student.status', read_only=True)
+    enrollment = serializers.IntegerField(source='pk', read_only=True)
+
+    class Meta:
+        model = StudentEnrollment
+        fields = ['id', 'name', 'father_name', 'mobile_number', 'status', 'enrollment', 'start_date']
+
+
+class AuditLogSerializer(serializers.ModelSerializer):
+    # None once the student has been deleted
+    student_name = serializers.CharField(source='student.name', read_only=True, default=None)
+
+    class Meta:
+        model = AuditLog
+        fields = ['id', 'timestamp', 'action', 'student', 'student_name', 'actor', 'actor_name', 'details']
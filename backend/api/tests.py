@@ -33,6 +33,21 @@ class TestStudentAPI:
             'student': student
         }
 
+    @pytest.fixture
+    def response_cache(self, settings):
+        # Off by default with the per-process locmem cache tests run on
+        settings.API_CACHE_TIMEOUT = 300
+
+    @pytest.fixture
+    def shared_cache(self, settings, tmp_path):
+        # A cache every process sees, as in a multi-worker deployment
+        settings.CACHES = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': str(tmp_path),
+            }
+        }
+
     def test_enroll_student_action(self, api_client, setup_data):
         api_client.force_authenticate(user=setup_data['admin'])
         
@@ -78,3 +93,875 @@ class TestStudentAPI:
         
         assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED or response.status_code == status.HTTP_403_FORBIDDEN
         assert Student.objects.filter(id=setup_data['student'].id).exists()
+
+    def test_delete_student_keeps_counters_and_seats_consistent(self, api_client, setup_data, settings):
+        from students import occupancy, stats
+
+        settings.DASHBOARD_COUNTERS = True
+        student = setup_data['student']
+        StudentEnrollment.objects.create(student=student, enrolled_class=setup_data['class'])
+        StudentEnrollment.objects.create(student=student, enrolled_class=setup_data['class_2'])
+        stats.rebuild_counters()
+        occupancy.reconcile()
+
+        api_client.force_authenticate(user=setup_data['admin'])
+        assert api_client.delete(f"/api/students/{student.id}/").status_code == status.HTTP_204_NO_CONTENT
+        assert stats.check_counters() == {}
+        assert stats.read_counters()[stats.STUDENTS_TOTAL] == 0
+        # Their seats are given back
+        assert occupancy.check_occupancy() == {}
+
+    def test_student_list_query_count_is_constant(self, api_client, setup_data):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        api_client.force_authenticate(user=setup_data['admin'])
+
+        def add_students(count, offset):
+            for i in range(count):
+                student = Student.objects.create(name=f"Bulk {offset + i}", mobile_number="+92-300-1234567")
+                StudentEnrollment.objects.create(student=student, enrolled_class=setup_data['class'])
+                StudentEnrollment.objects.create(student=student, enrolled_class=setup_data['class_2'], is_active=False)
+
+        add_students(2, 0)
+        with CaptureQueriesContext(connection) as small:
+            response = api_client.get("/api/students/?expand=active_enrollments,history")
+        assert response.status_code == status.HTTP_200_OK
+
+        add_students(10, 2)
+        with CaptureQueriesContext(connection) as large:
+            response = api_client.get("/api/students/?expand=active_enrollments,history")
+        assert response.status_code == status.HTTP_200_OK
+
+        assert len(large) == len(small)
+        row = next(s for s in response.data['results'] if s['name'] == "Bulk 0")
+        assert row['active_enrollments'][0]['enrolled_class_details']['campus_name'] == "API Campus"
+        assert len(row['history']) == 2
+
+    def test_student_list_keyset_pagination(self, api_client, setup_data):
+        api_client.force_authenticate(user=setup_data['admin'])
+        for i in range(5):
+            Student.objects.create(name="Same Name", mobile_number="+92-300-1234567")
+
+        seen = []
+        url = "/api/students/?page_size=2"
+        while url:
+            response = api_client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert len(response.data['results']) <= 2
+            seen.extend(s['id'] for s in response.data['results'])
+            url = response.data['next']
+
+        expected = list(Student.objects.order_by('name', 'id').values_list('id', flat=True))
+        assert seen == expected
+
+        # Walking back from the last page returns the previous rows in order
+        response = api_client.get("/api/students/?page_size=2")
+        response = api_client.get(response.data['next'])
+        previous = api_client.get(response.data['previous'])
+        assert [s['id'] for s in previous.data['results']] == expected[:2]
+
+    def test_student_list_opt_out_of_pagination(self, api_client, setup_data):
+        api_client.force_authenticate(user=setup_data['admin'])
+        response = api_client.get("/api/students/?paginate=false")
+        assert isinstance(response.data, list)
+        assert response.data[0]['id'] == setup_data['student'].id
+
+    def test_student_history_is_paginated(self, api_client, setup_data):
+        api_client.force_authenticate(user=setup_data['admin'])
+        first = StudentEnrollment.objects.create(student=setup_data['student'], enrolled_class=setup_data['class'], is_active=False)
+        second = StudentEnrollment.objects.create(student=setup_data['student'], enrolled_class=setup_data['class_2'])
+
+        url = f"/api/students/{setup_data['student'].id}/history/?page_size=1"
+        response = api_client.get(url)
+        assert [e['id'] for e in response.data['results']] == [first.id]
+        response = api_client.get(response.data['next'])
+        assert [e['id'] for e in response.data['results']] == [second.id]
+        assert response.data['next'] is None
+
+    def test_student_list_is_lean_by_default(self, api_client, setup_data):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        api_client.force_authenticate(user=setup_data['admin'])
+        StudentEnrollment.objects.create(student=setup_data['student'], enrolled_class=setup_data['class'])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get("/api/students/")
+        row = response.data['results'][0]
+        assert set(row) == {'id', 'name', 'father_name', 'mobile_number', 'status'}
+        assert not any('students_studentenrollment' in q['sql'] for q in queries.captured_queries)
+
+        response = api_client.get("/api/students/?fields=id,name&expand=active_enrollments")
+        row = response.data['results'][0]
+        assert set(row) == {'id', 'name', 'active_enrollments'}
+        assert row['active_enrollments'][0]['enrolled_class'] == setup_data['class'].id
+
+    def test_student_detail_supports_sparse_fields(self, api_client, setup_data):
+        api_client.force_authenticate(user=setup_data['admin'])
+        url = f"/api/students/{setup_data['student'].id}/"
+
+        assert 'history' in api_client.get(url).data
+        assert set(api_client.get(url + "?fields=id,status").data) == {'id', 'status'}
+
+    def test_class_list_sparse_fields(self, api_client, setup_data):
+        api_client.force_authenticate(user=setup_data['admin'])
+        response = api_client.get("/api/classes/?fields=id,name")
+        assert set(response.data['results'][0]) == {'id', 'name'}
+
+        response = api_client.get("/api/classes/")
+        assert response.data['results'][0]['campus_name'] == "API Campus"
+
+    def test_reference_list_is_served_from_cache_until_a_write(self, api_client, setup_data, response_cache):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        api_client.force_authenticate(user=setup_data['admin'])
+        first = api_client.get("/api/campuses/")
+        assert first['X-Cache'] == 'MISS'
+
+        with CaptureQueriesContext(connection) as queries:
+            second = api_client.get("/api/campuses/")
+        assert second['X-Cache'] == 'HIT'
+        assert len(queries) == 0
+        assert second.data == first.data
+
+        Campus.objects.create(name="New Campus")
+        third = api_client.get("/api/campuses/")
+        assert third['X-Cache'] == 'MISS'
+        assert "New Campus" in [c['name'] for c in third.data['results']]
+
+        stats = api_client.get("/api/cache/stats/").data
+        assert stats['hits'] >= 1 and stats['misses'] >= 2
+
+    def test_response_cache_is_keyed_on_role(self, api_client, setup_data, response_cache):
+        api_client.force_authenticate(user=setup_data['admin'])
+        api_client.get("/api/programs/")
+        api_client.force_authenticate(user=setup_data['staff'])
+        assert api_client.get("/api/programs/")['X-Cache'] == 'MISS'
+
+    def test_response_cache_with_file_backend(self, api_client, setup_data, response_cache, shared_cache):
+        api_client.force_authenticate(user=setup_data['admin'])
+        assert api_client.get("/api/classes/")['X-Cache'] == 'MISS'
+        assert api_client.get("/api/classes/")['X-Cache'] == 'HIT'
+
+        setup_data['class'].name = "Renamed"
+        setup_data['class'].save()
+        response = api_client.get("/api/classes/")
+        assert response['X-Cache'] == 'MISS'
+        assert "Renamed" in [c['name'] for c in response.data['results']]
+
+    def test_student_search_endpoint(self, api_client, setup_data):
+        api_client.force_authenticate(user=setup_data['staff'])
+        Student.objects.create(name="Searchable Person", father_name="Someone", mobile_number="03001112233")
+
+        response = api_client.get("/api/students/search/?q=search")
+        assert response.status_code == status.HTTP_200_OK
+        assert [s['name'] for s in response.data['results']] == ["Searchable Person"]
+
+        response = api_client.get("/api/students/search/?q=0300-111")
+        assert [s['name'] for s in response.data['results']] == ["Searchable Person"]
+
+        assert api_client.get("/api/students/search/").status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_student_filters_reject_malformed_ids(self, api_client, setup_data):
+        api_client.force_authenticate(user=setup_data['admin'])
+        for url in (
+            "/api/students/search/?q=api&campus=abc",
+            "/api/students/export/?format=csv&program=abc",
+            "/api/print/students/?class=abc",
+        ):
+            response = api_client.get(url)
+            assert response.status_code == status.HTTP_400_BAD_REQUEST, url
+        assert response.data == {"error": "class must be a numeric id."}
+
+        payload = {"operation": "reactivate", "filter": {"class": "abc"}}
+        assert api_client.post("/api/students/bulk-status/", payload, format='json').status_code == status.HTTP_400_BAD_REQUEST
+        payload = {"operation": "reactivate", "filter": {"class": setup_data['class'].id}}
+        assert api_client.post("/api/students/bulk-status/", payload, format='json').status_code == status.HTTP_200_OK
+
+    def test_bulk_import_endpoint(self, api_client, setup_data):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        upload = SimpleUploadedFile(
+            "students.csv",
+            b"name,father_name,mobile_number\nImported,Father,03001234567\nBroken,,03001234567\n",
+            content_type="text/csv",
+        )
+        api_client.force_authenticate(user=setup_data['admin'])
+        response = api_client.post(
+            "/api/students/import/", {"file": upload, "class_id": setup_data['class'].id}, format='multipart'
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['created'] == 1
+        assert response.data['errors'][0]['row'] == 3
+        assert StudentEnrollment.objects.filter(student__name="Imported", enrolled_class=setup_data['class']).exists()
+
+    def test_export_streams_csv(self, api_client, setup_data):
+        import csv
+        import io
+
+        StudentEnrollment.objects.create(student=setup_data['student'], enrolled_class=setup_data['class'])
+        Student.objects.create(name="Not Enrolled", mobile_number="+92-300-1234567")
+        api_client.force_authenticate(user=setup_data['staff'])
+
+        response = api_client.get("/api/students/export/?format=csv")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        body = b"".join(response.streaming_content).decode('utf-8-sig')
+        rows = list(csv.reader(io.StringIO(body)))
+        assert rows[0][:3] == ['ID', 'Name', 'Father Name']
+        assert [r[1] for r in rows[1:]] == ["API Student", "Not Enrolled"]
+        assert rows[1][8:11] == ["C1", "API Campus", "API Program"]
+
+        response = api_client.get(f"/api/students/export/?format=csv&class={setup_data['class'].id}")
+        rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode('utf-8-sig'))))
+        assert [r[1] for r in rows[1:]] == ["API Student"]
+
+    def test_export_xlsx_workbook(self, api_client, setup_data):
+        import io
+        from openpyxl import load_workbook
+
+        StudentEnrollment.objects.create(student=setup_data['student'], enrolled_class=setup_data['class'])
+        api_client.force_authenticate(user=setup_data['staff'])
+
+        response = api_client.get("/api/students/export/?format=xlsx")
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Disposition'] == 'attachment; filename="students.xlsx"'
+        workbook = load_workbook(io.BytesIO(b"".join(response.streaming_content)), read_only=True)
+        rows = list(workbook["Students"].iter_rows(values_only=True))
+        assert rows[0][:3] == ('ID', 'Name', 'Father Name')
+        assert rows[1][1] == "API Student"
+        assert rows[1][8:11] == ("C1", "API Campus", "API Program")
+
+    def test_print_class_roster_streams_html(self, api_client, setup_data):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        for i in range(40):
+            student = Student.objects.create(name=f"Roster {i:02d}", father_name="F", mobile_number="+92-300-1234567")
+            StudentEnrollment.objects.create(student=student, enrolled_class=setup_data['class'])
+        api_client.force_authenticate(user=setup_data['staff'])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(f"/api/print/classes/{setup_data['class'].id}/roster/")
+            html = b"".join(response.streaming_content).decode()
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'].startswith('text/html')
+        assert html.count('class="page"') == 2
+        assert html.index("Roster 00") < html.index("Roster 39")
+        assert len(queries) == 2  # class lookup + one joined roster query
+
+    def test_print_student_profiles(self, api_client, setup_data):
+        StudentEnrollment.objects.create(student=setup_data['student'], enrolled_class=setup_data['class'])
+        api_client.force_authenticate(user=setup_data['staff'])
+
+        response = api_client.get(f"/api/print/students/?ids={setup_data['student'].id}")
+        html = b"".join(response.streaming_content).decode()
+        assert "API Student" in html
+        assert "API Campus" in html
+
+        response = api_client.get(f"/api/print/campuses/{setup_data['class'].campus_id}/register/")
+        assert "API Student" in b"".join(response.streaming_content).decode()
+
+    def test_print_student_profiles_refuses_oversized_selection(self, api_client, setup_data, monkeypatch):
+        monkeypatch.setattr('api.views_print.MAX_PROFILES', 2)
+        for i in range(2):
+            Student.objects.create(name=f"Extra {i}", father_name="F", mobile_number="+92-300-1234567")
+        api_client.force_authenticate(user=setup_data['staff'])
+
+        response = api_client.get("/api/print/students/")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["count"] == 3
+        assert "3 students selected" in response.data["error"]
+
+        response = api_client.get("/api/print/students/?status=Active&ids=" + ",".join(
+            str(pk) for pk in Student.objects.filter(name__startswith="Extra").values_list('id', flat=True)
+        ))
+        assert response.status_code == status.HTTP_200_OK
+        assert b"".join(response.streaming_content).decode().count('class="page"') == 2
+
+    def test_snapshot_endpoints(self, api_client, setup_data):
+        from students.snapshots import build_month
+
+        StudentEnrollment.objects.create(student=setup_data['student'], enrolled_class=setup_data['class'])
+        month = StudentEnrollment.objects.get().start_date.strftime('%Y-%m')
+        build_month(month)
+        api_client.force_authenticate(user=setup_data['staff'])
+
+        response = api_client.get(f"/api/snapshots/?month={month}&scope=class")
+        assert response.status_code == status.HTTP_200_OK
+        rows = {row['scope_name']: row for row in response.data['results']}
+        assert rows['C1']['student_count'] == 1
+        assert rows['C1']['month'] == month
+
+        response = api_client.get(f"/api/snapshots/roster/?month={month}&class={setup_data['class'].id}")
+        assert [row['student_name'] for row in response.data['results']] == ["API Student"]
+
+        assert api_client.get("/api/snapshots/?month=bad").status_code == status.HTTP_400_BAD_REQUEST
+        assert api_client.get("/api/snapshots/roster/").status_code == status.HTTP_400_BAD_REQUEST
+        assert api_client.get("/api/snapshots/?scope_id=abc").data == {"scope_id": "Must be a numeric id."}
+        for name in ("class", "campus", "program"):
+            response = api_client.get(f"/api/snapshots/roster/?month={month}&{name}=abc")
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_snapshot_responses_follow_rebuilds_and_renames(self, api_client, setup_data, response_cache):
+        from students.snapshots import build_month
+
+        StudentEnrollment.objects.create(student=setup_data['student'], enrolled_class=setup_data['class'])
+        month = StudentEnrollment.objects.get().start_date.strftime('%Y-%m')
+        api_client.force_authenticate(user=setup_data['staff'])
+        url = f"/api/snapshots/?month={month}&scope=class"
+        assert api_client.get(url).data['results'] == []
+
+        build_month(month)
+        response = api_client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert [row['student_count'] for row in response.data['results']] == [1]
+
+        setup_data['class'].name = "Renamed"
+        setup_data['class'].save()
+        assert "Renamed" in [row['scope_name'] for row in api_client.get(url).data['results']]
+
+    def test_promote_class_action(self, api_client, setup_data):
+        other = Student.objects.create(name="Stays Behind", mobile_number="+92-300-1111111")
+        for student in (setup_data['student'], other):
+            StudentEnrollment.objects.create(student=student, enrolled_class=setup_data['class'])
+        api_client.force_authenticate(user=setup_data['admin'])
+
+        url = f"/api/classes/{setup_data['class'].id}/promote/"
+        payload = {"to_class_id": setup_data['class_2'].id, "exclude": [other.id]}
+        response = api_client.post(url, payload, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['promoted'] == 1
+        assert StudentEnrollment.objects.get(student=setup_data['student'], is_active=True).enrolled_class == setup_data['class_2']
+        assert StudentEnrollment.objects.get(student=other, is_active=True).enrolled_class == setup_data['class']
+
+        response = api_client.post(url, {"to_class_id": setup_data['class_2'].id, "exclude": ["x"]}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        for payload in ({"mapping": [1]}, {"exclude": {"a": 1}}, {"exclude": 5}):
+            response = api_client.post(url, {"to_class_id": setup_data['class_2'].id, **payload}, format='json')
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_bulk_enroll_action(self, api_client, setup_data):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        new = [Student.objects.create(name=f"Admission {i}", mobile_number="+92-300-1111111") for i in range(20)]
+        StudentEnrollment.objects.create(student=setup_data['student'], enrolled_class=setup_data['class'])
+        api_client.force_authenticate(user=setup_data['admin'])
+
+        student_ids = [setup_data['student'].id, 999999] + [s.id for s in new]
+        payload = {"class_id": setup_data['class'].id, "student_ids": student_ids}
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.post("/api/students/bulk-enroll/", payload, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['enrolled'] == 20
+        results = {row['student_id']: row['result'] for row in response.data['results']}
+        assert results[setup_data['student'].id] == 'already_active'
+        assert results[999999] == 'not_found'
+        assert StudentEnrollment.objects.filter(enrolled_class=setup_data['class'], is_active=True).count() == 21
+        # class, students, duplicates, occupancy, one insert
+        assert len([q for q in queries if "SAVEPOINT" not in q["sql"]]) == 5
+
+        response = api_client.post("/api/students/bulk-enroll/", {"class_id": setup_data['class'].id}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_full_class_is_a_bad_request(self, api_client, setup_data, settings):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        settings.CLASS_CAPACITY_ENFORCEMENT = 'hard'
+        enrolled_class = setup_data['class']
+        enrolled_class.capacity = 2
+        enrolled_class.save()
+        api_client.force_authenticate(user=setup_data['admin'])
+
+        new = [Student.objects.create(name=f"Admission {i}", mobile_number="+92-300-1111111") for i in range(3)]
+        payload = {"class_id": enrolled_class.id, "student_ids": [s.id for s in new]}
+        response = api_client.post("/api/students/bulk-enroll/", payload, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['error'] == "C1 is full (0/2)."
+
+        # The first batch fits, the second does not: the report says so
+        rows = "".join(f"Imported {i},Father,03001234567\n" for i in range(3))
+        upload = SimpleUploadedFile("students.csv", f"name,father_name,mobile_number\n{rows}".encode(), content_type="text/csv")
+        response = api_client.post(
+            "/api/students/import/", {"file": upload, "class_id": enrolled_class.id, "batch_size": 2}, format='multipart'
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['error'] == "C1 is full (2/2)."
+        assert (response.data['created'], response.data['stopped_at_row']) == (2, 4)
+        assert Student.objects.filter(name__startswith="Imported").count() == 2
+
+    def test_bulk_status_action(self, api_client, setup_data):
+        StudentEnrollment.objects.create(student=setup_data['student'], enrolled_class=setup_data['class'])
+        api_client.force_authenticate(user=setup_data['admin'])
+        url = "/api/students/bulk-status/"
+
+        payload = {"operation": "deactivate", "filter": {"class": setup_data['class'].id}, "reason": "Term ended"}
+        response = api_client.post(url, payload, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {"updated": 1, "enrollments_closed": 1}
+        setup_data['student'].refresh_from_db()
+        assert setup_data['student'].status == 'Left'
+        assert "Term ended" in setup_data['student'].remarks
+
+        payload = {"operation": "reactivate", "student_ids": [setup_data['student'].id]}
+        assert api_client.post(url, payload, format='json').data == {"updated": 1}
+
+        payload = {"operation": "set_status", "student_ids": [setup_data['student'].id], "status": "Unknown"}
+        assert api_client.post(url, payload, format='json').status_code == status.HTTP_400_BAD_REQUEST
+        assert api_client.post(url, {"operation": "deactivate", "filter": {}}, format='json').status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_enroll_and_change_class_do_not_refetch_the_class(self, api_client, setup_data):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        api_client.force_authenticate(user=setup_data['admin'])
+        url = f"/api/students/{setup_data['student'].id}/"
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.post(url + "enroll/", {"class_id": setup_data['class'].id}, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['enrolled_class_details']['campus_name'] == "API Campus"
+        # student, class with campus/program, insert, occupancy
+        assert len([q for q in queries if 'SAVEPOINT' not in q['sql']]) == 4
+
+        payload = {"old_class_id": setup_data['class'].id, "new_class_id": setup_data['class_2'].id, "reason": "Moved"}
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.post(url + "change-class/", payload, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['enrolled_class_details']['program_name'] == "API Program"
+        # student, class, close + occupancy, insert + occupancy
+        assert len([q for q in queries if 'SAVEPOINT' not in q['sql']]) == 6
+
+    def test_conditional_get_on_lists_and_details(self, api_client, setup_data, response_cache, shared_cache):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        api_client.force_authenticate(user=setup_data['staff'])
+        response = api_client.get("/api/campuses/")
+        etag = response['ETag']
+        assert 'Last-Modified' in response
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get("/api/campuses/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['ETag'] == etag
+        assert len(queries) == 0  # validators are cached with the response
+
+        Campus.objects.create(name="Another Campus")
+        assert api_client.get("/api/campuses/", HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+        # Student details depend on classes: renaming one changes the ETag
+        url = f"/api/students/{setup_data['student'].id}/"
+        etag = api_client.get(url)['ETag']
+        assert 'Last-Modified' not in api_client.get(url)
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+        setup_data['class'].name = "Renamed"
+        setup_data['class'].save()
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+        response = api_client.get("/api/dashboard/stats/")
+        assert api_client.get("/api/dashboard/stats/", HTTP_IF_NONE_MATCH=response['ETag']).status_code == status.HTTP_304_NOT_MODIFIED
+
+        # Malformed ids are a 404, not a failed validator query
+        for url in ("/api/students/abc/", "/api/classes/abc/", "/api/campuses/abc/"):
+            assert api_client.get(url).status_code == status.HTTP_404_NOT_FOUND
+
+    def test_dependent_etags_need_a_shared_cache(self, api_client, setup_data):
+        api_client.force_authenticate(user=setup_data['staff'])
+        # Another process's enrollment would not bump this process's generations
+        assert 'ETag' not in api_client.get(f"/api/students/{setup_data['student'].id}/")
+        assert 'ETag' not in api_client.get("/api/dashboard/stats/")
+        # Own timestamps are in the database, so these stay conditional
+        assert 'ETag' in api_client.get("/api/campuses/")
+
+    def test_if_match_ignores_dependency_changes(self, api_client, setup_data, shared_cache):
+        api_client.force_authenticate(user=setup_data['admin'])
+        url = f"/api/students/{setup_data['student'].id}/"
+        etag = api_client.get(url)['ETag']
+
+        # Someone enrolls someone: the ETag changes, the student does not
+        other = Student.objects.create(name="Other", mobile_number="+92-300-1111111")
+        api_client.post(f"/api/students/{other.id}/enroll/", {"class_id": setup_data['class'].id})
+        assert api_client.get(url)['ETag'] != etag
+        response = api_client.patch(url, {"address": "First"}, format='json', HTTP_IF_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+        response = api_client.patch(url, {"address": "Second"}, format='json', HTTP_IF_MATCH=etag)
+        assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+
+    def test_if_match_prevents_lost_updates(self, api_client, setup_data):
+        api_client.force_authenticate(user=setup_data['admin'])
+        url = f"/api/campuses/{setup_data['class'].campus_id}/"
+        etag = api_client.get(url)['ETag']
+
+        response = api_client.patch(url, {"location": "First"}, format='json', HTTP_IF_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
+
+        response = api_client.patch(url, {"location": "Second"}, format='json', HTTP_IF_MATCH=etag)
+        assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+        assert Campus.objects.get(pk=setup_data['class'].campus_id).location == "First"
+
+    def test_jwt_claims_authenticate_without_user_query(self, api_client, setup_data, settings):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from rest_framework_simplejwt.tokens import AccessToken
+        from api.serializers_auth import MyTokenObtainPairSerializer
+
+        settings.JWT_TRUST_CLAIMS = 'true'  # the test cache is per process
+        admin = setup_data['admin']
+        token = MyTokenObtainPairSerializer.get_token(admin).access_token
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get("/api/auth/me/")
+        assert response.data == {"id": admin.id, "username": "admin", "isAdmin": True, "isStaff": True}
+        assert len(queries) == 0
+
+        # Tokens without the role claims are resolved from the database
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(admin)}")
+        with CaptureQueriesContext(connection) as queries:
+            assert api_client.get("/api/auth/me/").data['isAdmin'] is True
+        assert any('auth_user' in q['sql'] for q in queries)
+
+        # A demotion takes effect before the old token expires
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        admin.is_superuser = False
+        admin.save()
+        assert api_client.get("/api/auth/me/").data['isAdmin'] is False
+        response = api_client.post("/api/campuses/", {"name": "Not Allowed"}, format='json')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_jwt_refresh_rereads_claims(self, api_client, setup_data, settings):
+        import time
+        from unittest import mock
+
+        settings.JWT_TRUST_CLAIMS = 'true'
+        admin = setup_data['admin']
+        tokens = api_client.post("/api/token/", {"username": "admin", "password": "password"}, format='json').data
+
+        # Demoted a while ago: tokens issued since are newer than the change
+        admin.is_superuser = False
+        with mock.patch('api.authentication.time.time', return_value=time.time() - 60):
+            admin.save()
+        refreshed = api_client.post("/api/token/refresh/", {"refresh": tokens['refresh']}, format='json').data
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {refreshed['access']}")
+        response = api_client.post("/api/campuses/", {"name": "Not Allowed"}, format='json')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+        # The rotated refresh token carries the new claims too
+        refreshed = api_client.post("/api/token/refresh/", {"refresh": refreshed['refresh']}, format='json').data
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {refreshed['access']}")
+        assert api_client.get("/api/auth/me/").data['isAdmin'] is False
+
+        admin.is_active = False
+        admin.save()
+        response = api_client.post("/api/token/refresh/", {"refresh": refreshed['refresh']}, format='json')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_jwt_claims_need_a_shared_cache(self, api_client, setup_data, settings):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from api.serializers_auth import MyTokenObtainPairSerializer
+
+        settings.JWT_TRUST_CLAIMS = 'auto'
+        admin = setup_data['admin']
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {MyTokenObtainPairSerializer.get_token(admin).access_token}")
+        with CaptureQueriesContext(connection) as queries:
+            assert api_client.get("/api/auth/me/").data['isAdmin'] is True
+        assert any('auth_user' in q['sql'] for q in queries)
+
+        # Another worker's change can't be seen in a locmem cache; the user row can
+        User.objects.filter(pk=admin.pk).update(is_superuser=False)
+        assert api_client.get("/api/auth/me/").data['isAdmin'] is False
+
+    def test_jwt_deleted_or_updated_users_are_revoked(self, api_client, setup_data, settings):
+        from api.authentication import revoke_tokens
+        from api.serializers_auth import MyTokenObtainPairSerializer
+
+        settings.JWT_TRUST_CLAIMS = 'true'
+        admin, staff = setup_data['admin'], setup_data['staff']
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {MyTokenObtainPairSerializer.get_token(staff).access_token}")
+        assert api_client.get("/api/auth/me/").status_code == status.HTTP_200_OK
+        staff.delete()
+        assert api_client.get("/api/auth/me/").status_code == status.HTTP_401_UNAUTHORIZED
+
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {MyTokenObtainPairSerializer.get_token(admin).access_token}")
+        User.objects.filter(pk=admin.pk).update(is_active=False)
+        revoke_tokens([admin.pk])
+        assert api_client.get("/api/auth/me/").status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_telemetry_headers_and_metrics(self, api_client, setup_data, settings):
+        from config.middleware import HISTOGRAMS
+
+        for histogram in HISTOGRAMS:
+            histogram.reset()
+        api_client.force_authenticate(user=setup_data['staff'])
+        response = api_client.get("/api/classes/")
+        timing = response['Server-Timing']
+        assert 'db;dur=' in timing and 'queries"' in timing and 'render;dur=' in timing and 'total;dur=' in timing
+
+        metrics = api_client.get("/api/metrics").content.decode()
+        assert '# TYPE http_request_duration_seconds histogram' in metrics
+        assert 'http_request_db_queries_count{view="class-list",method="GET",status="200"} 1' in metrics
+        assert 'http_request_render_seconds_bucket{view="class-list",method="GET",status="200",le="+Inf"} 1' in metrics
+
+        settings.METRICS_TOKEN = 'secret'
+        assert api_client.get("/api/metrics").status_code == status.HTTP_403_FORBIDDEN
+        assert api_client.get("/api/metrics", HTTP_AUTHORIZATION="Bearer secret").status_code == status.HTTP_200_OK
+
+    def test_metrics_without_token_need_staff_in_production(self, api_client, setup_data, settings):
+        from api.serializers_auth import MyTokenObtainPairSerializer
+
+        settings.METRICS_TOKEN = ''
+        settings.METRICS_PUBLIC = False
+        api_client.force_authenticate(user=None)
+        assert api_client.get("/api/metrics").status_code == status.HTTP_403_FORBIDDEN
+        assert api_client.get("/api/metrics", HTTP_AUTHORIZATION="Bearer junk").status_code == status.HTTP_403_FORBIDDEN
+
+        staff_token = MyTokenObtainPairSerializer.get_token(setup_data['staff']).access_token
+        response = api_client.get("/api/metrics", HTTP_AUTHORIZATION=f"Bearer {staff_token}")
+        assert response.status_code == status.HTTP_200_OK
+        assert '# TYPE http_request_duration_seconds histogram' in response.content.decode()
+
+        settings.METRICS_PUBLIC = True
+        assert api_client.get("/api/metrics").status_code == status.HTTP_200_OK
+
+    def test_audit_log_records_token_users_and_paginates(self, api_client, setup_data, django_capture_on_commit_callbacks):
+        from api.serializers_auth import MyTokenObtainPairSerializer
+
+        admin, student = setup_data['admin'], setup_data['student']
+        token = MyTokenObtainPairSerializer.get_token(admin).access_token
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post(f"/api/students/{student.id}/enroll/", {"class_id": setup_data['class'].id}, format='json')
+            api_client.patch(f"/api/students/{student.id}/", {"father_name": "Changed"}, format='json')
+            api_client.post(f"/api/students/{student.id}/deactivate/", {"reason": "Moved"}, format='json')
+
+        response = api_client.get(f"/api/audit-log/?student={student.id}&page_size=2")
+        assert response.status_code == status.HTTP_200_OK
+        assert [e['action'] for e in response.data['results']] == ['deactivated', 'updated']
+        latest = response.data['results'][0]
+        assert (latest['actor'], latest['actor_name'], latest['student_name']) == (admin.id, 'admin', "API Student")
+        assert latest['details']['reason'] == "Moved"
+        assert response.data['results'][1]['details'] == {'fields': ['father_name']}
+
+        older = api_client.get(response.data['next'])
+        assert [e['action'] for e in older.data['results']] == ['enrolled']
+
+        assert api_client.get(f"/api/audit-log/?actor={admin.id}&action=enrolled").data['results'][0]['student'] == student.id
+        assert api_client.get("/api/audit-log/?since=2999-01-01").data['results'] == []
+        assert api_client.get("/api/audit-log/?since=yesterday").status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_point_in_time_roster(self, api_client, setup_data, django_assert_num_queries):
+        api_client.force_authenticate(user=setup_data['staff'])
+        class_obj, student = setup_data['class'], setup_data['student']
+        others = Student.objects.bulk_create([
+            Student(name=f"Roster {i}", mobile_number="+92-300-1234567") for i in range(3)
+        ])
+        StudentEnrollment.objects.bulk_create(
+            [StudentEnrollment(student=s, enrolled_class=class_obj) for s in [student, *others]]
+        )
+        StudentEnrollment.objects.update(start_date="2024-01-01")
+        StudentEnrollment.objects.filter(student=others[0]).update(is_active=False, end_date="2024-03-31")
+
+        url = f"/api/classes/{class_obj.id}/roster/"
+        with django_assert_num_queries(2):
+            response = api_client.get(url, {"as_of": "2024-03-31", "page_size": 3})
+        assert response.status_code == status.HTTP_200_OK
+        assert [row['student_name'] for row in response.data['results']] == ["API Student", "Roster 0", "Roster 1"]
+        assert response.data['results'][1]['end_date'] == "2024-03-31"
+        assert len(api_client.get(response.data['next']).data['results']) == 1
+
+        assert len(api_client.get(url, {"as_of": "2024-04-01"}).data['results']) == 3
+        assert api_client.get(url, {"as_of": "2023-12-31"}).data['results'] == []
+        campus_roster = api_client.get(f"/api/campuses/{class_obj.campus_id}/roster/", {"as_of": "2024-04-01"})
+        assert len(campus_roster.data['results']) == 3
+        assert api_client.get(url, {"as_of": "31/03/2024"}).status_code == status.HTTP_400_BAD_REQUEST
+        assert api_client.get("/api/programs/999/roster/").status_code == status.HTTP_404_NOT_FOUND
+        assert api_client.get("/api/classes/abc/roster/").status_code == status.HTTP_404_NOT_FOUND
+
+    def test_class_students_is_one_query(self, api_client, setup_data, django_assert_num_queries):
+        api_client.force_authenticate(user=setup_data['staff'])
+        class_obj = setup_data['class']
+        students = Student.objects.bulk_create([
+            Student(name=name, mobile_number="+92-300-1234567") for name in ("Bilal", "Ahmed", "Zaid", "Hamza")
+        ])
+        StudentEnrollment.objects.bulk_create([StudentEnrollment(student=s, enrolled_class=class_obj) for s in students])
+        StudentEnrollment.objects.filter(student=students[3]).update(is_active=False)
+        StudentEnrollment.objects.create(student=setup_data['student'], enrolled_class=setup_data['class_2'])
+
+        url = f"/api/classes/{class_obj.id}/students/"
+        with django_assert_num_queries(1):
+            response = api_client.get(url, {"page_size": 2})
+        assert response.status_code == status.HTTP_200_OK
+        assert [row['name'] for row in response.data['results']] == ["Ahmed", "Bilal"]
+        assert response.data['results'][0]['id'] == students[1].id
+        assert [row['name'] for row in api_client.get(response.data['next']).data['results']] == ["Zaid"]
+
+        descending = api_client.get(url, {"ordering": "-name"})
+        assert [row['name'] for row in descending.data['results']] == ["Zaid", "Bilal", "Ahmed"]
+        assert api_client.get(url, {"ordering": "mobile"}).status_code == status.HTTP_400_BAD_REQUEST
+
+        empty = Class.objects.create(name="Empty", campus=class_obj.campus, program=class_obj.program, shift="Morning")
+        assert api_client.get(f"/api/classes/{empty.id}/students/").data['results'] == []
+        assert api_client.get("/api/classes/999/students/").status_code == status.HTTP_404_NOT_FOUND
+        assert api_client.get("/api/classes/abc/students/").status_code == status.HTTP_404_NOT_FOUND
+
+    def test_reference_bundle_is_versioned_and_cached(self, api_client, setup_data, response_cache, django_assert_num_queries):
+        from students import occupancy
+
+        api_client.force_authenticate(user=setup_data['staff'])
+        class_obj = setup_data['class']
+        Class.objects.create(name="Retired", campus=class_obj.campus, program=class_obj.program, shift="Morning", is_active=False)
+
+        with django_assert_num_queries(3):
+            response = api_client.get("/api/reference/")
+        assert response.status_code == status.HTTP_200_OK
+        version = response.data['version']
+        assert response['ETag'] == f'"{version}"'
+        assert [c['name'] for c in response.data['campuses']] == ["API Campus"]
+        assert [p['name'] for p in response.data['programs']] == ["API Program"]
+        assert response.data['classes'][0] == {
+            'id': class_obj.id, 'name': "C1", 'campus': class_obj.campus_id, 'campus_name': "API Campus",
+            'program': class_obj.program_id, 'program_name': "API Program", 'shift': "Morning", 'capacity': 30,
+        }
+        assert len(response.data['classes']) == 2
+
+        # Served from the cache; a matching version is a 304 either way
+        with django_assert_num_queries(0):
+            assert api_client.get("/api/reference/", HTTP_IF_NONE_MATCH=f'"{version}"').status_code == status.HTTP_304_NOT_MODIFIED
+        assert api_client.get("/api/reference/", {"version": version}).status_code == status.HTTP_304_NOT_MODIFIED
+
+        # Occupancy bumps the Class generation but leaves the bundle as it was
+        occupancy.occupy(class_obj.id)
+        assert api_client.get("/api/reference/", {"version": version}).status_code == status.HTTP_304_NOT_MODIFIED
+
+        class_obj.name = "C1 Renamed"
+        class_obj.save()
+        response = api_client.get("/api/reference/", HTTP_IF_NONE_MATCH=f'"{version}"')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['version'] != version
+        assert "C1 Renamed" in [c['name'] for c in response.data['classes']]
+
+@pytest.mark.django_db
+def test_hot_queries_use_indexes():
+    from api.query_plans import check_query_plans
+
+    results = check_query_plans()
+    assert results
+    assert [(r.name, r.problems) for r in results if not r.ok] == []
+
+
+@pytest.mark.django_db
+def test_query_plan_check_detects_full_scans():
+    from api.query_plans import explain, plan_problems
+
+    _, scans, sorts = explain(Student.objects.filter(address="Somewhere"))
+    # A table scan, or a walk over an index nobody registered for it
+    assert [table for table, _ in scans] == ['students_student']
+    assert plan_problems(scans, sorts)
+
+
+@pytest.mark.django_db
+def test_query_plan_check_fails_when_an_allowed_walk_loses_its_index():
+    from django.db import connection
+    from api.query_plans import check_query_plans
+
+    if connection.vendor != 'sqlite':
+        pytest.skip("drops a SQLite index")
+    with connection.cursor() as cursor:
+        cursor.execute('DROP INDEX student_name_id')
+    [result] = check_query_plans(['student_list_first_page'])
+    assert not result.ok
+    assert "full scan of students_student" in result.problems
+    assert "walked rows sorted in a temporary B-tree" in result.problems
+
+
+# --- Query budgets: each endpoint's query count must not depend on the data
+# size (checked at 10 and 1,000 students). Lists include the ETag validator query.
+
+ENDPOINT_BUDGETS = [
+    ("/api/students/", 2),
+    ("/api/students/?expand=active_enrollments,history", 4),
+    ("/api/students/search/?q=budget", 1),
+    ("/api/students/{student}/", 4),
+    ("/api/students/{student}/history/", 2),
+    ("/api/classes/", 2),
+    ("/api/dashboard/stats/", 7),
+    ("/api/reference/", 3),
+]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url, budget", ENDPOINT_BUDGETS)
+def test_endpoint_query_budget(url, budget, settings):
+    from core import generations
+    from core.query_budget import assert_scales
+    from students.search import index_students
+
+    settings.API_CACHE_TIMEOUT = 0
+    admin = User.objects.create_superuser('budget-admin', 'budget@example.com', 'password')
+    campus = Campus.objects.create(name="Budget Campus")
+    program = Program.objects.create(name="Budget Program")
+    classes = [
+        Class.objects.create(name=f"Budget {i}", campus=campus, program=program, shift="Morning")
+        for i in range(3)
+    ]
+    first = Student.objects.create(name="Budget Student", mobile_number="+92-300-1234567")
+
+    def grow_to(size):
+        students = Student.objects.bulk_create([
+            Student(name=f"Budget Student {n:04d}", mobile_number="+92-300-1234567")
+            for n in range(Student.objects.count(), size)
+        ])
+        index_students(students)
+        StudentEnrollment.objects.bulk_create([
+            StudentEnrollment(student=student, enrolled_class=enrolled_class, is_active=enrolled_class != classes[0])
+            for student in [first, *students] if student is not first or size == 10
+            for enrolled_class in classes
+        ])
+        generations.bump(Student, StudentEnrollment)
+
+    client = APIClient()
+    client.force_authenticate(user=admin)
+
+    def request():
+        response = client.get(url.format(student=first.id))
+        assert response.status_code == status.HTTP_200_OK
+
+    assert_scales(request, grow_to, max_queries=budget)
+
+
+@pytest.mark.django_db
+def test_benchmark_reports_and_rolls_back_writes():
+    from api.benchmark import compare, run_benchmark
+    from students import seeding
+
+    seeding.seed(students=30, campuses=1, programs=2, classes_per_offering=1, build_snapshots=False)
+    admin = User.objects.create_superuser('bench-admin', 'bench@example.com', 'password')
+    active = set(StudentEnrollment.objects.filter(is_active=True).values_list('student_id', 'enrolled_class_id'))
+
+    report = run_benchmark(admin, iterations=5, warmup=1)
+
+    assert report['students'] == 30
+    for name, result in report['scenarios'].items():
+        assert result['requests'] == 5, name
+        assert result['errors'] == 0, name
+        assert result['queries'] is not None, name
+        assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+    # The enroll and change-class scenarios leave no trace
+    assert set(StudentEnrollment.objects.filter(is_active=True).values_list('student_id', 'enrolled_class_id')) == active
+
+    assert compare(report, report) == []
+    slower = {'scenarios': {'student_list': {**report['scenarios']['student_list'], 'requests': 5}}}
+    slower['scenarios']['student_list']['p95_ms'] = report['scenarios']['student_list']['p95_ms'] / 2
+    slower['scenarios']['student_list']['queries'] -= 1
+    regressions = compare(report, slower, tolerance=0.2)
+    assert len(regressions) == 2 and all(r.startswith('student_list') for r in regressions)
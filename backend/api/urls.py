@@ -1,20 +1,28 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from api.views import CampusViewSet, ProgramViewSet, ClassViewSet, StudentViewSet, DashboardStatsView, UserMeView
+from api.views import CampusViewSet, ProgramViewSet, ClassViewSet, StudentViewSet, DashboardStatsView, UserMeView, CacheStatsView, ReferenceDataView, SnapshotViewSet, AuditLogViewSet, metrics
 
 router = DefaultRouter()
 router.register(r'campuses', CampusViewSet)
 router.register(r'programs', ProgramViewSet)
 router.register(r'classes', ClassViewSet)
 router.register(r'students', StudentViewSet)
+router.register(r'snapshots', SnapshotViewSet)
+router.register(r'audit-log', AuditLogViewSet)
 
-from api.serializers_auth import MyTokenObtainPairView
-from rest_framework_simplejwt.views import TokenRefreshView
+from api.views_print import ClassRosterPrintView, CampusRegisterPrintView, StudentProfilesPrintView
+from api.serializers_auth import MyTokenObtainPairView, MyTokenRefreshView
 
 urlpatterns = [
     path('', include(router.urls)),
     path('dashboard/stats/', DashboardStatsView.as_view(), name='dashboard-stats'),
+    path('cache/stats/', CacheStatsView.as_view(), name='cache-stats'),
+    path('reference/', ReferenceDataView.as_view(), name='reference-data'),
+    path('print/classes/<int:pk>/roster/', ClassRosterPrintView.as_view(), name='print-class-roster'),
+    path('print/campuses/<int:pk>/register/', CampusRegisterPrintView.as_view(), name='print-campus-register'),
+    path('print/students/', StudentProfilesPrintView.as_view(), name='print-student-profiles'),
     path('token/', MyTokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/refresh/', MyTokenRefreshView.as_view(), name='token_refresh'),
     path('auth/me/', UserMeView.as_view(), name='user_me'),
+    path('metrics', metrics, name='metrics'),
 ]
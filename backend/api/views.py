@@ -1,41 +1,358 @@
+from datetime import datetime, time, timedelta
+
 from rest_framework import viewsets, status
+from rest_framework.exceptions import APIException, NotFound, ValidationError
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from rest_framework.request import Request
 from rest_framework.response import Response
-from django.shortcuts import get_object_or_404
+from rest_framework.settings import api_settings
+from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.renderers import JSONRenderer
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse, FileResponse
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import quote_etag
 from django.db import transaction
+from django.db.models import Prefetch
+from django.core.exceptions import ValidationError as DjangoValidationError
 
 from administration.models import Campus, Program, Class
-from students.models import Student, StudentEnrollment
-from students import services
+from config.middleware import render_metrics
+from students.models import Student, StudentEnrollment, MonthlySnapshot, MonthlyRosterEntry, AuditLog
+from students.snapshots import parse_month
+from students.rosters import roster_as_of
+from students import audit, services, stats, occupancy, importers, exporters
+from students.search import search_students, filter_students
 
 from api.serializers_admin import CampusSerializer, ProgramSerializer, ClassSerializer
-from api.serializers_student import StudentSerializer, StudentEnrollmentSerializer
+from api.serializers_student import (
+    StudentSerializer, StudentListSerializer, StudentEnrollmentSerializer, ENROLLMENT_RELATED,
+    MonthlySnapshotSerializer, MonthlyRosterEntrySerializer, AuditLogSerializer, RosterEnrollmentSerializer,
+    ClassStudentSerializer
+)
 from api.permissions import IsStaffUser
+from api.cache import CachedResponseMixin, response_cache_stats
+from api.conditional import ConditionalGetMixin, conditional_response, generation_etag, set_validators
+from api.renderers import CSVRenderer, XLSXRenderer
+from api import reference
+
+BULK_ENROLL_LIMIT = 1000
+
+class RosterAsOfMixin:
+    """
+    `roster` action: who was enrolled in this class, campus or program on a
+    given day. Set `roster_scope` to a key of students.rosters.ROSTER_SCOPES.
+    """
+    roster_scope = None
+
+    @action(detail=True, methods=['get'], url_path='roster')
+    def roster(self, request, pk=None):
+        """
+        Paginated, ordered by student name.
+        Query: ?as_of=2025-03-15 (Optional, defaults to today)
+        """
+        # Retired classes, campuses and programs keep their history
+        scope = get_object_or_404(self.queryset.model, pk=pk)
+        as_of = request.query_params.get('as_of')
+        day = timezone.localdate()
+        if as_of:
+            try:
+                day = parse_date(as_of)
+            except ValueError:
+                day = None
+            if day is None:
+                return Response({"error": "as_of must be a date (YYYY-MM-DD)"}, status=status.HTTP_400_BAD_REQUEST)
 
-class CampusViewSet(viewsets.ModelViewSet):
+        enrollments = roster_as_of(day, self.roster_scope, scope.pk)
+        page = self.paginate_queryset(enrollments)
+        if page is not None:
+            return self.get_paginated_response(RosterEnrollmentSerializer(page, many=True).data)
+        return Response(RosterEnrollmentSerializer(enrollments, many=True).data)
+
+class CampusViewSet(RosterAsOfMixin, ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
+    cache_models = (Campus,)
+    roster_scope = 'campus'
     queryset = Campus.objects.filter(is_active=True)
     serializer_class = CampusSerializer
     permission_classes = [IsStaffUser]
 
-class ProgramViewSet(viewsets.ModelViewSet):
+class ProgramViewSet(RosterAsOfMixin, ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
+    cache_models = (Program,)
+    roster_scope = 'program'
     queryset = Program.objects.filter(is_active=True)
     serializer_class = ProgramSerializer
     permission_classes = [IsStaffUser]
 
-class ClassViewSet(viewsets.ModelViewSet):
+class ClassViewSet(RosterAsOfMixin, ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
+    cache_models = (Class, Campus, Program)
+    roster_scope = 'class'
     queryset = Class.objects.filter(is_active=True)
     serializer_class = ClassSerializer
     permission_classes = [IsStaffUser]
 
-class StudentViewSet(viewsets.ModelViewSet):
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_serializer_class().selected_fields(self.request)
+        related = [name for name in ('campus', 'program') if f'{name}_name' in fields]
+        return queryset.select_related(*related) if related else queryset
+
+    STUDENT_ORDERINGS = {'name': ('student__name', 'id'), '-name': ('-student__name', '-id')}
+
+    @action(detail=True, methods=['get'], url_path='students')
+    def students(self, request, pk=None):
+        """
+        Students currently active in the class, paginated.
+        Query: ?ordering=name|-name (Optional)
+        """
+        if not str(pk).isdigit():
+            raise NotFound()
+        ordering = self.STUDENT_ORDERINGS.get(request.query_params.get('ordering', 'name'))
+        if ordering is None:
+            return Response({"error": "ordering must be name or -name"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # One join from the class's active enrollments; no separate class lookup
+        enrollments = (
+            StudentEnrollment.objects.filter(enrolled_class_id=pk, is_active=True)
+            .select_related('student')
+            .only(
+                'id', 'student_id', 'start_date',
+                'student__name', 'student__father_name', 'student__mobile_number', 'student__status',
+            )
+            .order_by(*ordering)
+        )
+        page = self.paginate_queryset(enrollments)
+        rows = enrollments if page is None else page
+        if not rows and not Class.objects.filter(pk=pk, is_active=True).exists():
+            raise NotFound()
+        data = ClassStudentSerializer(rows, many=True).data
+        return Response(data) if page is None else self.get_paginated_response(data)
+
+    @action(detail=True, methods=['post'], url_path='promote')
+    def promote(self, request, pk=None):
+        """
+        Promote the whole class.
+        Expected Payload: {
+            "to_class_id": 2,
+            "mapping": {"<student_id>": <class_id>, ...} (Optional),
+            "exclude": [<student_id>, ...] (Optional),
+            "closure_status": "Completed" (Optional),
+            "progress_notes": "..." (Optional)
+        }
+        """
+        from_class = self.get_object()
+        to_class_id = request.data.get('to_class_id')
+        if not to_class_id:
+            return Response({"error": "to_class_id is required"}, status=status.HTTP_400_BAD_REQUEST)
+        mapping = request.data.get('mapping') or {}
+        exclude = request.data.get('exclude') or []
+        if not isinstance(mapping, dict) or not isinstance(exclude, list):
+            return Response({"error": "mapping must be an object and exclude a list"}, status=status.HTTP_400_BAD_REQUEST)
+        to_class = get_object_or_404(Class, pk=to_class_id)
+
+        try:
+            moved = services.promote_class(
+                from_class,
+                to_class,
+                mapping=mapping,
+                exclude=exclude,
+                closure_status=request.data.get('closure_status', 'Completed'),
+                progress_notes=request.data.get('progress_notes', ''),
+                user=request.user,
+            )
+        except (DjangoValidationError, TypeError, ValueError) as e:
+            message = e.messages[0] if isinstance(e, DjangoValidationError) else "mapping and exclude must use numeric ids"
+            return Response({"error": message}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "promoted": sum(moved.values()),
+            "classes": [{"class_id": class_id, "students": count} for class_id, count in sorted(moved.items())],
+        }, status=status.HTTP_200_OK)
+
+class StudentViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     """
     Main ViewSet for Student Management.
     Standard CRUD + Custom Business Logic Actions.
     """
+    cache_models = (Student, StudentEnrollment, Class, Campus, Program)
     queryset = Student.objects.all()
     serializer_class = StudentSerializer
     permission_classes = [IsStaffUser]
 
+    def get_serializer_class(self):
+        if self.action in ('list', 'search'):
+            return StudentListSerializer
+        return super().get_serializer_class()
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            student = serializer.save()
+            stats.students_added(student.status)
+            audit.record('created', student, self.request.user)
+
+    def perform_update(self, serializer):
+        previous_status = serializer.instance.status
+        previous = {name: getattr(serializer.instance, name) for name in serializer.validated_data}
+        with transaction.atomic():
+            student = serializer.save()
+            stats.student_status_changed(previous_status, student.status)
+            changed = sorted(name for name, value in previous.items() if getattr(student, name) != value)
+            if changed:
+                audit.record('updated', student, self.request.user, fields=changed)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            # Deleted along with the student
+            student_id = instance.pk
+            active_class_ids = list(
+                StudentEnrollment.objects.filter(student=instance, is_active=True).values_list('enrolled_class_id', flat=True)
+            )
+            audit.record('deleted', instance, self.request.user, name=instance.name)
+            instance.delete()
+            stats.students_removed(instance.status)
+            stats.enrollments_changed([(student_id, class_id, -1) for class_id in active_class_ids])
+            occupancy.release(occupancy.count_by_class(active_class_ids))
+
+    def get_queryset(self):
+        """
+        Load only what the serializer will render for this request. Requested
+        enrollment trees are prefetched (with class, campus and program joined
+        in) so serializing any number of students costs a fixed number of queries.
+        """
+        queryset = super().get_queryset()
+        if self.action not in ('list', 'search', 'retrieve', 'update', 'partial_update'):
+            # Custom actions only need the student row itself
+            return queryset
+
+        fields = self.get_serializer_class().selected_fields(self.request)
+        if self.request.method == 'GET':
+            columns = {f.attname for f in Student._meta.concrete_fields} & fields
+            queryset = queryset.only('id', 'name', *columns)
+
+        enrollments = StudentEnrollment.objects.select_related(*ENROLLMENT_RELATED)
+        prefetches = []
+        if 'active_enrollments' in fields:
+            prefetches.append(Prefetch(
+                'enrollments',
+                queryset=enrollments.filter(is_active=True),
+                to_attr='prefetched_active_enrollments'
+            ))
+        if 'history' in fields:
+            prefetches.append(Prefetch(
+                'enrollments',
+                queryset=enrollments.order_by('-start_date', 'id'),
+                to_attr='prefetched_history'
+            ))
+        return queryset.prefetch_related(*prefetches)
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser, FormParser])
+    def bulk_import(self, request):
+        """
+        Bulk import students from a CSV (or XLSX) upload.
+        Form fields: file, class_id (Optional), batch_size (Optional)
+        Columns: name, father_name, mobile_number, cnic, address, status, remarks
+        """
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response({"error": "file is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        enrolled_class = None
+        if request.data.get('class_id'):
+            enrolled_class = get_object_or_404(Class, pk=request.data['class_id'])
+
+        try:
+            batch_size = int(request.data.get('batch_size') or importers.DEFAULT_BATCH_SIZE)
+        except ValueError:
+            return Response({"error": "batch_size must be a number"}, status=status.HTTP_400_BAD_REQUEST)
+
+        reader = importers.READERS[importers.detect_format(upload.name)]
+        try:
+            report = importers.import_students(reader(upload.file), enrolled_class, max(1, batch_size), request.user)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if report.stop_reason:
+            # Earlier batches are kept: say how far the import got
+            return Response({"error": report.stop_reason, **report.to_dict()}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report.to_dict(), status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='export', renderer_classes=[CSVRenderer, XLSXRenderer, JSONRenderer])
+    def export(self, request):
+        """
+        Download the register as CSV (streamed) or XLSX.
+        Query: ?format=csv|xlsx&campus=1&program=2&class=3&status=Active
+        """
+        params = request.query_params
+        try:
+            students = filter_students(
+                Student.objects.all(),
+                campus=params.get('campus'),
+                program=params.get('program'),
+                enrolled_class=params.get('class'),
+                status=params.get('status'),
+            )
+        except DjangoValidationError as e:
+            return Response({"error": e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+        rows = exporters.export_rows(students)
+
+        if request.accepted_renderer.format == 'xlsx':
+            try:
+                output = exporters.write_xlsx(rows)
+            except DjangoValidationError as e:
+                return Response({"error": e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+            return FileResponse(
+                output, as_attachment=True, filename='students.xlsx', content_type=XLSXRenderer.media_type
+            )
+
+        response = StreamingHttpResponse(exporters.stream_csv(rows), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = 'attachment; filename="students.csv"'
+        return response
+
+    @action(detail=False, methods=['get'], url_path='search')
+    def search(self, request):
+        """
+        Ranked search by name, father name, CNIC or mobile number.
+        Query: ?q=ali&campus=1&program=2&class=3&status=Active
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"error": "q is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        params = request.query_params
+        try:
+            queryset = filter_students(
+                self.get_queryset(),
+                campus=params.get('campus'),
+                program=params.get('program'),
+                enrolled_class=params.get('class'),
+                status=params.get('status'),
+            )
+        except DjangoValidationError as e:
+            return Response({"error": e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+        results = search_students(query, queryset)
+
+        page = self.paginate_queryset(results)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(results, many=True).data)
+
+    @action(detail=True, methods=['get'], url_path='history')
+    def history(self, request, pk=None):
+        """
+        Paginated enrollment history, most recent first.
+        """
+        student = self.get_object()
+        enrollments = (
+            StudentEnrollment.objects.filter(student=student)
+            .select_related(*ENROLLMENT_RELATED)
+            .order_by('-start_date', 'id')
+        )
+        page = self.paginate_queryset(enrollments)
+        if page is not None:
+            return self.get_paginated_response(StudentEnrollmentSerializer(page, many=True).data)
+        return Response(StudentEnrollmentSerializer(enrollments, many=True).data)
+
     @action(detail=True, methods=['post'], url_path='enroll')
     def enroll(self, request, pk=None):
         """
@@ -48,14 +365,42 @@ class StudentViewSet(viewsets.ModelViewSet):
         if not class_id:
             return Response({"error": "class_id is required"}, status=status.HTTP_400_BAD_REQUEST)
             
-        enrolled_class = get_object_or_404(Class, pk=class_id)
+        # Joined here so the response needs no further queries
+        enrolled_class = get_object_or_404(Class.objects.select_related('campus', 'program'), pk=class_id)
         
         try:
-            enrollment = services.enroll_student(student, enrolled_class)
+            enrollment = services.enroll_student(student, enrolled_class, request.user)
             return Response(StudentEnrollmentSerializer(enrollment).data, status=status.HTTP_201_CREATED)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post'], url_path='bulk-enroll')
+    def bulk_enroll(self, request):
+        """
+        Enroll many students in one class.
+        Expected Payload: { "class_id": 1, "student_ids": [1, 2, 3] }
+        """
+        class_id = request.data.get('class_id')
+        student_ids = request.data.get('student_ids')
+        if not class_id or not isinstance(student_ids, list) or not student_ids:
+            return Response({"error": "class_id and a non-empty student_ids list are required"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(student_ids) > BULK_ENROLL_LIMIT:
+            return Response({"error": f"At most {BULK_ENROLL_LIMIT} students per request"}, status=status.HTTP_400_BAD_REQUEST)
+
+        enrolled_class = get_object_or_404(Class, pk=class_id, is_active=True)
+        try:
+            outcome = services.enroll_students(student_ids, enrolled_class, request.user)
+        except (TypeError, ValueError):
+            return Response({"error": "student_ids must be numeric ids"}, status=status.HTTP_400_BAD_REQUEST)
+        except DjangoValidationError as e:
+            return Response({"error": e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = [{"student_id": student_id, "result": result} for student_id, result in outcome.items()]
+        return Response({
+            "enrolled": sum(1 for row in results if row['result'] == 'enrolled'),
+            "results": results,
+        }, status=status.HTTP_200_OK)
+
     @action(detail=True, methods=['post'], url_path='change-class')
     def change_class(self, request, pk=None):
         """
@@ -78,7 +423,7 @@ class StudentViewSet(viewsets.ModelViewSet):
         if not all([old_class_id, new_class_id, reason]):
             return Response({"error": "old_class_id, new_class_id, and reason are required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        new_class = get_object_or_404(Class, pk=new_class_id)
+        new_class = get_object_or_404(Class.objects.select_related('campus', 'program'), pk=new_class_id)
 
         try:
             enrollment = services.change_class(
@@ -114,9 +459,172 @@ class StudentViewSet(viewsets.ModelViewSet):
         services.deactivate_student(student, reason, request.user)
         return Response({"status": "Student deactivated successfully"}, status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=['post'], url_path='bulk-status')
+    def bulk_status(self, request):
+        """
+        Deactivate, reactivate or change the status of many students at once.
+        Expected Payload: {
+            "operation": "deactivate" | "reactivate" | "set_status",
+            "student_ids": [1, 2, 3]  or  "filter": {"campus": 1, "program": 2, "class": 3, "status": "Active"},
+            "reason": "Term ended" (deactivate),
+            "status": "Left" (set_status)
+        }
+        """
+        operation = request.data.get('operation')
+        student_ids = request.data.get('student_ids')
+        filters = request.data.get('filter')
+
+        if operation not in ('deactivate', 'reactivate', 'set_status'):
+            return Response({"error": "operation must be deactivate, reactivate or set_status"}, status=status.HTTP_400_BAD_REQUEST)
+        if operation == 'deactivate' and not request.data.get('reason'):
+            return Response({"error": "Reason is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if isinstance(student_ids, list) and student_ids:
+            if not all(isinstance(student_id, int) for student_id in student_ids):
+                return Response({"error": "student_ids must be numeric ids"}, status=status.HTTP_400_BAD_REQUEST)
+            students = Student.objects.filter(id__in=student_ids)
+        elif isinstance(filters, dict) and any(filters.values()):
+            try:
+                students = filter_students(
+                    Student.objects.all(),
+                    campus=filters.get('campus'),
+                    program=filters.get('program'),
+                    enrolled_class=filters.get('class'),
+                    status=filters.get('status'),
+                )
+            except DjangoValidationError as e:
+                return Response({"error": e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            return Response({"error": "student_ids or a non-empty filter is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            if operation == 'deactivate':
+                updated, closed = services.deactivate_students(students, request.data['reason'], request.user)
+                return Response({"updated": updated, "enrollments_closed": closed}, status=status.HTTP_200_OK)
+            if operation == 'reactivate':
+                updated = services.reactivate_students(students, request.user)
+            else:
+                updated = services.change_student_status(students, request.data.get('status'), request.user)
+        except DjangoValidationError as e:
+            return Response({"error": e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"updated": updated}, status=status.HTTP_200_OK)
+
+
+class SnapshotViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Precomputed monthly snapshots (see `manage.py build_snapshots`).
+    List query: ?month=2026-09&scope=class|campus|program&scope_id=3
+    """
+    # Scope, class and student names come from the models after the snapshots
+    cache_models = (MonthlySnapshot, MonthlyRosterEntry, Class, Campus, Program, Student)
+    queryset = MonthlySnapshot.objects.all()
+    serializer_class = MonthlySnapshotSerializer
+    permission_classes = [IsStaffUser]
+
+    SCOPE_MODELS = {'class': Class, 'campus': Campus, 'program': Program}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        if params.get('month'):
+            queryset = queryset.filter(month=self._month(params['month']))
+        if params.get('scope'):
+            queryset = queryset.filter(scope=params['scope'])
+        if params.get('scope_id'):
+            queryset = queryset.filter(scope_id=self._id('scope_id', params['scope_id']))
+        return queryset
+
+    def _month(self, value):
+        try:
+            return parse_month(value)
+        except ValueError:
+            raise ValidationError({"month": "Use the format YYYY-MM."})
+
+    def _id(self, name, value):
+        if not value.isdigit():
+            raise ValidationError({name: "Must be a numeric id."})
+        return int(value)
+
+    def get_serializer(self, *args, **kwargs):
+        # Resolve scope names for the page in one query per scope
+        if args and kwargs.get('many'):
+            page = list(args[0])
+            args = (page,) + args[1:]
+            names = {}
+            for scope, model in self.SCOPE_MODELS.items():
+                ids = {row.scope_id for row in page if row.scope == scope}
+                if ids:
+                    names.update({(scope, pk): name for pk, name in model.objects.filter(pk__in=ids).values_list('pk', 'name')})
+            kwargs.setdefault('context', self.get_serializer_context())['scope_names'] = names
+        return super().get_serializer(*args, **kwargs)
+
+    @action(detail=False, methods=['get'], url_path='roster')
+    def roster(self, request):
+        """
+        Who was in a class (or campus/program) during a month.
+        Query: ?month=2026-09&class=3 (or &campus=1 / &program=2)
+        """
+        params = request.query_params
+        if not params.get('month'):
+            return Response({"error": "month is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        entries = MonthlyRosterEntry.objects.filter(month=self._month(params['month']))
+        if params.get('class'):
+            entries = entries.filter(enrolled_class_id=self._id('class', params['class']))
+        if params.get('campus'):
+            entries = entries.filter(enrolled_class__campus_id=self._id('campus', params['campus']))
+        if params.get('program'):
+            entries = entries.filter(enrolled_class__program_id=self._id('program', params['program']))
+        entries = entries.select_related('student', 'enrolled_class', 'enrollment').order_by('student__name', 'id')
+
+        page = self.paginate_queryset(entries)
+        if page is not None:
+            return self.get_paginated_response(MonthlyRosterEntrySerializer(page, many=True).data)
+        return Response(MonthlyRosterEntrySerializer(entries, many=True).data)
+
+
+class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Audit trail, most recent first (written by students.audit).
+    Query: ?student=3&actor=1&action=deactivated&since=2026-09-01&until=2026-09-30
+    (`until` is exclusive for date-times; a bare date includes that day)
+    """
+    queryset = AuditLog.objects.select_related('student').only(
+        'id', 'timestamp', 'action', 'student_id', 'student__name', 'actor_id', 'actor_name', 'details'
+    )
+    serializer_class = AuditLogSerializer
+    permission_classes = [IsStaffUser]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        for name in ('student', 'actor'):
+            if params.get(name):
+                if not params[name].isdigit():
+                    raise ValidationError({name: "Must be a numeric id."})
+                queryset = queryset.filter(**{f'{name}_id': params[name]})
+        if params.get('action'):
+            queryset = queryset.filter(action=params['action'])
+        if params.get('since'):
+            queryset = queryset.filter(timestamp__gte=self._moment('since', params['since']))
+        if params.get('until'):
+            queryset = queryset.filter(timestamp__lt=self._moment('until', params['until']))
+        return queryset
+
+    def _moment(self, name, value):
+        # A bare date is the start of that day for `since`, the end of it for `until`
+        try:
+            moment = parse_datetime(value)
+            if moment is None:
+                day = parse_date(value)
+                if day is None:
+                    raise ValueError
+                moment = datetime.combine(day + timedelta(days=1 if name == 'until' else 0), time.min)
+        except ValueError:
+            raise ValidationError({name: "Use an ISO date or date-time."})
+        return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
 
 from rest_framework.views import APIView
-from django.db.models import Count, Q
 
 class DashboardStatsView(APIView):
     """
@@ -126,63 +634,42 @@ class DashboardStatsView(APIView):
     permission_classes = [IsStaffUser]
 
     def get(self, request):
-        # Student Stats
-        total_students = Student.objects.count()
-        active_students = Student.objects.filter(status='Active').count()
-        left_students = Student.objects.filter(status='Left').count()
-        
-        # Enrollment Stats
-        active_enrollments = StudentEnrollment.objects.filter(is_active=True).count()
-        
-        # Campus Stats with student counts
-        campus_stats = []
-        for campus in Campus.objects.filter(is_active=True):
-            student_count = StudentEnrollment.objects.filter(
-                enrolled_class__campus=campus,
-                is_active=True
-            ).values('student').distinct().count()
-            campus_stats.append({
-                "id": campus.id,
-                "name": campus.name,
-                "student_count": student_count,
-                "capacity": campus.capacity
-            })
-        
-        # Program Stats with student counts
-        program_stats = []
-        for program in Program.objects.filter(is_active=True):
-            student_count = StudentEnrollment.objects.filter(
-                enrolled_class__program=program,
-                is_active=True
-            ).values('student').distinct().count()
-            program_stats.append({
-                "id": program.id,
-                "name": program.name,
-                "student_count": student_count
-            })
-        
-        # Class count
-        total_classes = Class.objects.filter(is_active=True).count()
-        total_campuses = Campus.objects.filter(is_active=True).count()
-        total_programs = Program.objects.filter(is_active=True).count()
+        # The payload only changes when one of these models is written
+        etag = generation_etag('dashboard', models=[Student, StudentEnrollment, Campus, Program, Class])
+        if etag is None:
+            return Response(stats.dashboard_stats())
+        response = conditional_response(request, etag)
+        if response is not None:
+            return response
+        # Grouped aggregation, or the materialized counters when enabled
+        return set_validators(Response(stats.dashboard_stats()), etag)
 
-        return Response({
-            "students": {
-                "total": total_students,
-                "active": active_students,
-                "left": left_students
-            },
-            "enrollments": {
-                "active": active_enrollments
-            },
-            "counts": {
-                "classes": total_classes,
-                "campuses": total_campuses,
-                "programs": total_programs
-            },
-            "campus_breakdown": campus_stats,
-            "program_breakdown": program_stats
-        })
+class ReferenceDataView(APIView):
+    """
+    Active campuses, programs and classes in one versioned payload.
+    Send the version back as If-None-Match (the ETag) or ?version= to get a
+    304 while nothing has changed.
+    """
+    permission_classes = [IsStaffUser]
+
+    def get(self, request):
+        bundle = reference.reference_bundle()
+        etag = quote_etag(bundle['version'])
+        if request.query_params.get('version') == bundle['version']:
+            return set_validators(HttpResponseNotModified(), etag)
+        response = conditional_response(request, etag)
+        if response is not None:
+            return response
+        return set_validators(Response(bundle), etag)
+
+class CacheStatsView(APIView):
+    """
+    Hit/miss counters of the API response cache.
+    """
+    permission_classes = [IsStaffUser]
+
+    def get(self, request):
+        return Response(response_cache_stats())
 
 from rest_framework.permissions import IsAuthenticated
 
@@ -197,3 +684,28 @@ class UserMeView(APIView):
             "isStaff": request.user.is_staff
         })
 
+
+
+def _is_staff(request):
+    request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+    try:
+        return IsStaffUser().has_permission(request, None)
+    except APIException:
+        return False
+
+
+def metrics(request):
+    """
+    Request telemetry (config.middleware) in the Prometheus text format.
+    When settings.METRICS_TOKEN is set, scrapers must send it as a Bearer token.
+    Otherwise the endpoint is open only if settings.METRICS_PUBLIC (development);
+    in production it falls back to IsStaffUser with the API's authentication.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        allowed = constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    else:
+        allowed = getattr(settings, 'METRICS_PUBLIC', False) or _is_staff(request)
+    if not allowed:
+        return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
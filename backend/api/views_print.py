@@ -0,0 +1,150 @@
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.template.loader import get_template
+from django.utils import timezone
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.views import APIView
+
+from administration.models import Campus, Class
+from students.models import Student, StudentEnrollment
+from students.search import filter_students
+
+from api.permissions import IsStaffUser
+from api.renderers import HTMLPassthroughRenderer
+from api.serializers_student import ENROLLMENT_RELATED
+
+ROWS_PER_PAGE = 35
+PROFILES_PER_CHUNK = 50
+MAX_PROFILES = 2000
+
+
+def stream_pages(rows, page_template, per_page, context):
+    """
+    Render the document header, then one template render per printed page
+    of `rows`, then the footer. Rows are consumed lazily, so only one page
+    is held in memory at a time.
+    """
+    page = get_template(page_template)
+    yield get_template('api/print/header.html').render(context)
+
+    rows = iter(rows)
+    page_number = 1
+    while True:
+        chunk = list(islice(rows, per_page))
+        if not chunk:
+            break
+        yield page.render({
+            **context,
+            'rows': chunk,
+            'page_number': page_number,
+            'first_number': (page_number - 1) * per_page + 1,
+        })
+        page_number += 1
+
+    yield get_template('api/print/footer.html').render(context)
+
+
+def html_response(chunks):
+    return StreamingHttpResponse(chunks, content_type='text/html; charset=utf-8')
+
+
+def _roster(enrollments):
+    """
+    Active enrollments with student, class, campus and program joined in one
+    query, streamed from the database in chunks.
+    """
+    return (
+        enrollments.filter(is_active=True)
+        .select_related('student', *ENROLLMENT_RELATED)
+        .iterator(chunk_size=ROWS_PER_PAGE * 20)
+    )
+
+
+class PrintView(APIView):
+    permission_classes = [IsStaffUser]
+    renderer_classes = [HTMLPassthroughRenderer]
+
+    def context(self, **extra):
+        return {'printed_at': timezone.localtime(), **extra}
+
+
+class ClassRosterPrintView(PrintView):
+    """
+    Print-ready roster of one class.
+    """
+    def get(self, request, pk):
+        enrolled_class = get_object_or_404(Class.objects.select_related('campus', 'program'), pk=pk)
+        enrollments = StudentEnrollment.objects.filter(enrolled_class=enrolled_class).order_by('student__name', 'student_id')
+        context = self.context(
+            title=f"{enrolled_class.name} - Class Roster",
+            subtitle=f"{enrolled_class.campus.name} · {enrolled_class.program.name} · {enrolled_class.shift}",
+            show_class=False,
+        )
+        return html_response(stream_pages(_roster(enrollments), 'api/print/roster_page.html', ROWS_PER_PAGE, context))
+
+
+class CampusRegisterPrintView(PrintView):
+    """
+    Print-ready register of every active enrollment in a campus, grouped by class.
+    """
+    def get(self, request, pk):
+        campus = get_object_or_404(Campus, pk=pk)
+        enrollments = StudentEnrollment.objects.filter(enrolled_class__campus=campus).order_by(
+            'enrolled_class__name', 'enrolled_class_id', 'student__name', 'student_id'
+        )
+        context = self.context(
+            title=f"{campus.name} - Student Register",
+            subtitle=campus.location or campus.name,
+            show_class=True,
+        )
+        return html_response(stream_pages(_roster(enrollments), 'api/print/roster_page.html', ROWS_PER_PAGE, context))
+
+
+class StudentProfilesPrintView(PrintView):
+    """
+    Print-ready profiles, one student per page.
+    Query: ?ids=1,2,3 or ?campus=1&program=2&class=3&status=Active
+    A selection of more than MAX_PROFILES students is refused rather than
+    printed in part.
+    """
+    def get(self, request):
+        params = request.query_params
+        students = Student.objects.all()
+        if params.get('ids'):
+            try:
+                ids = [int(value) for value in params['ids'].split(',') if value.strip()]
+            except ValueError:
+                return Response({"error": "ids must be a comma-separated list of numbers"}, status=status.HTTP_400_BAD_REQUEST)
+            students = students.filter(id__in=ids)
+        try:
+            students = filter_students(
+                students,
+                campus=params.get('campus'),
+                program=params.get('program'),
+                enrolled_class=params.get('class'),
+                status=params.get('status'),
+            )
+        except ValidationError as e:
+            return Response({"error": e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+        selected = students.count()
+        if selected > MAX_PROFILES:
+            return Response(
+                {"error": f"{selected} students selected; at most {MAX_PROFILES} profiles can be printed at once. Narrow the filters.",
+                 "count": selected, "max": MAX_PROFILES},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        history = StudentEnrollment.objects.select_related(*ENROLLMENT_RELATED).order_by('-start_date', 'id')
+        students = (
+            students.order_by('name', 'id')
+            .prefetch_related(Prefetch('enrollments', queryset=history, to_attr='prefetched_history'))
+            .iterator(chunk_size=PROFILES_PER_CHUNK)
+        )
+        context = self.context(title="Student Profiles")
+        return html_response(stream_pages(students, 'api/print/profile_page.html', 1, context))
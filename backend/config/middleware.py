@@ -0,0 +1,142 @@
+"""
+Per-request performance telemetry.
+
+TelemetryMiddleware measures every request: total time, the number and
+duration of database queries (through connection.execute_wrapper) and the
+time spent rendering the response body (the renderer's JSON, CSV or HTML
+encoding). Serializers build their data inside the view, so that time
+counts toward the total, not the render time. The figures go to the client
+in a Server-Timing header and into in-process histograms, exposed at
+/api/metrics in the Prometheus text format.
+
+The cost per request is a few perf_counter() calls, one wrapper call per
+query and a short locked update of the histograms. Each worker process
+keeps its own histograms, as prometheus_client does outside multiprocess
+mode; Prometheus sums them across scrape targets.
+"""
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connection
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+class Histogram:
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.series = {}  # labels -> [per-bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def reset(self):
+        with self._lock:
+            self.series.clear()
+
+    def render(self, label_names):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = {labels: list(values) for labels, values in self.series.items()}
+        for labels, values in sorted(series.items()):
+            base = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(label_names, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), values[:-1]):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{base}}} {values[-1]:.6f}')
+            lines.append(f'{self.name}_count{{{base}}} {cumulative}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+LABELS = ('view', 'method', 'status')
+REQUEST_SECONDS = Histogram('http_request_duration_seconds', "Total time spent handling the request.", SECONDS_BUCKETS)
+DB_SECONDS = Histogram('http_request_db_seconds', "Time spent in database queries.", SECONDS_BUCKETS)
+DB_QUERIES = Histogram('http_request_db_queries', "Database queries per request.", QUERY_BUCKETS)
+RENDER_SECONDS = Histogram('http_request_render_seconds', "Time spent rendering the response body (after the view returned).", SECONDS_BUCKETS)
+HISTOGRAMS = (REQUEST_SECONDS, DB_SECONDS, DB_QUERIES, RENDER_SECONDS)
+
+
+def render_metrics():
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render(LABELS))
+    return '\n'.join(lines) + '\n'
+
+
+class QueryTimer:
+    """
+    connection.execute_wrapper hook counting queries and their time.
+    """
+    __slots__ = ('count', 'duration')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += perf_counter() - start
+            self.count += 1
+
+
+class TelemetryMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'TELEMETRY_ENABLED', True)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        start = perf_counter()
+        queries = QueryTimer()
+        request._telemetry_render = [0.0, 0.0]
+        with connection.execute_wrapper(queries):
+            response = self.get_response(request)
+        total = perf_counter() - start
+        render = max(request._telemetry_render[1] - request._telemetry_render[0], 0.0)
+
+        match = getattr(request, 'resolver_match', None)
+        labels = (match.view_name if match else 'unresolved', request.method, str(response.status_code))
+        REQUEST_SECONDS.observe(labels, total)
+        DB_SECONDS.observe(labels, queries.duration)
+        DB_QUERIES.observe(labels, queries.count)
+        RENDER_SECONDS.observe(labels, render)
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={queries.duration * 1000:.1f};desc="{queries.count} queries"',
+            f'render;dur={render * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+        return response
+
+    def process_template_response(self, request, response):
+        # Called right before render(); the callback runs right after it
+        if hasattr(request, '_telemetry_render'):
+            request._telemetry_render[0] = perf_counter()
+
+            def rendered(response):
+                request._telemetry_render[1] = perf_counter()
+
+            response.add_post_render_callback(rendered)
+        return response
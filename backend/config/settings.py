@@ -25,6 +25,7 @@ SECRET_KEY = 'django-insecure-$f1v83f4vde3zlpiq(*b1mukav@6_!j6dhoio!p%__zf+sa!8=
 # SECURITY WARNING: don't run with debug turned on in production!
 import os
 import dj_database_url
+from corsheaders.defaults import default_headers
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = 'PROD' not in os.environ
@@ -63,6 +64,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'config.middleware.TelemetryMiddleware',  # First, so it times everything below
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware', # Add WhiteNoise
     'corsheaders.middleware.CorsMiddleware',
@@ -146,6 +148,9 @@ if not DEBUG:
 
 # CORS Settings
 CORS_ALLOW_ALL_ORIGINS = True  # For development only
+# Conditional requests (api.conditional)
+CORS_ALLOW_HEADERS = (*default_headers, 'if-match', 'if-none-match')
+CORS_EXPOSE_HEADERS = ['ETag', 'Last-Modified', 'Server-Timing']
 # In production, you would restrict this:
 # if not DEBUG:
 #    CORS_ALLOWED_ORIGINS = [
@@ -161,11 +166,59 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication that trusts the token's role claims (no user query)
+        'api.authentication.ClaimsJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
 }
 
+# Caches: in-process by default; set CACHE_DIR to share entries between
+# workers through the filesystem without any external service
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+if os.environ.get('CACHE_DIR'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ['CACHE_DIR'],
+    }
+
+# JWT role claims (api.authentication): 'auto' trusts them only when the
+# cache is shared between workers (not locmem), 'true' always (a single
+# worker), 'false' never (every request loads the user)
+JWT_TRUST_CLAIMS = os.environ.get('JWT_TRUST_CLAIMS', 'auto').lower()
+
+# API response cache (api.cache); a timeout of 0 disables it. Entries and
+# the generations that invalidate them live in that cache, so a per-process
+# locmem cache would let other workers serve stale data: off by default
+# unless CACHE_DIR shares it (set API_CACHE_TIMEOUT with a single worker)
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = int(os.environ.get('API_CACHE_TIMEOUT', 300 if os.environ.get('CACHE_DIR') else 0))
+
+# Dashboard: read from materialized StatCounter rows kept current by the
+# service layer (run `manage.py rebuild_stats` once after enabling)
+DASHBOARD_COUNTERS = os.environ.get('DASHBOARD_COUNTERS', '').lower() in ('1', 'true', 'yes')
+
+# Class capacity: 'off', 'soft' (log and allow) or 'hard' (refuse enrollments
+# into a full class). Run `manage.py reconcile_occupancy` after enabling
+CLASS_CAPACITY_ENFORCEMENT = os.environ.get('CLASS_CAPACITY_ENFORCEMENT', 'off').lower()
+
+# Request telemetry (config.middleware): Server-Timing headers and
+# Prometheus histograms at /api/metrics, protected by METRICS_TOKEN if set.
+# Without a token the endpoint is only public in development; in production
+# (PROD) it then needs a staff user's credentials
+TELEMETRY_ENABLED = os.environ.get('TELEMETRY_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_PUBLIC = DEBUG
+
+# Audit trail (students.audit): entries are written in batches of up to
+# this many after the change commits
+AUDIT_BATCH_SIZE = int(os.environ.get('AUDIT_BATCH_SIZE', 500))
+
 # JWT Settings
 from datetime import timedelta
 SIMPLE_JWT = {
@@ -0,0 +1,93 @@
+"""
+Per-model generation counters kept in the cache.
+
+Every write to a model bumps its generation. Cache keys that embed the
+generations of the models they depend on therefore go stale on their own,
+without having to track and delete individual entries.
+
+Saves and deletes of TimeStampedModel subclasses are picked up through
+signals (see CoreConfig.ready). Code that writes with QuerySet.update()
+or bulk_create() must call bump() itself.
+
+The counters are only as shared as the cache: with the per-process locmem
+backend, writes made by other workers or by management commands never
+reach this process's counters. Features that must not serve stale data
+check `is_shared()` first.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+
+
+# Cache backends each process keeps to itself
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+def get_cache():
+    return caches[getattr(settings, 'API_CACHE_ALIAS', 'default')]
+
+
+def is_shared():
+    """
+    Whether every worker process (and management command) sees the same counters.
+    """
+    return not isinstance(get_cache(), PROCESS_LOCAL_CACHES)
+
+
+def _key(model):
+    return f'gen:{model._meta.label_lower}'
+
+
+def _seed():
+    # A missing counter (evicted or never set) restarts from the clock,
+    # never from a value that could match an older cache entry
+    return time.time_ns()
+
+
+def get_generations(models):
+    """
+    Return {model label: generation} for the given models in one cache round trip.
+    """
+    cache = get_cache()
+    keys = {_key(model): model for model in models}
+    found = cache.get_many(list(keys))
+    for key in keys.keys() - found.keys():
+        cache.add(key, _seed(), None)
+        found[key] = cache.get(key)
+    return {keys[key]._meta.label_lower: found[key] for key in sorted(keys)}
+
+
+def _bump(models):
+    cache = get_cache()
+    for model in models:
+        try:
+            cache.incr(_key(model))
+        except ValueError:
+            cache.add(_key(model), _seed(), None)
+
+
+def bump(*models):
+    """
+    Invalidate everything derived from these models. Bumped immediately (so
+    reads later in this transaction miss) and again after commit (so a
+    concurrent read that cached pre-commit data under the new generation is
+    discarded too).
+    """
+    _bump(models)
+    transaction.on_commit(lambda: _bump(models))
+
+
+def _on_change(sender, **kwargs):
+    from core.models import TimeStampedModel
+    if issubclass(sender, TimeStampedModel):
+        bump(sender)
+
+
+def connect_signals():
+    post_save.connect(_on_change, dispatch_uid='core.generations.post_save')
+    post_delete.connect(_on_change, dispatch_uid='core.generations.post_delete')
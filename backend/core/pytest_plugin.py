@@ -0,0 +1,42 @@
+"""
+pytest plugin for query budgets (core.query_budget), registered in conftest.py.
+
+    @pytest.mark.query_budget(6)
+    def test_list(api_client, ...):
+        api_client.get("/api/students/")
+
+fails if any request made by the test runs more than 6 queries or repeats
+one query shape N_PLUS_ONE_THRESHOLD times. `query_budget(n_plus_one=0)`
+turns the N+1 check off; fixture setup is never counted. The
+`query_recorder` fixture gives direct access to the recorded queries.
+"""
+import pytest
+
+from core.query_budget import N_PLUS_ONE_THRESHOLD, QueryRecorder, check_requests
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers',
+        'query_budget(max_queries=None, n_plus_one=5): limit the queries per request made by the test',
+    )
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker('query_budget')
+    if marker is None:
+        return (yield)
+
+    max_queries = marker.args[0] if marker.args else marker.kwargs.get('max_queries')
+    n_plus_one = marker.kwargs.get('n_plus_one', N_PLUS_ONE_THRESHOLD)
+    with QueryRecorder() as recorder:
+        result = yield  # a failing test raises here and skips the check
+    check_requests(recorder, max_queries, n_plus_one)
+    return result
+
+
+@pytest.fixture
+def query_recorder():
+    with QueryRecorder() as recorder:
+        yield recorder
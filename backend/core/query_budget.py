@@ -0,0 +1,192 @@
+"""
+Query budgets and N+1 detection for tests.
+
+QueryRecorder records every query (with the stack that issued it) and groups
+them per request handled through the test client. From that:
+
+- `check_budget()` fails when a request runs more queries than its budget,
+  or repeats one query shape (same SQL, different parameters) often enough
+  to look like an N+1.
+- `assert_scales()` runs a request against a small and a large data set
+  and fails unless the query count is the same for both (and within the
+  budget, if one is given).
+
+Failures are QueryBudgetExceeded (an AssertionError) with the offending
+queries and the project frames of their stack traces.
+"""
+import re
+import traceback
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter
+
+from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.db import connections
+
+N_PLUS_ONE_THRESHOLD = 5
+SCALE_SIZES = (10, 1000)
+# Transaction bookkeeping, not work a view asked for
+IGNORED_PREFIXES = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT', 'BEGIN', 'COMMIT')
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'IN \((?:\?,\s*)*\?\)')
+
+
+def query_shape(sql):
+    """
+    SQL with literals and placeholders collapsed, so queries that differ only
+    in their parameters (or IN-list lengths) compare equal.
+    """
+    shape = _STRING.sub('?', sql).replace('%s', '?')
+    shape = _NUMBER.sub('?', shape)
+    return _IN_LIST.sub('IN (...)', shape)
+
+
+def _project_frames():
+    root = str(Path(settings.BASE_DIR).resolve())
+    here = str(Path(__file__).resolve())
+    return [
+        frame for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(root) and frame.filename != here and 'site-packages' not in frame.filename
+    ]
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@dataclass
+class RecordedQuery:
+    sql: str
+    duration: float
+    stack: list = field(default_factory=list)
+
+    @property
+    def shape(self):
+        return query_shape(self.sql)
+
+
+@dataclass
+class RecordedRequest:
+    path: str
+    queries: list = field(default_factory=list)
+
+
+class QueryRecorder:
+    """
+    Context manager recording the queries run on one database connection.
+    `queries` holds all of them; `requests` groups those issued while the
+    test client was handling a request.
+    """
+    def __init__(self, using='default', capture_stacks=True):
+        self.connection = connections[using]
+        self.capture_stacks = capture_stacks
+        self.queries = []
+        self.requests = []
+        self._current = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if not sql.lstrip().upper().startswith(IGNORED_PREFIXES):
+                query = RecordedQuery(sql, perf_counter() - start, _project_frames() if self.capture_stacks else [])
+                self.queries.append(query)
+                if self._current is not None:
+                    self._current.queries.append(query)
+
+    def _request_started(self, environ=None, **kwargs):
+        self._current = RecordedRequest((environ or {}).get('PATH_INFO', ''))
+        self.requests.append(self._current)
+
+    def _request_finished(self, **kwargs):
+        self._current = None
+
+    def __enter__(self):
+        self._wrapper = self.connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        request_started.connect(self._request_started)
+        request_finished.connect(self._request_finished)
+        return self
+
+    def __exit__(self, *exc_info):
+        request_started.disconnect(self._request_started)
+        request_finished.disconnect(self._request_finished)
+        self._wrapper.__exit__(*exc_info)
+
+    def __len__(self):
+        return len(self.queries)
+
+
+def repeated_shapes(queries, threshold=N_PLUS_ONE_THRESHOLD):
+    """
+    {shape: [queries]} for every shape run at least `threshold` times.
+    """
+    counts = Counter(query.shape for query in queries)
+    return {
+        shape: [query for query in queries if query.shape == shape]
+        for shape, count in counts.items() if count >= threshold
+    }
+
+
+def format_queries(queries, limit=20):
+    lines = []
+    for number, query in enumerate(queries[:limit], start=1):
+        lines.append(f"{number}. {query.sql}")
+        lines.extend(f"     {frame.filename}:{frame.lineno} in {frame.name}" for frame in query.stack[-6:])
+    if len(queries) > limit:
+        lines.append(f"... and {len(queries) - limit} more")
+    return '\n'.join(lines)
+
+
+def check_budget(queries, max_queries=None, n_plus_one=N_PLUS_ONE_THRESHOLD, label='block'):
+    """
+    Raise QueryBudgetExceeded if `queries` break the budget or contain an N+1.
+    """
+    if max_queries is not None and len(queries) > max_queries:
+        raise QueryBudgetExceeded(
+            f"{label} ran {len(queries)} queries, budget is {max_queries}:\n{format_queries(queries)}"
+        )
+    if n_plus_one:
+        for shape, repeats in repeated_shapes(queries, n_plus_one).items():
+            raise QueryBudgetExceeded(
+                f"{label} repeated one query {len(repeats)} times (possible N+1):\n{format_queries(repeats, limit=3)}"
+            )
+
+
+def check_requests(recorder, max_queries=None, n_plus_one=N_PLUS_ONE_THRESHOLD):
+    """
+    Check every request the recorder saw; with no requests, the whole block.
+    """
+    if not recorder.requests:
+        check_budget(recorder.queries, max_queries, n_plus_one)
+    for request in recorder.requests:
+        check_budget(request.queries, max_queries, n_plus_one, label=f"Request to {request.path}")
+
+
+def assert_scales(make_request, grow_to, sizes=SCALE_SIZES, max_queries=None, n_plus_one=N_PLUS_ONE_THRESHOLD):
+    """
+    Call `grow_to(size)` (bring the data set up to `size` rows) and then
+    `make_request()` for each size. Fails unless every run issues the same
+    number of queries, within `max_queries` when given. Returns the count.
+    """
+    runs = []
+    for size in sizes:
+        grow_to(size)
+        with QueryRecorder() as recorder:
+            make_request()
+        check_budget(recorder.queries, max_queries, n_plus_one, label=f"Run with {size} rows")
+        runs.append((size, recorder.queries))
+
+    counts = {size: len(queries) for size, queries in runs}
+    if len(set(counts.values())) > 1:
+        largest = max(runs, key=lambda run: len(run[1]))[1]
+        repeats = [query for queries in repeated_shapes(largest, 2).values() for query in queries]
+        raise QueryBudgetExceeded(
+            f"Query count grows with the data: {counts}\n{format_queries(repeats or largest, limit=5)}"
+        )
+    return len(runs[0][1])
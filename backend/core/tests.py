@@ -1,3 +1,45 @@
-from django.test import TestCase
+import pytest
+from django.contrib.auth.models import User
 
-# Create your tests here.
+from core.query_budget import (
+    QueryBudgetExceeded, QueryRecorder, assert_scales, check_requests, query_shape
+)
+
+
+def test_query_shape_ignores_parameters():
+    assert query_shape("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x'") == \
+        query_shape("SELECT * FROM t WHERE id IN (%s) AND name = 'y'")
+
+
+@pytest.mark.django_db
+def test_n_plus_one_is_reported_with_its_stack():
+    users = [User.objects.create_user(f'user{i}') for i in range(6)]
+    with QueryRecorder() as recorder:
+        for user in users:
+            User.objects.get(pk=user.pk)
+
+    with pytest.raises(QueryBudgetExceeded) as failure:
+        check_requests(recorder)
+    assert "repeated one query 6 times" in str(failure.value)
+    assert "core/tests.py" in str(failure.value)
+    check_requests(recorder, n_plus_one=0)
+
+
+@pytest.mark.django_db
+def test_budget_and_scaling():
+    def grow_to(size):
+        User.objects.bulk_create([User(username=f'u{n}') for n in range(User.objects.count(), size)])
+
+    assert assert_scales(lambda: list(User.objects.all()), grow_to, sizes=(3, 30)) == 1
+
+    with pytest.raises(QueryBudgetExceeded, match="grows with the data"):
+        assert_scales(lambda: [User.objects.get(pk=u.pk) for u in User.objects.all()], grow_to, sizes=(40, 41), n_plus_one=0)
+
+    with pytest.raises(QueryBudgetExceeded, match="budget is 0"):
+        assert_scales(lambda: list(User.objects.all()), grow_to, sizes=(3,), max_queries=0)
+
+
+@pytest.mark.django_db
+@pytest.mark.query_budget(2)
+def test_marker_checks_each_request(client):
+    client.get('/api/auth/me/')
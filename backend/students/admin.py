@@ -1,5 +1,13 @@
-from django.contrib import admin
-from .models import Student, StudentEnrollment
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from .models import Student, StudentEnrollment, AuditLog
+from .search import search_students
+from . import services
+
+
+class StudentActionForm(ActionForm):
+    reason = forms.CharField(required=False, label="Reason")
 
 class StudentEnrollmentInline(admin.TabularInline):
     """Inline view of enrollments on Student page"""
@@ -16,6 +24,28 @@ class StudentAdmin(admin.ModelAdmin):
     ordering = ('-admission_date',)
     readonly_fields = ('admission_date', 'created_at', 'updated_at')  # admission_date is auto_now_add
     inlines = [StudentEnrollmentInline]
+    action_form = StudentActionForm
+    actions = ['deactivate_selected', 'reactivate_selected']
+
+    @admin.action(description="Deactivate selected students (enter a reason)")
+    def deactivate_selected(self, request, queryset):
+        reason = request.POST.get('reason', '').strip()
+        if not reason:
+            self.message_user(request, "Enter a reason to deactivate students.", messages.ERROR)
+            return
+        updated, closed = services.deactivate_students(queryset, reason, request.user)
+        self.message_user(request, f"Deactivated {updated} students and closed {closed} enrollments.")
+
+    @admin.action(description="Reactivate selected students")
+    def reactivate_selected(self, request, queryset):
+        updated = services.reactivate_students(queryset, request.user)
+        self.message_user(request, f"Reactivated {updated} students.")
+
+    def get_search_results(self, request, queryset, search_term):
+        # Use the indexed search keys instead of icontains over four columns
+        if not search_term.strip():
+            return queryset, False
+        return queryset.filter(id__in=search_students(search_term).values('id')), False
     
     fieldsets = (
         ('ذاتی معلومات', {
@@ -37,3 +67,22 @@ class StudentEnrollmentAdmin(admin.ModelAdmin):
     search_fields = ('student__name', 'enrolled_class__name')
     ordering = ('-start_date',)
     readonly_fields = ('start_date', 'end_date')
+
+
+@admin.register(AuditLog)
+class AuditLogAdmin(admin.ModelAdmin):
+    """Read-only: entries are written by students.audit"""
+    list_display = ('timestamp', 'action', 'student', 'actor_name')
+    list_filter = ('action', 'timestamp')
+    list_select_related = ('student',)
+    search_fields = ('actor_name', 'student__name')
+    date_hierarchy = 'timestamp'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
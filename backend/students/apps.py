@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class StudentsConfig(AppConfig):
     name = 'students'
+
+    def ready(self):
+        from students import audit
+        audit.connect_signals()
@@ -0,0 +1,114 @@
+"""
+Audit trail.
+
+The service layer and the API call `record()` (`record_many()` and
+`record_each()` for bulk changes) as they change students. Nothing is
+written at that point: each entry is queued with transaction.on_commit,
+so a rolled-back change leaves no entry, and the committed entries
+collect in a per-thread buffer. The buffer is written
+with one bulk_create when the request finishes (after the response has been
+handed to the server), when it reaches settings.AUDIT_BATCH_SIZE entries,
+or straight after the commit outside a request (management commands, shell).
+
+Entries buffered in a worker that dies before flushing are lost; auditing
+never fails or slows down the change it describes.
+"""
+import logging
+import threading
+from functools import partial
+
+from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from students.models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+def batch_size():
+    return getattr(settings, 'AUDIT_BATCH_SIZE', 500)
+
+
+def _actor(user):
+    # Works for User and for the token-backed ClaimsUser alike
+    if user is None or not getattr(user, 'is_authenticated', False):
+        return None, ''
+    return user.id, str(user)
+
+
+def record_each(action, details_by_student, user=None):
+    """
+    Queue one `action` entry per student with its own details:
+    {student_id: {...}}.
+    """
+    actor_id, actor_name = _actor(user)
+    now = timezone.now()
+    entries = [
+        AuditLog(timestamp=now, action=action, student_id=student_id, actor_id=actor_id, actor_name=actor_name, details=details)
+        for student_id, details in details_by_student.items()
+    ]
+    if entries:
+        transaction.on_commit(partial(_enqueue, entries))
+
+
+def record_many(action, student_ids, user=None, **details):
+    """
+    Queue one `action` entry per student, all with the same details.
+    """
+    record_each(action, {student_id: details for student_id in student_ids}, user)
+
+
+def record(action, student, user=None, **details):
+    record_each(action, {getattr(student, 'pk', student): details}, user)
+
+
+def _buffer():
+    buffer = getattr(_local, 'buffer', None)
+    if buffer is None:
+        buffer = _local.buffer = []
+    return buffer
+
+
+def _enqueue(entries):
+    buffer = _buffer()
+    buffer.extend(entries)
+    if not getattr(_local, 'in_request', False) or len(buffer) >= batch_size():
+        flush()
+
+
+def pending():
+    return len(_buffer())
+
+
+def flush():
+    """
+    Write the buffered entries. Returns how many were written.
+    """
+    entries = _buffer()
+    if not entries:
+        return 0
+    _local.buffer = []
+    try:
+        AuditLog.objects.bulk_create(entries, batch_size=batch_size())
+    except DatabaseError:
+        logger.exception("Could not write %d audit log entries", len(entries))
+        return 0
+    return len(entries)
+
+
+def _request_started(**kwargs):
+    _local.in_request = True
+
+
+def _request_finished(**kwargs):
+    _local.in_request = False
+    flush()
+
+
+def connect_signals():
+    request_started.connect(_request_started, dispatch_uid='students.audit.request_started')
+    request_finished.connect(_request_finished, dispatch_uid='students.audit.request_finished')
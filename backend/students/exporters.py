@@ -0,0 +1,87 @@
+"""
+Flat exports of the student register.
+
+`export_rows()` yields one row per student with the current class, campus,
+program and shift flattened into columns. Students are read with a chunked
+.iterator() (a server-side cursor on PostgreSQL) and active enrollments are
+prefetched per chunk, so memory stays flat for any register size.
+"""
+import csv
+import tempfile
+
+from django.core.exceptions import ValidationError
+from django.db.models import Prefetch
+
+from students.models import StudentEnrollment
+
+CHUNK_SIZE = 2000
+
+HEADER = [
+    'ID', 'Name', 'Father Name', 'CNIC', 'Mobile Number', 'Address',
+    'Admission Date', 'Status', 'Class', 'Campus', 'Program', 'Shift',
+]
+STUDENT_FIELDS = ['id', 'name', 'father_name', 'cnic', 'mobile_number', 'address', 'admission_date', 'status']
+
+
+def export_rows(queryset, chunk_size=CHUNK_SIZE):
+    active = (
+        StudentEnrollment.objects.filter(is_active=True)
+        .select_related('enrolled_class__campus', 'enrolled_class__program')
+        .only(
+            'student_id', 'enrolled_class__name', 'enrolled_class__shift',
+            'enrolled_class__campus__name', 'enrolled_class__program__name',
+        )
+        .order_by('id')
+    )
+    students = (
+        queryset.only(*STUDENT_FIELDS)
+        .order_by('name', 'id')
+        .prefetch_related(Prefetch('enrollments', queryset=active, to_attr='export_enrollments'))
+    )
+
+    yield HEADER
+    for student in students.iterator(chunk_size=chunk_size):
+        classes = [enrollment.enrolled_class for enrollment in student.export_enrollments]
+        yield [
+            student.id, student.name, student.father_name, student.cnic or '', student.mobile_number,
+            student.address, student.admission_date.isoformat(), student.status,
+            '; '.join(c.name for c in classes),
+            '; '.join(c.campus.name for c in classes),
+            '; '.join(c.program.name for c in classes),
+            '; '.join(c.shift for c in classes),
+        ]
+
+
+class _Echo:
+    """File-like object whose write() returns the line instead of storing it."""
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    # BOM so Excel opens the UTF-8 (Urdu) text correctly
+    yield '\ufeff'
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_xlsx(rows):
+    """
+    Write rows to a temporary XLSX file and return it rewound. openpyxl's
+    write-only mode keeps memory flat, but the zip container must be
+    complete before the first byte can be sent.
+    """
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ValidationError("XLSX export requires the 'openpyxl' package.")
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Students")
+    for row in rows:
+        sheet.append(row)
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return output
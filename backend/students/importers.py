@@ -0,0 +1,191 @@
+"""
+Streaming bulk import of students from CSV or XLSX.
+
+Rows are read one at a time, validated with the model's own field rules
+(phone_validator, cnic_validator, max lengths, choices) and written with
+bulk_create in batches, optionally enrolling every new student into one
+class, and recorded in the audit trail per batch. Memory use depends on
+the batch size, not the file size.
+"""
+import csv
+import io
+from dataclasses import dataclass, field
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from core import generations
+from students.models import Student, StudentEnrollment, StudentSearchKey
+from students.search import build_keys
+from students import audit, stats, occupancy
+
+COLUMNS = ('name', 'father_name', 'mobile_number', 'cnic', 'address', 'status', 'remarks')
+REQUIRED_COLUMNS = ('name', 'father_name', 'mobile_number')
+DEFAULT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+
+def _header(value):
+    return str(value or '').strip().lower().replace(' ', '_')
+
+
+def read_csv(fileobj):
+    """
+    Yield (line number, row dict) from a CSV file opened in text or binary mode.
+    """
+    if not isinstance(fileobj, io.TextIOBase):
+        fileobj = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    reader = csv.reader(fileobj)
+    header = [_header(column) for column in next(reader, [])]
+    for line, values in enumerate(reader, start=2):
+        if any(value.strip() for value in values):
+            yield line, dict(zip(header, values))
+
+
+def read_xlsx(fileobj):
+    """
+    Yield (row number, row dict) from the first sheet of an XLSX workbook.
+    Requires openpyxl.
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValidationError("XLSX import requires the 'openpyxl' package.")
+
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [_header(column) for column in next(rows, ())]
+        for line, values in enumerate(rows, start=2):
+            values = ['' if value is None else str(value) for value in values]
+            if any(value.strip() for value in values):
+                yield line, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+READERS = {
+    'csv': read_csv,
+    'xlsx': read_xlsx,
+}
+
+
+def detect_format(filename):
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    return extension if extension in READERS else 'csv'
+
+
+@dataclass
+class ImportReport:
+    created: int = 0
+    enrolled: int = 0
+    error_count: int = 0
+    errors: list = field(default_factory=list)
+    # Set when a batch could not be written and the import stopped there
+    stopped_at_row: int = None
+    stop_reason: str = ''
+
+    def add_error(self, line, messages):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": line, "errors": messages})
+
+    def to_dict(self):
+        return {
+            "created": self.created,
+            "enrolled": self.enrolled,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "errors_truncated": self.error_count > len(self.errors),
+            "stopped_at_row": self.stopped_at_row,
+            "stop_reason": self.stop_reason,
+        }
+
+
+def build_student(row):
+    """
+    Return an unsaved, validated Student for a row, or raise ValidationError.
+    """
+    values = {column: (row.get(column) or '').strip() for column in COLUMNS}
+    missing = {column: ["This field is required."] for column in REQUIRED_COLUMNS if not values[column]}
+    if missing:
+        raise ValidationError(missing)
+
+    student = Student(
+        name=values['name'],
+        father_name=values['father_name'],
+        mobile_number=values['mobile_number'],
+        cnic=values['cnic'] or None,
+        address=values['address'],
+        status=values['status'] or 'Active',
+        remarks=values['remarks'],
+    )
+    # Field-level rules only: Student has no unique fields, so no queries
+    student.clean_fields(exclude=['admission_date'])
+    return student
+
+
+def import_students(rows, enrolled_class=None, batch_size=DEFAULT_BATCH_SIZE, user=None):
+    """
+    Import (line number, row dict) pairs. Invalid rows are reported and
+    skipped; valid rows are written batch by batch, each in its own transaction.
+    A batch that cannot be written (the class is full under hard capacity
+    enforcement) stops the import: earlier batches are kept and the report
+    says from which row nothing was imported.
+    """
+    report = ImportReport()
+    batch = []
+    first_line = None
+    for line, row in rows:
+        try:
+            student = build_student(row)
+        except ValidationError as e:
+            report.add_error(line, e.message_dict if hasattr(e, 'error_dict') else e.messages)
+            continue
+        if not batch:
+            first_line = line
+        batch.append(student)
+        if len(batch) >= batch_size:
+            if not _write(batch, first_line, enrolled_class, report, user):
+                return report
+            batch = []
+    if batch:
+        _write(batch, first_line, enrolled_class, report, user)
+    return report
+
+
+def _write(students, first_line, enrolled_class, report, user):
+    try:
+        _write_batch(students, enrolled_class, report, user)
+    except ValidationError as e:
+        report.stopped_at_row = first_line
+        report.stop_reason = e.messages[0]
+        return False
+    return True
+
+
+@transaction.atomic
+def _write_batch(students, enrolled_class, report, user=None):
+    students = Student.objects.bulk_create(students)
+    StudentSearchKey.objects.bulk_create([key for student in students for key in build_keys(student)])
+
+    for status in {student.status for student in students}:
+        stats.students_added(status, sum(1 for student in students if student.status == status))
+
+    if enrolled_class is not None:
+        occupancy.occupy(enrolled_class.id, len(students))
+        StudentEnrollment.objects.bulk_create([
+            StudentEnrollment(student=student, enrolled_class=enrolled_class)
+            for student in students
+        ])
+        stats.enrollments_changed([(student.pk, enrolled_class.id, 1) for student in students])
+
+    generations.bump(Student, StudentEnrollment)
+    student_ids = [student.pk for student in students]
+    audit.record_many('created', student_ids, user, source='import')
+    if enrolled_class is not None:
+        audit.record_many('enrolled', student_ids, user, class_id=enrolled_class.id)
+    # Counted once nothing can roll the batch back
+    report.created += len(students)
+    if enrolled_class is not None:
+        report.enrolled += len(students)
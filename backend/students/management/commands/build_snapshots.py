@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from students import snapshots
+
+
+class Command(BaseCommand):
+    help = "Build monthly enrollment snapshots (rosters and counts) incrementally."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help="Build only this month (YYYY-MM).")
+        parser.add_argument('--rebuild', action='store_true', help="Drop all snapshots and rebuild from the start.")
+
+    def handle(self, *args, **options):
+        if options['month']:
+            try:
+                month = snapshots.parse_month(options['month'])
+            except ValueError:
+                raise CommandError("--month must look like YYYY-MM.")
+            built = [(month, snapshots.build_month(month))]
+        else:
+            built = snapshots.build_snapshots(rebuild=options['rebuild'])
+
+        for month, entries in built:
+            self.stdout.write(f"{month:%Y-%m}: {entries} roster entries")
+        self.stdout.write(self.style.SUCCESS(f"Built {len(built)} month(s)."))
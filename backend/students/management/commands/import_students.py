@@ -0,0 +1,38 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from administration.models import Class
+from students import importers
+
+
+class Command(BaseCommand):
+    help = "Bulk import students from a CSV or XLSX file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--class-id', type=int, help="Enroll every imported student in this class.")
+        parser.add_argument('--batch-size', type=int, default=importers.DEFAULT_BATCH_SIZE)
+        parser.add_argument('--format', choices=sorted(importers.READERS), help="Defaults to the file extension.")
+
+    def handle(self, *args, **options):
+        enrolled_class = None
+        if options['class_id']:
+            try:
+                enrolled_class = Class.objects.get(pk=options['class_id'])
+            except Class.DoesNotExist:
+                raise CommandError(f"Class {options['class_id']} does not exist.")
+
+        reader = importers.READERS[options['format'] or importers.detect_format(options['path'])]
+        try:
+            with open(options['path'], 'rb') as fileobj:
+                report = importers.import_students(reader(fileobj), enrolled_class, max(1, options['batch_size']))
+        except (OSError, ValidationError) as e:
+            raise CommandError(str(e))
+
+        for error in report.errors:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        if report.error_count > len(report.errors):
+            self.stderr.write(f"... and {report.error_count - len(report.errors)} more errors")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {report.created} students, enrolled {report.enrolled}, skipped {report.error_count} rows."
+        ))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from students import stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the materialized dashboard counters from the source tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help="Only report counters that have drifted; exit with an error if any have.",
+        )
+
+    def handle(self, *args, **options):
+        drift = stats.check_counters()
+        for key, (stored, actual) in drift.items():
+            self.stdout.write(f"{key}: stored={stored} actual={actual}")
+
+        if options['check']:
+            if drift:
+                raise CommandError(f"{len(drift)} counter(s) out of date.")
+            self.stdout.write(self.style.SUCCESS("Counters are consistent."))
+            return
+
+        counters = stats.rebuild_counters()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(counters)} counters."))
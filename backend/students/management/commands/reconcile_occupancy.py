@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from students import occupancy
+
+
+class Command(BaseCommand):
+    help = "Recompute each class's active_count from its active enrollments."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help="Only report classes whose count has drifted; exit with an error if any have.",
+        )
+
+    def handle(self, *args, **options):
+        drift = occupancy.check_occupancy() if options['check'] else occupancy.reconcile()
+        for class_id, (stored, actual) in sorted(drift.items()):
+            self.stdout.write(f"class {class_id}: stored={stored} actual={actual}")
+
+        if options['check']:
+            if drift:
+                raise CommandError(f"{len(drift)} class count(s) out of date.")
+            self.stdout.write(self.style.SUCCESS("Class counts are consistent."))
+            return
+        self.stdout.write(self.style.SUCCESS(f"Fixed {len(drift)} class count(s)."))
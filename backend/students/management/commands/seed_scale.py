@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from students import seeding
+
+
+class Command(BaseCommand):
+    help = "Generate deterministic synthetic campuses, classes, students and enrollment histories."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=100_000)
+        parser.add_argument('--campuses', type=int, default=5)
+        parser.add_argument('--programs', type=int, default=6)
+        parser.add_argument('--classes-per-offering', type=int, default=3, help="Classes per campus and program.")
+        parser.add_argument('--years', type=int, default=3, help="How far back enrollment histories go.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--no-snapshots', action='store_true', help="Skip rebuilding the monthly snapshots.")
+
+    def handle(self, *args, **options):
+        if min(options['students'], options['campuses'], options['programs'], options['classes_per_offering'], options['years']) < 1:
+            raise CommandError("Counts must be at least 1.")
+
+        report = seeding.seed(
+            students=options['students'],
+            campuses=options['campuses'],
+            programs=options['programs'],
+            classes_per_offering=options['classes_per_offering'],
+            years=options['years'],
+            seed=options['seed'],
+            batch_size=max(1, options['batch_size']),
+            build_snapshots=not options['no_snapshots'],
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {report.students} students and {report.enrollments} enrollments "
+            f"in {report.classes} classes."
+        ))
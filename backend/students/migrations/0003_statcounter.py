@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0002_studentenrollment_progress_studentenrollment_status_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True, verbose_name='Key')),
+                ('value', models.BigIntegerField(default=0, verbose_name='Value')),
+            ],
+            options={
+                'verbose_name': 'Statistics Counter',
+                'verbose_name_plural': 'Statistics Counters',
+            },
+        ),
+    ]
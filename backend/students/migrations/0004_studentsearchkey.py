@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def index_existing_students(apps, schema_editor):
+    from students.search import build_keys
+
+    Student = apps.get_model('students', 'Student')
+    StudentSearchKey = apps.get_model('students', 'StudentSearchKey')
+    keys = []
+    for student in Student.objects.only('id', 'name', 'father_name', 'cnic', 'mobile_number').iterator(chunk_size=2000):
+        keys.extend(
+            StudentSearchKey(student_id=key.student_id, kind=key.kind, key=key.key)
+            for key in build_keys(student)
+        )
+        if len(keys) >= 5000:
+            StudentSearchKey.objects.bulk_create(keys)
+            keys = []
+    StudentSearchKey.objects.bulk_create(keys)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0003_statcounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentSearchKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('name', 'Name token'), ('father', 'Father name token'), ('cnic', 'CNIC digits'), ('mobile', 'Mobile digits')], max_length=10)),
+                ('key', models.CharField(max_length=255)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_keys', to='students.student')),
+            ],
+            options={
+                'verbose_name': 'Student Search Key',
+                'verbose_name_plural': 'Student Search Keys',
+                'indexes': [models.Index(fields=['kind', 'key'], name='student_search_kind_key', opclasses=['varchar_pattern_ops', 'varchar_pattern_ops'])],
+            },
+        ),
+        migrations.RunPython(index_existing_students, migrations.RunPython.noop),
+    ]
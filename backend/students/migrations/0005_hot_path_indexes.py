@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administration', '0002_hot_path_indexes'),
+        ('students', '0004_studentsearchkey'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['name', 'id'], name='student_name_id'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['status', 'name', 'id'], name='student_status_name_id'),
+        ),
+        migrations.AddIndex(
+            model_name='studentenrollment',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['student', 'enrolled_class'], name='enrollment_active_student'),
+        ),
+        migrations.AddIndex(
+            model_name='studentenrollment',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['enrolled_class', 'student'], name='enrollment_active_class'),
+        ),
+        migrations.AddIndex(
+            model_name='studentenrollment',
+            index=models.Index(fields=['student', '-start_date', 'id'], name='enrollment_student_history'),
+        ),
+    ]
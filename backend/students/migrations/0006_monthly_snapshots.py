@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administration', '0002_hot_path_indexes'),
+        ('students', '0005_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyRosterEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Month')),
+            ],
+            options={
+                'verbose_name': 'Monthly Roster Entry',
+                'verbose_name_plural': 'Monthly Roster Entries',
+            },
+        ),
+        migrations.CreateModel(
+            name='MonthlySnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Month')),
+                ('scope', models.CharField(choices=[('class', 'Class'), ('campus', 'Campus'), ('program', 'Program')], max_length=10, verbose_name='Scope')),
+                ('scope_id', models.BigIntegerField(verbose_name='Scope ID')),
+                ('student_count', models.PositiveIntegerField(default=0, verbose_name='Students')),
+                ('joined_count', models.PositiveIntegerField(default=0, verbose_name='Joined')),
+                ('left_count', models.PositiveIntegerField(default=0, verbose_name='Left')),
+                ('built_at', models.DateTimeField(auto_now=True, verbose_name='Built At')),
+            ],
+            options={
+                'verbose_name': 'Monthly Snapshot',
+                'verbose_name_plural': 'Monthly Snapshots',
+                'ordering': ['-month', 'scope', 'scope_id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='studentenrollment',
+            index=models.Index(fields=['start_date'], name='enrollment_start_date'),
+        ),
+        migrations.AddIndex(
+            model_name='studentenrollment',
+            index=models.Index(fields=['end_date'], name='enrollment_end_date'),
+        ),
+        migrations.AddField(
+            model_name='monthlyrosterentry',
+            name='enrolled_class',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='administration.class'),
+        ),
+        migrations.AddField(
+            model_name='monthlyrosterentry',
+            name='enrollment',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='students.studentenrollment'),
+        ),
+        migrations.AddField(
+            model_name='monthlyrosterentry',
+            name='student',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='students.student'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlysnapshot',
+            constraint=models.UniqueConstraint(fields=('month', 'scope', 'scope_id'), name='unique_monthly_snapshot'),
+        ),
+        migrations.AddIndex(
+            model_name='monthlyrosterentry',
+            index=models.Index(fields=['month', 'enrolled_class', 'student'], name='roster_month_class'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlyrosterentry',
+            constraint=models.UniqueConstraint(fields=('month', 'enrollment'), name='unique_roster_entry_per_month'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:16
+
+from django.db import migrations, models
+from django.db.models import Count, F
+
+
+def close_duplicate_enrollments(apps, schema_editor):
+    """
+    Keep the most recent active enrollment per (student, class) and close
+    the rest, so the constraint can be created.
+    """
+    StudentEnrollment = apps.get_model('students', 'StudentEnrollment')
+    Class = apps.get_model('administration', 'Class')
+    duplicates = (
+        StudentEnrollment.objects.filter(is_active=True)
+        .values_list('student_id', 'enrolled_class_id').annotate(n=Count('id')).filter(n__gt=1).order_by()
+    )
+    for student_id, class_id, n in duplicates:
+        active = StudentEnrollment.objects.filter(student_id=student_id, enrolled_class_id=class_id, is_active=True)
+        keep = active.order_by('-start_date', '-id').values_list('id', flat=True).first()
+        active.exclude(id=keep).update(is_active=False, end_date=F('start_date'), status='Transferred')
+        Class.objects.filter(pk=class_id).update(active_count=F('active_count') - (n - 1))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administration', '0003_class_active_count'),
+        ('students', '0006_monthly_snapshots'),
+    ]
+
+    operations = [
+        migrations.RunPython(close_duplicate_enrollments, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='studentenrollment',
+            name='enrollment_active_student',
+        ),
+        migrations.AddConstraint(
+            model_name='studentenrollment',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('student', 'enrolled_class'), name='unique_active_enrollment'),
+        ),
+    ]
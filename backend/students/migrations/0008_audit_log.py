@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:31
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0007_unique_active_enrollment'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Time')),
+                ('action', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted'), ('enrolled', 'Enrolled'), ('class_changed', 'Class changed'), ('promoted', 'Promoted'), ('deactivated', 'Deactivated'), ('status_changed', 'Status changed')], max_length=20, verbose_name='Action')),
+                ('actor_name', models.CharField(blank=True, max_length=150, verbose_name='Actor Name')),
+                ('details', models.JSONField(blank=True, default=dict, verbose_name='Details')),
+                ('actor', models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Actor')),
+                ('student', models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='audit_entries', to='students.student', verbose_name='Student')),
+            ],
+            options={
+                'verbose_name': 'Audit Log Entry',
+                'verbose_name_plural': 'Audit Log',
+                'ordering': ['-timestamp', '-id'],
+                'indexes': [models.Index(fields=['student', 'timestamp', 'id'], name='audit_student_time'), models.Index(fields=['actor', 'timestamp', 'id'], name='audit_actor_time'), models.Index(fields=['timestamp', 'id'], name='audit_time')],
+            },
+        ),
+    ]
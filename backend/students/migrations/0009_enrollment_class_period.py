@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administration', '0003_class_active_count'),
+        ('students', '0008_audit_log'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studentenrollment',
+            index=models.Index(fields=['enrolled_class', 'start_date', 'end_date'], name='enrollment_class_period'),
+        ),
+    ]
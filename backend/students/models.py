@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.db import models
 from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from core.models import TimeStampedModel
 from administration.models import Class
@@ -49,10 +51,24 @@ class Student(TimeStampedModel):
         verbose_name = _("Student")
         verbose_name_plural = _("Students")
         ordering = ['name']
+        indexes = [
+            # Default ordering and keyset pagination
+            models.Index(fields=['name', 'id'], name='student_name_id'),
+            models.Index(fields=['status', 'name', 'id'], name='student_status_name_id'),
+        ]
 
     def __str__(self):
         return f"{self.name} s/o {self.father_name}"
 
+    SEARCH_FIELDS = {'name', 'father_name', 'cnic', 'mobile_number'}
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or self.SEARCH_FIELDS & set(update_fields):
+            from students.search import index_students
+            index_students([self])
+
     def soft_delete(self):
         """Standard deactivation instead of deletion"""
         self.status = 'Left'
@@ -83,9 +99,183 @@ class StudentEnrollment(TimeStampedModel):
         verbose_name = _("Student Enrollment")
         verbose_name_plural = _("Student Enrollments")
         ordering = ['-start_date']
+        indexes = [
+            # Class rosters and dashboard breakdowns
+            models.Index(
+                fields=['enrolled_class', 'student'],
+                condition=models.Q(is_active=True),
+                name='enrollment_active_class',
+            ),
+            # Per-student history, most recent first
+            models.Index(fields=['student', '-start_date', 'id'], name='enrollment_student_history'),
+            # Point-in-time rosters: who was in a class on a date (students.rosters)
+            models.Index(fields=['enrolled_class', 'start_date', 'end_date'], name='enrollment_class_period'),
+            # Joined/left in a month (students.snapshots)
+            models.Index(fields=['start_date'], name='enrollment_start_date'),
+            models.Index(fields=['end_date'], name='enrollment_end_date'),
+        ]
+        constraints = [
+            # One active enrollment per student per class; enroll_student
+            # relies on this instead of checking first
+            models.UniqueConstraint(
+                fields=['student', 'enrolled_class'],
+                condition=models.Q(is_active=True),
+                name='unique_active_enrollment',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.student.name} -> {self.enrolled_class.name} ({self.status})"
 
     # Removed clean method restriction to allow multiple enrollments as per user request
     # def clean(self): ...
+
+
+class StatCounter(models.Model):
+    """
+    Materialized dashboard counter (e.g. 'students:total', 'campus:3').
+    Maintained by students.stats when settings.DASHBOARD_COUNTERS is on.
+    """
+    key = models.CharField(max_length=64, unique=True, verbose_name=_("Key"))
+    value = models.BigIntegerField(default=0, verbose_name=_("Value"))
+
+    class Meta:
+        verbose_name = _("Statistics Counter")
+        verbose_name_plural = _("Statistics Counters")
+
+    def __str__(self):
+        return f"{self.key} = {self.value}"
+
+
+class StudentSearchKey(models.Model):
+    """
+    Normalized lookup keys for a student, maintained by students.search.
+    Name tokens are lowercased and whitespace-collapsed; CNIC and mobile
+    keys are digits only, so exact and prefix lookups are index seeks.
+    """
+    KIND_CHOICES = [
+        ('name', _('Name token')),
+        ('father', _('Father name token')),
+        ('cnic', _('CNIC digits')),
+        ('mobile', _('Mobile digits')),
+    ]
+
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='search_keys')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    key = models.CharField(max_length=255)
+
+    class Meta:
+        verbose_name = _("Student Search Key")
+        verbose_name_plural = _("Student Search Keys")
+        indexes = [
+            # varchar_pattern_ops lets PostgreSQL serve LIKE 'prefix%' from the index;
+            # other backends ignore opclasses
+            models.Index(
+                fields=['kind', 'key'],
+                name='student_search_kind_key',
+                opclasses=['varchar_pattern_ops', 'varchar_pattern_ops'],
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.key}"
+
+
+class MonthlyRosterEntry(models.Model):
+    """
+    One enrollment that was open at some point during `month` (stored as the
+    first day of the month). Built by students.snapshots.
+    """
+    month = models.DateField(verbose_name=_("Month"))
+    enrollment = models.ForeignKey(StudentEnrollment, on_delete=models.CASCADE, related_name='+')
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='+')
+    enrolled_class = models.ForeignKey(Class, on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        verbose_name = _("Monthly Roster Entry")
+        verbose_name_plural = _("Monthly Roster Entries")
+        constraints = [
+            models.UniqueConstraint(fields=['month', 'enrollment'], name='unique_roster_entry_per_month'),
+        ]
+        indexes = [
+            models.Index(fields=['month', 'enrolled_class', 'student'], name='roster_month_class'),
+        ]
+
+    def __str__(self):
+        return f"{self.month:%Y-%m}: {self.student_id} in {self.enrolled_class_id}"
+
+
+class MonthlySnapshot(models.Model):
+    """
+    Precomputed monthly counts per class, campus or program.
+    """
+    SCOPE_CHOICES = [
+        ('class', _('Class')),
+        ('campus', _('Campus')),
+        ('program', _('Program')),
+    ]
+
+    month = models.DateField(verbose_name=_("Month"))
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES, verbose_name=_("Scope"))
+    scope_id = models.BigIntegerField(verbose_name=_("Scope ID"))
+    student_count = models.PositiveIntegerField(default=0, verbose_name=_("Students"))
+    joined_count = models.PositiveIntegerField(default=0, verbose_name=_("Joined"))
+    left_count = models.PositiveIntegerField(default=0, verbose_name=_("Left"))
+    built_at = models.DateTimeField(auto_now=True, verbose_name=_("Built At"))
+
+    class Meta:
+        verbose_name = _("Monthly Snapshot")
+        verbose_name_plural = _("Monthly Snapshots")
+        ordering = ['-month', 'scope', 'scope_id']
+        constraints = [
+            models.UniqueConstraint(fields=['month', 'scope', 'scope_id'], name='unique_monthly_snapshot'),
+        ]
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} {self.scope} {self.scope_id}: {self.student_count}"
+
+
+class AuditLog(models.Model):
+    """
+    Who did what to which student, and when. Written in batches by
+    students.audit after the change commits; never updated.
+
+    The student and actor columns carry no database constraint, so entries
+    outlive the rows they describe; the composite indexes cover both.
+    """
+    ACTION_CHOICES = [
+        ('created', _('Created')),
+        ('updated', _('Updated')),
+        ('deleted', _('Deleted')),
+        ('enrolled', _('Enrolled')),
+        ('class_changed', _('Class changed')),
+        ('promoted', _('Promoted')),
+        ('deactivated', _('Deactivated')),
+        ('status_changed', _('Status changed')),
+    ]
+
+    timestamp = models.DateTimeField(default=timezone.now, verbose_name=_("Time"))
+    action = models.CharField(max_length=20, choices=ACTION_CHOICES, verbose_name=_("Action"))
+    student = models.ForeignKey(
+        Student, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, null=True, blank=True,
+        related_name='audit_entries', verbose_name=_("Student")
+    )
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, null=True, blank=True,
+        related_name='+', verbose_name=_("Actor")
+    )
+    actor_name = models.CharField(max_length=150, blank=True, verbose_name=_("Actor Name"))
+    details = models.JSONField(default=dict, blank=True, verbose_name=_("Details"))
+
+    class Meta:
+        verbose_name = _("Audit Log Entry")
+        verbose_name_plural = _("Audit Log")
+        ordering = ['-timestamp', '-id']
+        indexes = [
+            models.Index(fields=['student', 'timestamp', 'id'], name='audit_student_time'),
+            models.Index(fields=['actor', 'timestamp', 'id'], name='audit_actor_time'),
+            models.Index(fields=['timestamp', 'id'], name='audit_time'),
+        ]
+
+    def __str__(self):
+        return f"{self.timestamp:%Y-%m-%d %H:%M} {self.actor_name or '-'} {self.action} {self.student_id}"
@@ -0,0 +1,116 @@
+"""
+Class occupancy.
+
+`Class.active_count` holds the number of active enrollments in the class and
+is kept current by the service layer with single-row F() updates, so reading
+"23/30" needs no aggregate query. settings.CLASS_CAPACITY_ENFORCEMENT picks
+what happens when a class is full:
+
+- 'off':  no check.
+- 'soft': the enrollment goes through and a warning is logged.
+- 'hard': the enrollment is refused. The check is part of the UPDATE
+          (active_count + n <= capacity), so it only locks the class row
+          being filled and never serializes writes to other classes.
+
+`reconcile()` recomputes every count from the enrollments.
+"""
+import logging
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from administration.models import Class
+from core import generations
+from students.models import StudentEnrollment
+
+logger = logging.getLogger(__name__)
+
+ENFORCEMENT_MODES = ('off', 'soft', 'hard')
+
+
+def enforcement():
+    mode = getattr(settings, 'CLASS_CAPACITY_ENFORCEMENT', 'off')
+    return mode if mode in ENFORCEMENT_MODES else 'off'
+
+
+def occupy(class_id, count=1):
+    """
+    Take `count` places in a class. Raises ValidationError when the class
+    is full and enforcement is 'hard'.
+    """
+    if count <= 0:
+        return
+    classes = Class.objects.filter(pk=class_id)
+    increment = {'active_count': F('active_count') + count, 'updated_at': timezone.now()}
+
+    if enforcement() == 'hard':
+        if not classes.filter(active_count__lte=F('capacity') - count).update(**increment):
+            enrolled_class = classes.values('name', 'active_count', 'capacity').first()
+            if enrolled_class is not None:
+                raise ValidationError(
+                    f"{enrolled_class['name']} is full ({enrolled_class['active_count']}/{enrolled_class['capacity']})."
+                )
+    else:
+        classes.update(**increment)
+        if enforcement() == 'soft' and classes.filter(active_count__gt=F('capacity')).exists():
+            logger.warning("Class %s is over capacity after enrolling %s student(s).", class_id, count)
+    generations.bump(Class)
+
+
+def release(counts):
+    """
+    Give back places: `counts` is {class_id: number of enrollments closed}.
+    One UPDATE per distinct count.
+    """
+    by_count = {}
+    for class_id, count in counts.items():
+        if count > 0:
+            by_count.setdefault(count, []).append(class_id)
+    for count, class_ids in by_count.items():
+        Class.objects.filter(pk__in=class_ids).update(
+            active_count=Greatest(F('active_count') - count, Value(0)),
+            updated_at=timezone.now(),
+        )
+    if by_count:
+        generations.bump(Class)
+
+
+def count_by_class(class_ids):
+    counts = {}
+    for class_id in class_ids:
+        counts[class_id] = counts.get(class_id, 0) + 1
+    return counts
+
+
+# --- Consistency -------------------------------------------------------------
+
+def _actual_count():
+    active = (
+        StudentEnrollment.objects.filter(enrolled_class=OuterRef('pk'), is_active=True)
+        .order_by().values('enrolled_class').annotate(n=Count('id')).values('n')
+    )
+    return Coalesce(Subquery(active, output_field=IntegerField()), 0)
+
+
+def check_occupancy():
+    """
+    Return {class_id: (stored, actual)} for every class whose count has drifted.
+    """
+    drifted = Class.objects.annotate(actual=_actual_count()).exclude(active_count=F('actual'))
+    return {pk: (stored, actual) for pk, stored, actual in drifted.values_list('pk', 'active_count', 'actual')}
+
+
+@transaction.atomic
+def reconcile():
+    """
+    Recompute every class's count with one UPDATE. Returns the drift that was fixed.
+    """
+    drift = check_occupancy()
+    if drift:
+        Class.objects.filter(pk__in=drift).update(active_count=_actual_count(), updated_at=timezone.now())
+        generations.bump(Class)
+    return drift
@@ -0,0 +1,47 @@
+"""
+Class rosters read from the enrollment history.
+
+An enrollment is open from its start_date through its end_date (both days
+included); an active enrollment has no end. `roster_as_of()` answers "who
+was in class X (or campus / program X) on day D" with one range query on
+the `enrollment_class_period` index, however many years of history exist.
+"""
+from django.db.models import Q
+
+from students.models import StudentEnrollment
+
+ROSTER_SCOPES = {
+    'class': 'enrolled_class_id',
+    'campus': 'enrolled_class__campus_id',
+    'program': 'enrolled_class__program_id',
+}
+# Columns the roster serializer renders
+ROSTER_FIELDS = (
+    'id', 'student_id', 'enrolled_class_id', 'start_date', 'end_date', 'status', 'is_active',
+    'student__name', 'student__father_name', 'enrolled_class__name',
+)
+
+
+def open_between(first, last):
+    """
+    Enrollments open at some point from `first` to `last`. Closed enrollments
+    without an end_date (legacy rows) are treated as ended before any date.
+    """
+    return Q(start_date__lte=last) & (Q(end_date__isnull=True, is_active=True) | Q(end_date__gte=first))
+
+
+def open_on(day):
+    return open_between(day, day)
+
+
+def roster_as_of(day, scope, scope_id):
+    """
+    Enrollments open on `day` in one class, campus or program (see
+    ROSTER_SCOPES), ordered by student name.
+    """
+    return (
+        StudentEnrollment.objects.filter(open_on(day), **{ROSTER_SCOPES[scope]: scope_id})
+        .select_related('student', 'enrolled_class')
+        .only(*ROSTER_FIELDS)
+        .order_by('student__name', 'id')
+    )
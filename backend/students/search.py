@@ -0,0 +1,143 @@
+"""
+Indexed student search.
+
+Each student has StudentSearchKey rows: lowercased name and father-name
+tokens, plus digits-only CNIC and mobile keys. Searches are answered from
+the (kind, key) index: digits match CNIC/mobile exactly or by prefix,
+words match name tokens by prefix.
+"""
+import re
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Case, Exists, IntegerField, OuterRef, Q, Value, When
+
+from students.models import Student, StudentEnrollment, StudentSearchKey
+
+NAME_KINDS = ('name', 'father')
+NUMBER_KINDS = ('cnic', 'mobile')
+MIN_NUMBER_PREFIX = 4
+
+
+def name_tokens(value):
+    """
+    Lowercase, whitespace-collapsed words: "  Muhammad  ALI " -> ['muhammad', 'ali'].
+    """
+    return (value or '').casefold().split()
+
+
+def digits_only(value):
+    return re.sub(r'\D', '', value or '')
+
+
+def mobile_key(value):
+    """
+    Digits in national form, so '+92-300-1234567' and '03001234567' share a key.
+    """
+    digits = digits_only(value)
+    if digits.startswith('92') and len(digits) == 12:
+        return '0' + digits[2:]
+    return digits
+
+
+def build_keys(student):
+    keys = {('name', token) for token in name_tokens(student.name)}
+    keys |= {('father', token) for token in name_tokens(student.father_name)}
+    if digits_only(student.cnic):
+        keys.add(('cnic', digits_only(student.cnic)))
+    if mobile_key(student.mobile_number):
+        keys.add(('mobile', mobile_key(student.mobile_number)))
+    return [
+        StudentSearchKey(student_id=student.pk, kind=kind, key=key[:255])
+        for kind, key in sorted(keys)
+    ]
+
+
+def index_students(students, batch_size=1000):
+    """
+    Replace the search keys of the given (saved) students.
+    """
+    students = list(students)
+    if not students:
+        return
+    StudentSearchKey.objects.filter(student_id__in=[s.pk for s in students]).delete()
+    keys = [key for student in students for key in build_keys(student)]
+    StudentSearchKey.objects.bulk_create(keys, batch_size=batch_size)
+
+
+def _prefix(prefix):
+    condition = Q(key__startswith=prefix)
+    if connection.vendor == 'sqlite':
+        # SQLite's LIKE is case-insensitive and cannot use a BINARY index;
+        # the equivalent range turns the lookup into an index seek
+        condition &= Q(key__gte=prefix, key__lt=prefix + '\uffff')
+    return condition
+
+
+def _matching(kinds, condition):
+    return StudentSearchKey.objects.filter(condition, kind__in=kinds).values('student_id')
+
+
+def _is_number(token):
+    return bool(digits_only(token)) and not re.search(r'[^\W\d_]', token)
+
+
+def _has_key(kinds, keys):
+    return Exists(StudentSearchKey.objects.filter(student_id=OuterRef('pk'), kind__in=kinds, key__in=keys))
+
+
+def search_students(query, queryset=None):
+    """
+    Students matching every word and number in `query`, annotated with
+    `rank` (exact matches first) and ordered by rank, name, id.
+    """
+    queryset = Student.objects.all() if queryset is None else queryset
+    tokens = name_tokens(query)
+    words = [token for token in tokens if not _is_number(token)]
+    number = ''.join(digits_only(token) for token in tokens if _is_number(token))
+
+    if not words and len(number) < MIN_NUMBER_PREFIX:
+        return queryset.none()
+
+    rank = Value(0, output_field=IntegerField())
+    for word in words:
+        queryset = queryset.filter(id__in=_matching(NAME_KINDS, _prefix(word)))
+        rank = rank + Case(When(_has_key(NAME_KINDS, [word]), then=1), default=0)
+
+    if number:
+        # '92300...' should also find mobiles stored as '0300...'
+        numbers = sorted({number, '0' + number[2:] if number.startswith('92') else number})
+        prefix_match = Q()
+        for value in numbers:
+            prefix_match |= _prefix(value)
+        queryset = queryset.filter(id__in=_matching(NUMBER_KINDS, prefix_match))
+        rank = rank + Case(When(_has_key(NUMBER_KINDS, numbers), then=10), default=0)
+
+    return queryset.annotate(rank=rank).order_by('-rank', 'name', 'id')
+
+
+def _filter_id(name, value):
+    if not str(value).isdigit():
+        raise ValidationError(f"{name} must be a numeric id.")
+    return int(value)
+
+
+def filter_students(queryset, campus=None, program=None, enrolled_class=None, status=None):
+    """
+    Narrow students to those actively enrolled in the given campus, program
+    and/or class, and to a status. Uses a subquery so students are never duplicated.
+    Raises ValidationError for an id that is not a number.
+    """
+    enrollment_filter = {}
+    if campus:
+        enrollment_filter['enrolled_class__campus_id'] = _filter_id('campus', campus)
+    if program:
+        enrollment_filter['enrolled_class__program_id'] = _filter_id('program', program)
+    if enrolled_class:
+        enrollment_filter['enrolled_class_id'] = _filter_id('class', enrolled_class)
+    if enrollment_filter:
+        enrolled = StudentEnrollment.objects.filter(is_active=True, **enrollment_filter)
+        queryset = queryset.filter(id__in=enrolled.values('student_id'))
+    if status:
+        queryset = queryset.filter(status=status)
+    return queryset
@@ -0,0 +1,189 @@
+"""
+Deterministic synthetic data at production scale.
+
+`seed(...)` creates campuses, programs, classes and students with
+multi-year enrollment histories: each student moves through one to four
+classes, every closed enrollment ends the day the next one starts, and
+some students leave. Everything is written with bulk_create in batches,
+with a 'created' audit entry per student; the same seed always produces
+the same data. Afterwards the derived data (dashboard counters, class
+occupancy, monthly snapshots) is rebuilt and the cache generations are
+bumped.
+"""
+import random
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from administration.models import Campus, Program, Class
+from core import generations
+from students.models import Student, StudentEnrollment, StudentSearchKey, MonthlyRosterEntry, MonthlySnapshot
+from students.search import build_keys
+from students import audit, stats, occupancy, snapshots
+
+FIRST_NAMES = (
+    'Muhammad', 'Ahmed', 'Ali', 'Hassan', 'Hussain', 'Umar', 'Usman', 'Bilal', 'Hamza', 'Abdullah',
+    'Ibrahim', 'Yusuf', 'Zaid', 'Saad', 'Talha', 'Fahad', 'Imran', 'Kashif', 'Noman', 'Rehan',
+    'Fatima', 'Ayesha', 'Maryam', 'Zainab', 'Khadija', 'Hafsa', 'Sana', 'Amna', 'Iqra', 'Rabia',
+)
+LAST_NAMES = (
+    'Khan', 'Ahmed', 'Ali', 'Qureshi', 'Siddiqui', 'Sheikh', 'Butt', 'Malik', 'Chaudhry', 'Raza',
+    'Hashmi', 'Farooqi', 'Abbasi', 'Mirza', 'Baig', 'Iqbal', 'Javed', 'Akhtar', 'Anwar', 'Shah',
+)
+CITIES = ('Karachi', 'Lahore', 'Islamabad', 'Rawalpindi', 'Faisalabad', 'Multan', 'Peshawar', 'Quetta')
+PROGRAMS = ('Nazra', 'Hifz', 'Tajweed', 'Dars-e-Nizami', 'Qirat', 'Arabic Language', 'Tafseer', 'Hadith')
+SHIFTS = [value for value, _ in Class.SHIFT_CHOICES]
+
+
+@dataclass
+class SeedReport:
+    campuses: int = 0
+    programs: int = 0
+    classes: int = 0
+    students: int = 0
+    enrollments: int = 0
+
+
+@contextmanager
+def explicit_dates(*fields):
+    """
+    Let bulk_create keep the given auto_now_add dates instead of stamping today.
+    """
+    saved = [(f, f.auto_now_add) for f in fields]
+    try:
+        for f, _ in saved:
+            f.auto_now_add = False
+        yield
+    finally:
+        for f, auto_now_add in saved:
+            f.auto_now_add = auto_now_add
+
+
+def _get_or_bulk_create(model, objects, unique_fields):
+    model.objects.bulk_create(objects, ignore_conflicts=True)
+    lookup = {tuple(getattr(obj, name) for name in unique_fields) for obj in objects}
+    existing = model.objects.all()
+    return [obj for obj in existing if tuple(getattr(obj, name) for name in unique_fields) in lookup]
+
+
+def _names(preset, count, fallback):
+    return list(preset[:count]) if count <= len(preset) else [f"{fallback} {n:02d}" for n in range(1, count + 1)]
+
+
+def create_structure(rng, campuses, programs, classes_per_offering):
+    campus_objects = _get_or_bulk_create(Campus, [
+        Campus(name=f"{name} Campus", location=f"{rng.randint(1, 99)} Main Road, {name}", capacity=rng.randrange(500, 3000, 100))
+        for name in _names(CITIES, campuses, 'City')
+    ], ['name'])
+    program_objects = _get_or_bulk_create(Program, [
+        Program(name=name) for name in _names(PROGRAMS, programs, 'Program')
+    ], ['name'])
+
+    class_objects = _get_or_bulk_create(Class, [
+        Class(
+            name=f"{program.name} {letter}", campus=campus, program=program,
+            shift=SHIFTS[index % len(SHIFTS)], capacity=rng.choice((25, 30, 35, 40)),
+        )
+        for campus in sorted(campus_objects, key=lambda c: c.name)
+        for program in sorted(program_objects, key=lambda p: p.name)
+        for index, letter in enumerate('ABCDEFGHIJ'[:classes_per_offering])
+    ], ['name', 'campus_id', 'program_id', 'shift'])
+    return campus_objects, program_objects, class_objects
+
+
+def _student(rng, admission_date):
+    first, father = rng.choice(FIRST_NAMES), rng.choice(FIRST_NAMES[:20])
+    last = rng.choice(LAST_NAMES)
+    cnic = None
+    if rng.random() < 0.7:
+        cnic = f"{rng.randint(10000, 99999)}-{rng.randint(1000000, 9999999)}-{rng.randint(0, 9)}"
+    return Student(
+        name=f"{first} {last}",
+        father_name=f"{father} {last}",
+        mobile_number=f"03{rng.randint(0, 49):02d}-{rng.randint(1000000, 9999999)}",
+        cnic=cnic,
+        address=f"House {rng.randint(1, 999)}, {rng.choice(CITIES)}",
+        admission_date=admission_date,
+    )
+
+
+def _history(rng, today, years):
+    """
+    [(start, end or None)] for one student, oldest first.
+    """
+    start = today - timedelta(days=rng.randint(0, 365 * years))
+    periods = []
+    for _ in range(rng.choice((1, 1, 2, 2, 3, 4))):
+        periods.append(start)
+        start += timedelta(days=rng.randint(120, 540))
+        if start >= today:
+            break
+    ends = periods[1:] + [None]
+    return list(zip(periods, ends))
+
+
+def seed(students=100_000, campuses=5, programs=6, classes_per_offering=3, years=3, seed=42,
+         batch_size=5000, build_snapshots=True, log=None):
+    rng = random.Random(seed)
+    today = timezone.localdate()
+    report = SeedReport()
+    log = log or (lambda message: None)
+
+    campus_objects, program_objects, class_objects = create_structure(rng, campuses, programs, classes_per_offering)
+    report.campuses, report.programs, report.classes = len(campus_objects), len(program_objects), len(class_objects)
+    class_ids = sorted(c.id for c in class_objects)
+    log(f"{report.campuses} campuses, {report.programs} programs, {report.classes} classes")
+
+    dates = (Student._meta.get_field('admission_date'), StudentEnrollment._meta.get_field('start_date'))
+    with explicit_dates(*dates):
+        for offset in range(0, students, batch_size):
+            size = min(batch_size, students - offset)
+            histories = [_history(rng, today, years) for _ in range(size)]
+            batch = [_student(rng, history[0][0]) for history in histories]
+            for student, history in zip(batch, histories):
+                if history[-1][1] is None and rng.random() < 0.08:
+                    # Left: the last enrollment is closed too
+                    student.status = 'Left'
+                    start = history[-1][0]
+                    history[-1] = (start, min(today, start + timedelta(days=rng.randint(30, 300))))
+
+            with transaction.atomic():
+                batch = Student.objects.bulk_create(batch)
+                StudentSearchKey.objects.bulk_create([key for student in batch for key in build_keys(student)])
+                enrollments = []
+                for student, history in zip(batch, histories):
+                    previous = None
+                    for start, end in history:
+                        class_id = rng.choice([pk for pk in class_ids if pk != previous] or class_ids)
+                        enrollments.append(StudentEnrollment(
+                            student=student, enrolled_class_id=class_id, start_date=start, end_date=end,
+                            is_active=end is None,
+                            status='Active' if end is None else rng.choice(('Completed', 'Completed', 'Transferred', 'Left')),
+                        ))
+                        previous = class_id
+                StudentEnrollment.objects.bulk_create(enrollments, batch_size=batch_size)
+                audit.record_many('created', [student.pk for student in batch], source='seed')
+
+            report.students += len(batch)
+            report.enrollments += len(enrollments)
+            log(f"{report.students}/{students} students, {report.enrollments} enrollments")
+
+    rebuild_derived(build_snapshots, log)
+    return report
+
+
+def rebuild_derived(build_snapshots=True, log=None):
+    """
+    Recompute everything that is maintained incrementally in normal operation.
+    """
+    log = log or (lambda message: None)
+    stats.rebuild_counters()
+    occupancy.reconcile()
+    log("Rebuilt dashboard counters and class occupancy")
+    if build_snapshots:
+        months = snapshots.build_snapshots(rebuild=True)
+        log(f"Built {len(months)} monthly snapshots")
+    generations.bump(Campus, Program, Class, Student, StudentEnrollment, MonthlyRosterEntry, MonthlySnapshot)
@@ -1,22 +1,69 @@
-from django.db import transaction
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import QuerySet, Value
+from django.db.models.functions import Concat
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from administration.models import Class
+from core import generations
 from students.models import Student, StudentEnrollment
+from students import stats, occupancy, audit
 
-def enroll_student(student, enrolled_class):
+def enroll_student(student, enrolled_class, user=None):
     """
     Enrolls a student in a class.
-    Validates that the student is not already active in the SAME class.
+    The database refuses a second active enrollment in the SAME class
+    (constraint `unique_active_enrollment`), so there is no pre-check to race.
     """
-    # Check for existing active enrollment in THE SAME CLASS
-    if StudentEnrollment.objects.filter(student=student, enrolled_class=enrolled_class, is_active=True).exists():
-        raise ValidationError(f"Student is already active in {enrolled_class.name}.")
+    enrollment = _enroll(student, enrolled_class)
+    audit.record('enrolled', student, user, class_id=enrolled_class.id)
+    return enrollment
 
-    enrollment = StudentEnrollment(student=student, enrolled_class=enrolled_class)
-    enrollment.full_clean()
-    enrollment.save()
+def _enroll(student, enrolled_class):
+    try:
+        with transaction.atomic():
+            enrollment = StudentEnrollment.objects.create(student=student, enrolled_class=enrolled_class)
+            occupancy.occupy(enrolled_class.id)
+    except IntegrityError:
+        raise ValidationError(f"Student is already active in {enrolled_class.name}.")
+    stats.enrollments_changed([(student.pk, enrolled_class.id, 1)])
     return enrollment
 
+@transaction.atomic
+def enroll_students(student_ids, enrolled_class, user=None):
+    """
+    Enrolls many students in one class.
+    Duplicates are found with one query and the rest inserted with one
+    bulk_create. Returns {student_id: 'enrolled' | 'already_active' | 'not_found'}.
+    """
+    student_ids = list(dict.fromkeys(int(student_id) for student_id in student_ids))
+    existing = set(Student.objects.filter(id__in=student_ids).values_list('id', flat=True))
+    already_active = set(
+        StudentEnrollment.objects.filter(
+            enrolled_class=enrolled_class, is_active=True, student_id__in=existing
+        ).values_list('student_id', flat=True)
+    )
+
+    outcome = {}
+    new_enrollments = []
+    for student_id in student_ids:
+        if student_id not in existing:
+            outcome[student_id] = 'not_found'
+        elif student_id in already_active:
+            outcome[student_id] = 'already_active'
+        else:
+            outcome[student_id] = 'enrolled'
+            new_enrollments.append(StudentEnrollment(student_id=student_id, enrolled_class=enrolled_class))
+
+    if new_enrollments:
+        occupancy.occupy(enrolled_class.id, len(new_enrollments))
+        StudentEnrollment.objects.bulk_create(new_enrollments)
+        stats.enrollments_changed([(e.student_id, enrolled_class.id, 1) for e in new_enrollments])
+        generations.bump(StudentEnrollment)
+        audit.record_many('enrolled', [e.student_id for e in new_enrollments], user, class_id=enrolled_class.id)
+    return outcome
+
 @transaction.atomic
 def change_class(student, old_class_id, new_class, reason, user, closure_status='Transferred', progress_notes=''):
     """
@@ -24,43 +71,193 @@ def change_class(student, old_class_id, new_class, reason, user, closure_status=
     1. Deactivates old enrollment (sets end_date=now, status, progress)
     2. Creates new enrollment
     """
-    # 1. Find active enrollment for the old class
-    # Safe lookup: if multiple exist (due to bug), take the most recent one
-    current_enrollment = StudentEnrollment.objects.filter(
-        student=student, 
-        enrolled_class_id=old_class_id, 
+    # 1. Close the active enrollment in the old class (at most one, by constraint)
+    closed = StudentEnrollment.objects.filter(
+        student=student,
+        enrolled_class_id=old_class_id,
         is_active=True
-    ).order_by('-start_date').first()
-
-    if not current_enrollment:
+    ).update(
+        is_active=False,
+        end_date=timezone.now().date(),
+        status=closure_status,
+        progress=progress_notes,
+        updated_at=timezone.now(),
+    )
+    if not closed:
         raise ValidationError("No active enrollment found for this class.")
+    stats.enrollments_changed([(student.pk, int(old_class_id), -1)])
+    occupancy.release({old_class_id: 1})
+    generations.bump(StudentEnrollment)
 
-    # 2. Deactivate old
-    current_enrollment.is_active = False
-    current_enrollment.end_date = timezone.now().date()
-    current_enrollment.status = closure_status
-    current_enrollment.progress = progress_notes
-    current_enrollment.save()
-
-    # 3. Create new
-    new_enrollment = enroll_student(student, new_class)
-    
-    # Audit logging hook (future)
-    
+    # 2. Create new
+    new_enrollment = _enroll(student, new_class)
+
+    audit.record(
+        'class_changed', student, user,
+        from_class_id=int(old_class_id), to_class_id=new_class.id, reason=reason, closure_status=closure_status,
+    )
     return new_enrollment
 
+@transaction.atomic
+def promote_class(from_class, to_class, mapping=None, exclude=(), closure_status='Completed', progress_notes='', user=None):
+    """
+    Moves every active student of `from_class` to `to_class` in one go.
+    `mapping` ({student_id: class_id}) sends individual students elsewhere;
+    students in `exclude` stay where they are. Old enrollments are closed with
+    one UPDATE and new ones created with one bulk_create, so the number of
+    queries does not depend on the size of the class.
+    Returns {class_id: number of students moved there}.
+    """
+    mapping = {int(student_id): int(class_id) for student_id, class_id in (mapping or {}).items()}
+    exclude = {int(student_id) for student_id in exclude}
+    if closure_status not in dict(StudentEnrollment.ENROLLMENT_STATUS):
+        raise ValidationError(f"Invalid closure status: {closure_status}.")
+
+    active = StudentEnrollment.objects.filter(enrolled_class=from_class, is_active=True)
+    student_ids = set(active.select_for_update().values_list('student_id', flat=True))
+
+    unknown = (set(mapping) | exclude) - student_ids
+    if unknown:
+        raise ValidationError(f"Students not active in {from_class.name}: {sorted(unknown)}.")
+
+    targets = {
+        student_id: mapping.get(student_id, to_class.id)
+        for student_id in student_ids - exclude
+    }
+    if not targets:
+        raise ValidationError(f"No students to promote from {from_class.name}.")
+    target_ids = set(targets.values())
+    if from_class.id in target_ids:
+        raise ValidationError("Students cannot be promoted into the class they are leaving.")
+
+    found = set(Class.objects.filter(id__in=target_ids, is_active=True).values_list('id', flat=True))
+    if target_ids - found:
+        raise ValidationError(f"Unknown or inactive classes: {sorted(target_ids - found)}.")
+
+    # Students already active in their target class (one query, no per-student checks)
+    conflicts = sorted(
+        student_id
+        for student_id, class_id in StudentEnrollment.objects.filter(
+            is_active=True, enrolled_class_id__in=target_ids, student_id__in=active.values('student_id')
+        ).values_list('student_id', 'enrolled_class_id')
+        if targets.get(student_id) == class_id
+    )
+    if conflicts:
+        raise ValidationError(f"Students already active in their target class: {conflicts}.")
+
+    now = timezone.now()
+    closed = active.exclude(student_id__in=exclude).update(
+        is_active=False,
+        end_date=now.date(),
+        status=closure_status,
+        progress=progress_notes,
+        updated_at=now,
+    )
+    occupancy.release({from_class.id: closed})
+    moved = occupancy.count_by_class(targets.values())
+    for class_id, count in sorted(moved.items()):
+        occupancy.occupy(class_id, count)
+    StudentEnrollment.objects.bulk_create([
+        StudentEnrollment(student_id=student_id, enrolled_class_id=class_id)
+        for student_id, class_id in sorted(targets.items())
+    ])
+
+    stats.enrollments_changed(
+        [(student_id, from_class.id, -1) for student_id in targets]
+        + [(student_id, class_id, 1) for student_id, class_id in targets.items()]
+    )
+    generations.bump(StudentEnrollment)
+    for class_id in sorted(target_ids):
+        audit.record_many(
+            'promoted', sorted(s for s, c in targets.items() if c == class_id), user,
+            from_class_id=from_class.id, to_class_id=class_id, closure_status=closure_status,
+        )
+    return moved
+
+def _student_ids(students):
+    """
+    A queryset, model instances or ids -> list of ids, locked for the
+    rest of the transaction so the set cannot change between statements.
+    """
+    if isinstance(students, QuerySet):
+        return list(students.select_for_update().values_list('id', flat=True))
+    return [getattr(student, 'pk', student) for student in students]
+
+
+def _statuses(student_ids):
+    return dict(Student.objects.filter(id__in=student_ids).values_list('id', 'status'))
+
+
+@transaction.atomic
+def change_student_status(students, new_status, user=None):
+    """
+    Sets the status of many students with one UPDATE.
+    Returns the number of students whose status changed.
+    """
+    if new_status not in dict(Student.STATUS_CHOICES):
+        raise ValidationError(f"Invalid status: {new_status}.")
+    student_ids = _student_ids(students)
+    previous = _statuses(student_ids)
+    updated = Student.objects.filter(id__in=student_ids).exclude(status=new_status).update(
+        status=new_status, updated_at=timezone.now()
+    )
+    for old_status, count in Counter(previous.values()).items():
+        stats.student_status_changed(old_status, new_status, count)
+    if updated:
+        generations.bump(Student)
+    for old_status in sorted(set(previous.values()) - {new_status}):
+        changed = [pk for pk, status in previous.items() if status == old_status]
+        audit.record_many('status_changed', changed, user, old_status=old_status, new_status=new_status)
+    return updated
+
+
+def reactivate_students(students, user=None):
+    return change_student_status(students, 'Active', user)
+
+
+@transaction.atomic
+def deactivate_students(students, reason, user):
+    """
+    Soft deletes many students and closes all their active enrollments:
+    one UPDATE for the students (reason appended to remarks in SQL) and one
+    for the enrollments. Returns (students deactivated, enrollments closed).
+    """
+    student_ids = _student_ids(students)
+    if not student_ids:
+        return 0, 0
+    previous = _statuses(student_ids)
+    now = timezone.now()
+
+    updated = Student.objects.filter(id__in=student_ids).update(
+        status='Left',
+        remarks=Concat('remarks', Value(f" [Deactivated by {user}: {reason}]")),
+        updated_at=now,
+    )
+    for old_status, count in Counter(previous.values()).items():
+        stats.student_status_changed(old_status, 'Left', count)
+
+    active_enrollments = StudentEnrollment.objects.filter(student_id__in=student_ids, is_active=True)
+    closing = list(active_enrollments.values_list('student_id', 'enrolled_class_id'))
+    closed_class_ids = [class_id for _, class_id in closing]
+    closed = active_enrollments.update(is_active=False, end_date=now.date(), updated_at=now)
+    stats.enrollments_changed([(student_id, class_id, -1) for student_id, class_id in closing])
+    occupancy.release(occupancy.count_by_class(closed_class_ids))
+
+    generations.bump(Student, StudentEnrollment)
+    closed_by_student = {}
+    for student_id, class_id in closing:
+        closed_by_student.setdefault(student_id, []).append(class_id)
+    audit.record_each('deactivated', {
+        student_id: {'reason': reason, 'old_status': old_status, 'closed_class_ids': sorted(closed_by_student.get(student_id, []))}
+        for student_id, old_status in previous.items()
+    }, user)
+    return updated, closed
+
+
 def deactivate_student(student, reason, user):
     """
     Soft deletes a student and all their active enrollments.
     """
-    with transaction.atomic():
-        student.status = 'Left'
-        student.remarks += f" [Deactivated by {user}: {reason}]"
-        student.save()
-        
-        # Deactivate all active enrollments
-        active_enrollments = StudentEnrollment.objects.filter(student=student, is_active=True)
-        for enrollment in active_enrollments:
-            enrollment.is_active = False
-            enrollment.end_date = timezone.now().date()
-            enrollment.save()
+    deactivate_students([student], reason, user)
+    student.status = 'Left'
+    student.remarks += f" [Deactivated by {user}: {reason}]"
@@ -0,0 +1,147 @@
+"""
+Monthly enrollment snapshots.
+
+For each month, MonthlyRosterEntry holds every enrollment that was open at
+some point in that month, and MonthlySnapshot holds per class, campus and
+program counts (distinct students, joined, left).
+
+A month is built incrementally from the previous month's roster: the
+entries whose enrollment was still open when the month started are carried
+over, and enrollments that started during the month are added. Only the
+first month is built with a range scan over the enrollment history.
+"""
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from core import generations
+from students.models import StudentEnrollment, MonthlyRosterEntry, MonthlySnapshot
+from students.rosters import open_between
+
+ENTRY_FIELDS = ('id', 'student_id', 'enrolled_class_id')
+SCOPES = {
+    'class': 'enrolled_class_id',
+    'campus': 'enrolled_class__campus_id',
+    'program': 'enrolled_class__program_id',
+}
+
+
+def parse_month(value):
+    """'2026-09' (or any date) -> date(2026, 9, 1)."""
+    if isinstance(value, date):
+        return value.replace(day=1)
+    year, month = str(value).split('-')[:2]
+    return date(int(year), int(month), 1)
+
+
+def next_month(month):
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def previous_month(month):
+    return (month - timedelta(days=1)).replace(day=1)
+
+
+def month_end(month):
+    return next_month(month) - timedelta(days=1)
+
+
+def _open_during(month):
+    return open_between(month, month_end(month))
+
+
+def _roster_rows(month):
+    previous = previous_month(month)
+    if not MonthlySnapshot.objects.filter(month=previous).exists():
+        # No earlier snapshot to build on: one range scan over the history
+        return list(StudentEnrollment.objects.filter(_open_during(month)).values_list(*ENTRY_FIELDS))
+
+    carried = (
+        MonthlyRosterEntry.objects.filter(month=previous)
+        .filter(Q(enrollment__end_date__isnull=True, enrollment__is_active=True) | Q(enrollment__end_date__gte=month))
+        .values_list('enrollment_id', 'student_id', 'enrolled_class_id')
+    )
+    started = StudentEnrollment.objects.filter(
+        start_date__gte=month, start_date__lte=month_end(month)
+    ).values_list(*ENTRY_FIELDS)
+    return set(carried) | set(started)
+
+
+@transaction.atomic
+def build_month(month):
+    """
+    (Re)build the roster and counts for one month. Returns the number of
+    roster entries.
+    """
+    month = parse_month(month)
+    rows = _roster_rows(month)
+
+    MonthlyRosterEntry.objects.filter(month=month).delete()
+    MonthlyRosterEntry.objects.bulk_create(
+        [
+            MonthlyRosterEntry(month=month, enrollment_id=enrollment_id, student_id=student_id, enrolled_class_id=class_id)
+            for enrollment_id, student_id, class_id in rows
+        ],
+        batch_size=2000,
+    )
+
+    joined = StudentEnrollment.objects.filter(start_date__gte=month, start_date__lte=month_end(month))
+    left = StudentEnrollment.objects.filter(end_date__gte=month, end_date__lte=month_end(month))
+    roster = MonthlyRosterEntry.objects.filter(month=month)
+
+    counts = {}
+    for scope, field in SCOPES.items():
+        for scope_id, n in roster.values_list(field).annotate(n=Count('student', distinct=True)):
+            counts.setdefault((scope, scope_id), [0, 0, 0])[0] = n
+        for scope_id, n in joined.values_list(field).annotate(n=Count('id')):
+            counts.setdefault((scope, scope_id), [0, 0, 0])[1] = n
+        for scope_id, n in left.values_list(field).annotate(n=Count('id')):
+            counts.setdefault((scope, scope_id), [0, 0, 0])[2] = n
+
+    MonthlySnapshot.objects.filter(month=month).delete()
+    MonthlySnapshot.objects.bulk_create([
+        MonthlySnapshot(
+            month=month, scope=scope, scope_id=scope_id,
+            student_count=students, joined_count=joined_count, left_count=left_count,
+        )
+        for (scope, scope_id), (students, joined_count, left_count) in sorted(counts.items())
+    ])
+    generations.bump(MonthlyRosterEntry, MonthlySnapshot)
+    return len(rows)
+
+
+def months_to_build(rebuild=False):
+    """
+    Months that need (re)building: the last built month (it may have been
+    built before it ended) and everything after it, up to the current month.
+    """
+    current = parse_month(timezone.localdate())
+    last_built = None if rebuild else MonthlySnapshot.objects.order_by('-month').values_list('month', flat=True).first()
+
+    if last_built is not None:
+        # Rebuilt first, so its successor carries over the complete roster
+        month = min(last_built, current)
+    else:
+        first = StudentEnrollment.objects.aggregate(first=Min('start_date'))['first']
+        if first is None:
+            return []
+        month = parse_month(first)
+
+    months = []
+    while month <= current:
+        months.append(month)
+        month = next_month(month)
+    return months
+
+
+def build_snapshots(rebuild=False):
+    """
+    Build every outstanding month in order, each one from the previous.
+    """
+    if rebuild:
+        with transaction.atomic():
+            MonthlyRosterEntry.objects.all().delete()
+            MonthlySnapshot.objects.all().delete()
+    return [(month, build_month(month)) for month in months_to_build(rebuild)]
@@ -0,0 +1,228 @@
+"""
+Dashboard statistics.
+
+`dashboard_stats()` builds the dashboard payload in a fixed number of
+queries using grouped aggregation. When settings.DASHBOARD_COUNTERS is on,
+the service layer also keeps StatCounter rows current through the hooks
+below, and the dashboard reads those rows instead of aggregating.
+`rebuild_counters()` recomputes every counter from scratch.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+
+from administration.models import Campus, Program, Class
+from students.models import Student, StudentEnrollment, StatCounter
+
+STUDENTS_TOTAL = 'students:total'
+ENROLLMENTS_ACTIVE = 'enrollments:active'
+
+
+def status_key(status):
+    return f'students:{status}'
+
+
+def campus_key(campus_id):
+    return f'campus:{campus_id}'
+
+
+def program_key(program_id):
+    return f'program:{program_id}'
+
+
+def counters_enabled():
+    return getattr(settings, 'DASHBOARD_COUNTERS', False)
+
+
+# --- Reading ---------------------------------------------------------------
+
+def compute_counters():
+    """
+    Compute every counter from the source tables in four grouped queries.
+    """
+    totals = Student.objects.aggregate(
+        total=Count('id'),
+        **{status: Count('id', filter=Q(status=status)) for status, _ in Student.STATUS_CHOICES}
+    )
+    counters = {STUDENTS_TOTAL: totals.pop('total')}
+    counters.update({status_key(status): value for status, value in totals.items()})
+
+    active = StudentEnrollment.objects.filter(is_active=True)
+    counters[ENROLLMENTS_ACTIVE] = active.count()
+    counters.update(_distinct_students(active, 'campus', campus_key))
+    counters.update(_distinct_students(active, 'program', program_key))
+    return counters
+
+
+def _distinct_students(enrollments, scope, make_key):
+    field = f'enrolled_class__{scope}'
+    rows = enrollments.values(field).annotate(n=Count('student', distinct=True))
+    return {make_key(row[field]): row['n'] for row in rows}
+
+
+def read_counters():
+    """
+    Counters from the materialized table, or None if it was never built.
+    """
+    counters = dict(StatCounter.objects.values_list('key', 'value'))
+    return counters or None
+
+
+def dashboard_stats():
+    """
+    Payload for DashboardStatsView.
+    """
+    counters = read_counters() if counters_enabled() else None
+    if counters is None:
+        counters = compute_counters()
+
+    campuses = list(Campus.objects.filter(is_active=True).values('id', 'name', 'capacity'))
+    programs = list(Program.objects.filter(is_active=True).values('id', 'name'))
+
+    return {
+        "students": {
+            "total": counters.get(STUDENTS_TOTAL, 0),
+            "active": counters.get(status_key('Active'), 0),
+            "left": counters.get(status_key('Left'), 0)
+        },
+        "enrollments": {
+            "active": counters.get(ENROLLMENTS_ACTIVE, 0)
+        },
+        "counts": {
+            "classes": Class.objects.filter(is_active=True).count(),
+            "campuses": len(campuses),
+            "programs": len(programs)
+        },
+        "campus_breakdown": [
+            {
+                "id": campus['id'],
+                "name": campus['name'],
+                "student_count": counters.get(campus_key(campus['id']), 0),
+                "capacity": campus['capacity']
+            }
+            for campus in campuses
+        ],
+        "program_breakdown": [
+            {
+                "id": program['id'],
+                "name": program['name'],
+                "student_count": counters.get(program_key(program['id']), 0)
+            }
+            for program in programs
+        ],
+    }
+
+
+# --- Maintenance hooks (called by the service layer) -------------------------
+
+def students_added(status, count=1):
+    if counters_enabled():
+        _adjust({STUDENTS_TOTAL: count, status_key(status): count})
+
+
+def students_removed(status, count=1):
+    students_added(status, -count)
+
+
+def student_status_changed(old_status, new_status, count=1):
+    if counters_enabled() and old_status != new_status and count:
+        _adjust({status_key(old_status): -count, status_key(new_status): count})
+
+
+def enrollments_changed(changes):
+    """
+    Active enrollments were opened or closed: `changes` is a list of
+    (student_id, class_id, +1 opened / -1 closed), reported after the writes
+    it describes. Campus/program counts are distinct students, so a student
+    only moves them when gaining their first or losing their last active
+    enrollment there. That is read from the students' own enrollments (one
+    query on the student index, whatever the size of the campus) and applied
+    as an F() delta, so concurrent changes add up instead of overwriting
+    each other. The one race left, the same student enrolled twice in one
+    campus by two concurrent requests, is repaired by rebuild_counters().
+    """
+    changes = list(changes)
+    if not counters_enabled() or not changes:
+        return
+    total = sum(delta for _, _, delta in changes)
+    # Also tells whether the table has been built (rebuild_counters() fills it)
+    if not StatCounter.objects.filter(key=ENROLLMENTS_ACTIVE).update(value=F('value') + total):
+        return
+
+    scopes = {
+        class_id: (campus_key(campus_id), program_key(program_id))
+        for class_id, campus_id, program_id in Class.objects.filter(
+            id__in={class_id for _, class_id, _ in changes}
+        ).values_list('id', 'campus_id', 'program_id')
+    }
+    changed = Counter()
+    for student_id, class_id, delta in changes:
+        for key in scopes.get(class_id, ()):
+            changed[student_id, key] += delta
+
+    active = Counter()
+    rows = StudentEnrollment.objects.filter(
+        is_active=True, student_id__in={student_id for student_id, _ in changed}
+    ).values_list('student_id', 'enrolled_class__campus_id', 'enrolled_class__program_id')
+    for student_id, campus_id, program_id in rows:
+        active[student_id, campus_key(campus_id)] += 1
+        active[student_id, program_key(program_id)] += 1
+
+    deltas = Counter()
+    for (student_id, key), delta in changed.items():
+        after = active[student_id, key]
+        deltas[key] += (after > 0) - (after - delta > 0)
+    _increment(deltas)
+
+
+def _adjust(deltas):
+    """
+    Apply atomic increments. Returns False when the table has not been built
+    yet (no rows to update); rebuild_counters() fills it in that case.
+    """
+    updated = 0
+    for key, delta in deltas.items():
+        if delta:
+            updated += StatCounter.objects.filter(key=key).update(value=F('value') + delta)
+    return updated > 0
+
+
+def _increment(deltas):
+    """
+    Atomic increments; a counter without a row yet (a new campus) starts at its delta.
+    """
+    for key, delta in deltas.items():
+        if not delta or StatCounter.objects.filter(key=key).update(value=F('value') + delta):
+            continue
+        try:
+            with transaction.atomic():
+                StatCounter.objects.create(key=key, value=delta)
+        except IntegrityError:
+            # Created concurrently
+            StatCounter.objects.filter(key=key).update(value=F('value') + delta)
+
+
+# --- Consistency -------------------------------------------------------------
+
+def check_counters():
+    """
+    Return {key: (stored, actual)} for every counter that has drifted.
+    """
+    stored = read_counters() or {}
+    actual = compute_counters()
+    keys = set(stored) | set(actual)
+    return {
+        key: (stored.get(key, 0), actual.get(key, 0))
+        for key in sorted(keys)
+        if stored.get(key, 0) != actual.get(key, 0)
+    }
+
+
+@transaction.atomic
+def rebuild_counters():
+    counters = compute_counters()
+    StatCounter.objects.all().delete()
+    StatCounter.objects.bulk_create([StatCounter(key=key, value=value) for key, value in counters.items()])
+    return counters
@@ -0,0 +1,98 @@
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from administration.models import Campus, Program, Class
+from students.models import Student, StudentEnrollment, AuditLog
+from students.services import change_class, deactivate_students, enroll_student, promote_class
+from students import audit
+
+
+class AuditTrailTests(TestCase):
+    def setUp(self):
+        self.campus = Campus.objects.create(name="Main Campus")
+        self.program = Program.objects.create(name="Hifz")
+        self.class_a = Class.objects.create(name="Class A", campus=self.campus, program=self.program, shift='Morning')
+        self.class_b = Class.objects.create(name="Class B", campus=self.campus, program=self.program, shift='Evening')
+        self.admin = User.objects.create_superuser('admin', 'admin@test.com', 'password')
+        self.student = Student.objects.create(name="Ali", father_name="Ahmed", mobile_number="+923001234567")
+
+    def tearDown(self):
+        audit._local.buffer = []
+        audit._local.in_request = False
+
+    def test_change_class_is_logged_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            enroll_student(self.student, self.class_a, self.admin)
+            change_class(self.student, self.class_a.id, self.class_b, "Promoted", self.admin)
+            # Nothing is written while the transaction is open
+            self.assertFalse(AuditLog.objects.exists())
+
+        entries = list(AuditLog.objects.order_by('id'))
+        self.assertEqual([e.action for e in entries], ['enrolled', 'class_changed'])
+        self.assertEqual(entries[1].student_id, self.student.id)
+        self.assertEqual((entries[1].actor_id, entries[1].actor_name), (self.admin.id, 'admin'))
+        self.assertEqual(entries[1].details, {
+            'from_class_id': self.class_a.id, 'to_class_id': self.class_b.id,
+            'reason': "Promoted", 'closure_status': 'Transferred',
+        })
+
+    def test_rolled_back_changes_leave_no_entry(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    enroll_student(self.student, self.class_a, self.admin)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertFalse(AuditLog.objects.exists())
+
+    def test_entries_are_buffered_until_the_request_finishes(self):
+        audit._request_started()
+        with self.captureOnCommitCallbacks(execute=True):
+            enroll_student(self.student, self.class_a, self.admin)
+        self.assertEqual(audit.pending(), 1)
+        self.assertFalse(AuditLog.objects.exists())
+
+        with CaptureQueriesContext(connection) as queries:
+            audit._request_finished()
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(audit.pending(), 0)
+        self.assertEqual(AuditLog.objects.get().action, 'enrolled')
+
+    @override_settings(AUDIT_BATCH_SIZE=3)
+    def test_full_buffer_is_flushed_early(self):
+        audit._request_started()
+        with self.captureOnCommitCallbacks(execute=True):
+            audit.record_many('updated', [1, 2], self.admin)
+        self.assertEqual(audit.pending(), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            audit.record('updated', 3, self.admin)
+        self.assertEqual(audit.pending(), 0)
+        self.assertEqual(AuditLog.objects.count(), 3)
+
+    def test_bulk_changes_are_written_in_one_insert(self):
+        students = Student.objects.bulk_create([
+            Student(name=f"Student {i}", father_name="Father", mobile_number="+923001234567") for i in range(20)
+        ])
+        StudentEnrollment.objects.bulk_create([StudentEnrollment(student=s, enrolled_class=self.class_a) for s in students])
+
+        audit._request_started()
+        with self.captureOnCommitCallbacks(execute=True):
+            promote_class(self.class_a, self.class_b, user=self.admin)
+            deactivate_students(Student.objects.filter(id__in=[s.id for s in students[:5]]), "Left town", self.admin)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(audit.flush(), 25)
+        self.assertEqual(len(queries), 1)
+
+        entry = AuditLog.objects.get(action='deactivated', student=students[0])
+        self.assertEqual(entry.details, {'reason': "Left town", 'old_status': 'Active', 'closed_class_ids': [self.class_b.id]})
+        self.assertEqual(AuditLog.objects.filter(action='promoted', details__to_class_id=self.class_b.id).count(), 20)
+
+    def test_anonymous_changes_have_no_actor(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            enroll_student(self.student, self.class_a)
+        entry = AuditLog.objects.get()
+        self.assertEqual((entry.actor_id, entry.actor_name), (None, ''))
@@ -0,0 +1,62 @@
+import io
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from administration.models import Campus, Program, Class
+from students.models import Student, StudentEnrollment, AuditLog
+from students.importers import read_csv, import_students
+from students.search import search_students
+
+HEADER = "Name,Father Name,Mobile Number,CNIC,Address\n"
+
+
+def csv_file(rows):
+    return io.BytesIO((HEADER + "".join(rows)).encode('utf-8'))
+
+
+class StudentImportTests(TestCase):
+    def setUp(self):
+        campus = Campus.objects.create(name="Main Campus")
+        program = Program.objects.create(name="Nazra")
+        self.class_a = Class.objects.create(name="Nazra A", campus=campus, program=program, shift='Morning')
+        self.admin = User.objects.create_superuser('admin', 'admin@test.com', 'password')
+
+    def test_valid_rows_are_created_and_invalid_rows_reported(self):
+        rows = [
+            "Ali,Ahmed,+92-300-1234567,42101-1234567-1,Karachi\n",
+            "Bad Phone,Someone,12,,\n",
+            ",Missing Name,03001234567,,\n",
+            "Bad Cnic,Someone,03001234567,12345,\n",
+            "Bilal,Khan,03331234567,,\n",
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            report = import_students(read_csv(csv_file(rows)), enrolled_class=self.class_a, user=self.admin)
+
+        self.assertEqual(report.created, 2)
+        self.assertEqual(report.enrolled, 2)
+        self.assertEqual([e['row'] for e in report.errors], [3, 4, 5])
+        self.assertIn('mobile_number', report.errors[0]['errors'])
+        self.assertIn('name', report.errors[1]['errors'])
+        self.assertIn('cnic', report.errors[2]['errors'])
+
+        self.assertEqual(StudentEnrollment.objects.filter(enrolled_class=self.class_a, is_active=True).count(), 2)
+        self.assertEqual([s.name for s in search_students("bil")], ["Bilal"])
+
+        # One 'created' and one 'enrolled' entry per imported student
+        entries = AuditLog.objects.filter(actor=self.admin)
+        self.assertEqual(entries.filter(action='created', details={'source': 'import'}).count(), 2)
+        self.assertEqual(entries.filter(action='enrolled', details={'class_id': self.class_a.id}).count(), 2)
+
+    def test_queries_grow_per_batch_not_per_row(self):
+        rows = [f"Student {i},Father,0300123{i:04d},,\n" for i in range(100)]
+        with CaptureQueriesContext(connection) as queries:
+            report = import_students(read_csv(csv_file(rows)), enrolled_class=self.class_a, batch_size=50)
+
+        self.assertEqual(report.created, 100)
+        self.assertEqual(Student.objects.count(), 100)
+        inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT')]
+        # students, search keys and enrollments: one insert each per batch
+        self.assertEqual(len(inserts), 6)
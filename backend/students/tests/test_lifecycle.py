@@ -0,0 +1,92 @@
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from administration.models import Campus, Program, Class
+from students.models import Student, StudentEnrollment
+from students.services import (
+    change_student_status, deactivate_student, deactivate_students, reactivate_students
+)
+from students import stats
+
+
+class BulkLifecycleTests(TestCase):
+    def setUp(self):
+        self.campus = Campus.objects.create(name="Main Campus")
+        self.program = Program.objects.create(name="Hifz")
+        self.class_a = Class.objects.create(name="Class A", campus=self.campus, program=self.program, shift='Morning')
+        self.admin = User.objects.create_superuser('admin', 'admin@test.com', 'password')
+
+    def _students(self, n, remarks=''):
+        students = Student.objects.bulk_create([
+            Student(name=f"Student {i}", father_name="Father", mobile_number="+923001234567", remarks=remarks)
+            for i in range(n)
+        ])
+        StudentEnrollment.objects.bulk_create([StudentEnrollment(student=s, enrolled_class=self.class_a) for s in students])
+        return students
+
+    def _queries(self, n):
+        self._students(n)
+        with CaptureQueriesContext(connection) as queries:
+            deactivate_students(Student.objects.filter(status='Active'), "Term ended", self.admin)
+        return len(queries)
+
+    def test_query_count_is_independent_of_size(self):
+        self.assertEqual(self._queries(2), self._queries(50))
+
+    def test_deactivate_appends_reason_and_closes_enrollments(self):
+        students = self._students(3, remarks="Note")
+        updated, closed = deactivate_students(Student.objects.all(), "Term ended", self.admin)
+
+        self.assertEqual((updated, closed), (3, 3))
+        student = Student.objects.get(pk=students[0].pk)
+        self.assertEqual(student.status, 'Left')
+        self.assertEqual(student.remarks, "Note [Deactivated by admin: Term ended]")
+        self.assertFalse(StudentEnrollment.objects.filter(is_active=True).exists())
+        self.assertFalse(StudentEnrollment.objects.filter(end_date__isnull=True).exists())
+
+    def test_single_student_uses_the_same_path(self):
+        student = self._students(1)[0]
+        class_b = Class.objects.create(name="Class B", campus=self.campus, program=self.program, shift='Evening')
+        StudentEnrollment.objects.create(student=student, enrolled_class=class_b)
+
+        with CaptureQueriesContext(connection) as queries:
+            deactivate_student(student, "Moved away", self.admin)
+        enrollment_updates = [q for q in queries if q['sql'].startswith('UPDATE "students_studentenrollment"')]
+        self.assertEqual(len(enrollment_updates), 1)
+        self.assertEqual(student.status, 'Left')
+        self.assertEqual(Student.objects.get(pk=student.pk).remarks, student.remarks)
+
+    @override_settings(DASHBOARD_COUNTERS=True)
+    def test_counters_follow_bulk_changes(self):
+        self._students(4)
+        stats.rebuild_counters()
+
+        deactivate_students(Student.objects.all(), "Term ended", self.admin)
+        self.assertEqual(stats.check_counters(), {})
+
+        self.assertEqual(reactivate_students(Student.objects.all()[:2]), 2)
+        self.assertEqual(stats.check_counters(), {})
+        self.assertEqual(Student.objects.filter(status='Active').count(), 2)
+
+    def test_invalid_status(self):
+        students = self._students(1)
+        with self.assertRaises(ValidationError):
+            change_student_status(students, 'Graduated')
+
+    def test_admin_actions(self):
+        students = self._students(2)
+        self.client.force_login(self.admin)
+        url = '/admin/students/student/'
+
+        ids = [s.pk for s in students]
+        self.client.post(url, {'action': 'deactivate_selected', '_selected_action': ids, 'reason': ''})
+        self.assertEqual(Student.objects.filter(status='Left').count(), 0)
+
+        self.client.post(url, {'action': 'deactivate_selected', '_selected_action': ids, 'reason': "Term ended"})
+        self.assertEqual(Student.objects.filter(status='Left').count(), 2)
+
+        self.client.post(url, {'action': 'reactivate_selected', '_selected_action': ids[:1], 'reason': ''})
+        self.assertEqual(Student.objects.get(pk=ids[0]).status, 'Active')
@@ -0,0 +1,74 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from administration.models import Campus, Program, Class
+from students.models import Student, StudentEnrollment
+from students.services import (
+    enroll_student, enroll_students, change_class, deactivate_student, promote_class
+)
+from students import occupancy
+
+
+class OccupancyTests(TestCase):
+    def setUp(self):
+        self.campus = Campus.objects.create(name="Main Campus")
+        self.program = Program.objects.create(name="Hifz")
+        self.class_a = Class.objects.create(name="Class A", campus=self.campus, program=self.program, shift='Morning', capacity=2)
+        self.class_b = Class.objects.create(name="Class B", campus=self.campus, program=self.program, shift='Evening', capacity=5)
+        self.admin = User.objects.create_superuser('admin', 'admin@test.com', 'password')
+        self.students = [
+            Student.objects.create(name=f"Student {i}", father_name="Father", mobile_number="+923001234567")
+            for i in range(3)
+        ]
+
+    def _counts(self):
+        return dict(Class.objects.values_list('name', 'active_count'))
+
+    def test_services_keep_counts_current(self):
+        enroll_student(self.students[0], self.class_a)
+        enroll_students([s.id for s in self.students[1:]], self.class_b)
+        self.assertEqual(self._counts(), {"Class A": 1, "Class B": 2})
+
+        change_class(self.students[0], self.class_a.id, self.class_b, "Moved", self.admin)
+        self.assertEqual(self._counts(), {"Class A": 0, "Class B": 3})
+
+        deactivate_student(self.students[1], "Left", self.admin)
+        promote_class(self.class_b, self.class_a)
+        self.assertEqual(self._counts(), {"Class A": 2, "Class B": 0})
+        self.assertEqual(occupancy.check_occupancy(), {})
+
+    @override_settings(CLASS_CAPACITY_ENFORCEMENT='hard')
+    def test_hard_capacity_refuses_full_class(self):
+        enroll_student(self.students[0], self.class_a)
+        enroll_student(self.students[1], self.class_a)
+        with self.assertRaisesMessage(ValidationError, "Class A is full (2/2)"):
+            enroll_student(self.students[2], self.class_a)
+        self.assertEqual(StudentEnrollment.objects.filter(enrolled_class=self.class_a).count(), 2)
+
+        with self.assertRaises(ValidationError):
+            enroll_students([self.students[2].id], self.class_a)
+        self.assertEqual(self._counts()["Class A"], 2)
+
+    @override_settings(CLASS_CAPACITY_ENFORCEMENT='soft')
+    def test_soft_capacity_warns_but_enrolls(self):
+        with self.assertLogs('students.occupancy', level='WARNING'):
+            enroll_students([s.id for s in self.students], self.class_a)
+        self.assertEqual(self._counts()["Class A"], 3)
+
+    def test_reconcile_command(self):
+        enroll_student(self.students[0], self.class_a)
+        StudentEnrollment.objects.create(student=self.students[1], enrolled_class=self.class_b)
+        Class.objects.filter(pk=self.class_a.pk).update(active_count=7)
+
+        with self.assertRaises(Exception):
+            call_command('reconcile_occupancy', '--check', stdout=StringIO())
+
+        out = StringIO()
+        call_command('reconcile_occupancy', stdout=out)
+        self.assertIn("Fixed 2 class count(s).", out.getvalue())
+        self.assertEqual(self._counts(), {"Class A": 1, "Class B": 1})
+        call_command('reconcile_occupancy', '--check', stdout=StringIO())
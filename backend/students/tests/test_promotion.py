@@ -0,0 +1,75 @@
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from administration.models import Campus, Program, Class
+from students.models import Student, StudentEnrollment
+from students.services import enroll_student, promote_class
+from students import stats
+
+
+class PromoteClassTests(TestCase):
+    def setUp(self):
+        self.campus = Campus.objects.create(name="Main Campus")
+        self.program = Program.objects.create(name="Hifz")
+        self.nazra = Class.objects.create(name="Nazra A", campus=self.campus, program=self.program, shift='Morning')
+        self.hifz = Class.objects.create(name="Hifz 1", campus=self.campus, program=self.program, shift='Morning')
+        self.hifz_2 = Class.objects.create(name="Hifz 2", campus=self.campus, program=self.program, shift='Evening')
+
+    def _fill(self, n):
+        students = Student.objects.bulk_create([
+            Student(name=f"Student {i}", father_name="Father", mobile_number="+923001234567")
+            for i in range(n)
+        ])
+        StudentEnrollment.objects.bulk_create([StudentEnrollment(student=s, enrolled_class=self.nazra) for s in students])
+        return students
+
+    def _queries(self, n):
+        self._fill(n)
+        with CaptureQueriesContext(connection) as queries:
+            promote_class(self.nazra, self.hifz)
+        StudentEnrollment.objects.all().delete()
+        return len(queries)
+
+    def test_query_count_is_independent_of_class_size(self):
+        self.assertEqual(self._queries(3), self._queries(60))
+
+    def test_mapping_and_exclusions(self):
+        students = self._fill(4)
+        moved = promote_class(
+            self.nazra, self.hifz,
+            mapping={str(students[1].id): self.hifz_2.id},
+            exclude=[students[2].id],
+            progress_notes="Nazra complete",
+        )
+        self.assertEqual(moved, {self.hifz.id: 2, self.hifz_2.id: 1})
+
+        active = dict(StudentEnrollment.objects.filter(is_active=True).values_list('student_id', 'enrolled_class_id'))
+        self.assertEqual(active[students[0].id], self.hifz.id)
+        self.assertEqual(active[students[1].id], self.hifz_2.id)
+        self.assertEqual(active[students[2].id], self.nazra.id)
+
+        closed = StudentEnrollment.objects.get(student=students[0], enrolled_class=self.nazra)
+        self.assertFalse(closed.is_active)
+        self.assertEqual(closed.status, 'Completed')
+        self.assertEqual(closed.progress, "Nazra complete")
+        self.assertIsNotNone(closed.end_date)
+
+    def test_conflict_rolls_back_everything(self):
+        students = self._fill(3)
+        enroll_student(students[0], self.hifz)
+
+        with self.assertRaises(ValidationError):
+            promote_class(self.nazra, self.hifz)
+        self.assertEqual(StudentEnrollment.objects.filter(enrolled_class=self.nazra, is_active=True).count(), 3)
+
+        with self.assertRaises(ValidationError):
+            promote_class(self.nazra, self.hifz, exclude=[999999])
+
+    @override_settings(DASHBOARD_COUNTERS=True)
+    def test_counters_stay_consistent(self):
+        self._fill(5)
+        stats.rebuild_counters()
+        promote_class(self.nazra, self.hifz)
+        self.assertEqual(stats.check_counters(), {})
@@ -4,6 +4,8 @@ from students.models import Student, StudentEnrollment
 from administration.models import Campus, Program, Class
 from students.services import enroll_student, change_class
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
 
 class EnrollmentRegressionTests(TestCase):
@@ -46,6 +48,26 @@ class EnrollmentRegressionTests(TestCase):
         
         self.assertIn(f"Student is already active in {self.class_a.name}", str(cm.exception))
 
+    def test_database_rejects_duplicate_active_enrollment(self):
+        """The constraint holds even when two writers both skip the service check"""
+        StudentEnrollment.objects.create(student=self.student, enrolled_class=self.class_a)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            StudentEnrollment.objects.create(student=self.student, enrolled_class=self.class_a)
+
+        # Closed enrollments are outside the constraint
+        StudentEnrollment.objects.create(student=self.student, enrolled_class=self.class_a, is_active=False)
+
+    def test_enroll_query_budget(self):
+        with CaptureQueriesContext(connection) as queries:
+            enroll_student(self.student, self.class_a)
+        statements = [q['sql'] for q in queries if 'SAVEPOINT' not in q['sql']]
+        self.assertLessEqual(len(statements), 3, statements)
+
+        with CaptureQueriesContext(connection) as queries, self.assertRaises(ValidationError):
+            enroll_student(self.student, self.class_a)
+        self.assertLessEqual(len([q for q in queries if 'SAVEPOINT' not in q['sql']]), 3)
+        self.assertEqual(StudentEnrollment.objects.get(is_active=True).enrolled_class, self.class_a)
+
     def test_allow_rejoining_after_leaving(self):
         """Test that a student CAN rejoin a class if previous enrollment is closed"""
         # 1. Enroll and Leave Class A
@@ -0,0 +1,52 @@
+from datetime import date
+
+from django.test import TestCase
+
+from administration.models import Campus, Program, Class
+from students.models import Student, StudentEnrollment
+from students.rosters import roster_as_of
+
+
+class RosterAsOfTests(TestCase):
+    def setUp(self):
+        campus = Campus.objects.create(name="Main Campus")
+        program = Program.objects.create(name="Hifz")
+        self.class_a = Class.objects.create(name="Class A", campus=campus, program=program, shift='Morning')
+        self.class_b = Class.objects.create(name="Class B", campus=campus, program=program, shift='Evening')
+        self.campus = campus
+
+    def _enrollment(self, name, enrolled_class, start, end=None, is_active=None):
+        student = Student.objects.create(name=name, father_name="Father", mobile_number="+923001234567")
+        enrollment = StudentEnrollment.objects.create(student=student, enrolled_class=enrolled_class)
+        # start_date is auto_now_add
+        StudentEnrollment.objects.filter(pk=enrollment.pk).update(
+            start_date=start, end_date=end, is_active=end is None if is_active is None else is_active
+        )
+        return student
+
+    def _names(self, day, scope='class', scope_id=None):
+        scope_id = scope_id or self.class_a.id
+        return [e.student.name for e in roster_as_of(day, scope, scope_id)]
+
+    def test_interval_containment(self):
+        self._enrollment("Current", self.class_a, date(2024, 1, 1))
+        self._enrollment("Finished", self.class_a, date(2023, 1, 1), date(2024, 2, 29))
+        self._enrollment("Later", self.class_a, date(2024, 6, 1))
+        # Closed without an end date (legacy rows): never on a roster
+        self._enrollment("Legacy", self.class_a, date(2023, 1, 1), is_active=False)
+
+        self.assertEqual(self._names(date(2022, 12, 31)), [])
+        self.assertEqual(self._names(date(2023, 6, 1)), ["Finished"])
+        # Both ends are inclusive
+        self.assertEqual(self._names(date(2024, 1, 1)), ["Current", "Finished"])
+        self.assertEqual(self._names(date(2024, 2, 29)), ["Current", "Finished"])
+        self.assertEqual(self._names(date(2024, 3, 1)), ["Current"])
+        self.assertEqual(self._names(date(2024, 6, 1)), ["Current", "Later"])
+
+    def test_campus_and_program_scopes(self):
+        self._enrollment("Ali", self.class_a, date(2024, 1, 1))
+        self._enrollment("Bilal", self.class_b, date(2024, 1, 1))
+
+        self.assertEqual(self._names(date(2024, 2, 1), 'campus', self.campus.id), ["Ali", "Bilal"])
+        self.assertEqual(self._names(date(2024, 2, 1), 'program', self.class_b.program_id), ["Ali", "Bilal"])
+        self.assertEqual(self._names(date(2024, 2, 1), 'class', self.class_b.id), ["Bilal"])
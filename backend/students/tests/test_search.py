@@ -0,0 +1,64 @@
+from django.db import connection
+from django.test import TestCase
+
+from administration.models import Campus, Program, Class
+from students.models import Student, StudentEnrollment, StudentSearchKey
+from students.search import search_students, filter_students, build_keys
+
+
+class StudentSearchTests(TestCase):
+    def setUp(self):
+        self.ali = Student.objects.create(
+            name="Muhammad  Ali", father_name="Ahmed Khan",
+            mobile_number="+92-300-1234567", cnic="42101-1234567-1"
+        )
+        self.alina = Student.objects.create(name="Alina", father_name="Bilal", mobile_number="03331112222")
+        self.other = Student.objects.create(name="Usman", father_name="Ali Raza", mobile_number="03450000000")
+
+    def test_keys_are_normalized(self):
+        keys = {(k.kind, k.key) for k in build_keys(self.ali)}
+        self.assertIn(('name', 'muhammad'), keys)
+        self.assertIn(('name', 'ali'), keys)
+        self.assertIn(('cnic', '4210112345671'), keys)
+        self.assertIn(('mobile', '03001234567'), keys)
+
+    def test_keys_follow_updates(self):
+        self.alina.name = "Zainab"
+        self.alina.save()
+        self.assertFalse(StudentSearchKey.objects.filter(student=self.alina, key='alina').exists())
+        self.assertEqual(list(search_students("zain")), [self.alina])
+
+    def test_prefix_match_ranks_exact_tokens_first(self):
+        results = list(search_students("ali"))
+        self.assertEqual(results[0], self.ali)
+        self.assertEqual(set(results), {self.ali, self.alina, self.other})
+
+    def test_all_words_must_match(self):
+        self.assertEqual(list(search_students("muh ali")), [self.ali])
+
+    def test_number_lookup_in_any_format(self):
+        self.assertEqual(list(search_students("0300-1234567")), [self.ali])
+        self.assertEqual(list(search_students("+923001234567")), [self.ali])
+        self.assertEqual(list(search_students("42101-1234567-1")), [self.ali])
+        self.assertEqual(list(search_students("0333")), [self.alina])
+        self.assertEqual(list(search_students("03")), [])
+
+    def test_filter_by_class(self):
+        campus = Campus.objects.create(name="Main")
+        program = Program.objects.create(name="Hifz")
+        klass = Class.objects.create(name="H1", campus=campus, program=program, shift='Morning')
+        StudentEnrollment.objects.create(student=self.alina, enrolled_class=klass)
+
+        queryset = filter_students(Student.objects.all(), enrolled_class=klass.id)
+        self.assertEqual(list(search_students("ali", queryset)), [self.alina])
+
+    def test_lookups_use_the_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest("Plan text is SQLite specific")
+        sql, params = StudentSearchKey.objects.filter(
+            kind='name', key__gte='ali', key__lt='ali\uffff', key__startswith='ali'
+        ).query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn("USING INDEX student_search_kind_key", plan)
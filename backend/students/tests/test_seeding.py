@@ -0,0 +1,54 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase
+from django.utils import timezone
+
+from administration.models import Class
+from students.models import Student, StudentEnrollment, StudentSearchKey, MonthlySnapshot, AuditLog
+from students.search import search_students
+from students import occupancy, stats
+
+
+class SeedScaleTests(TestCase):
+    def _seed(self, **options):
+        out = StringIO()
+        call_command('seed_scale', students=120, campuses=2, programs=2, classes_per_offering=2,
+                     years=2, batch_size=50, stdout=out, **options)
+        return out.getvalue()
+
+    def test_seeds_consistent_histories(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            output = self._seed()
+        self.assertIn("Seeded 120 students", output)
+        self.assertEqual(Class.objects.count(), 8)
+
+        today = timezone.localdate()
+        self.assertFalse(StudentEnrollment.objects.filter(start_date__gt=today).exists())
+        self.assertFalse(StudentEnrollment.objects.filter(is_active=False, end_date__isnull=True).exists())
+        # At most one active enrollment per student
+        self.assertFalse(
+            StudentEnrollment.objects.filter(is_active=True)
+            .values('student').annotate(n=Count('id')).filter(n__gt=1).exists()
+        )
+        self.assertFalse(Student.objects.filter(status='Left', enrollments__is_active=True).exists())
+        # Histories go back in time rather than all starting today
+        self.assertTrue(StudentEnrollment.objects.filter(start_date__lt=today.replace(day=1)).exists())
+
+        # Derived data is rebuilt
+        self.assertEqual(StudentSearchKey.objects.values('student').distinct().count(), 120)
+        self.assertTrue(search_students(Student.objects.first().name.split()[0]).exists())
+        self.assertEqual(occupancy.check_occupancy(), {})
+        self.assertEqual(stats.check_counters(), {})
+        self.assertTrue(MonthlySnapshot.objects.exists())
+        self.assertEqual(AuditLog.objects.filter(action='created', details={'source': 'seed'}).count(), 120)
+
+    def test_same_seed_same_data(self):
+        self._seed(no_snapshots=True)
+        first = list(Student.objects.order_by('id').values_list('name', 'mobile_number', 'admission_date'))
+        Student.objects.all().delete()
+        self._seed(no_snapshots=True)
+        second = list(Student.objects.order_by('id').values_list('name', 'mobile_number', 'admission_date'))
+        self.assertEqual(first, second)
+        self.assertFalse(MonthlySnapshot.objects.exists())
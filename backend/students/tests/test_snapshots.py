@@ -0,0 +1,92 @@
+from datetime import date
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from administration.models import Campus, Program, Class
+from students.models import Student, StudentEnrollment, MonthlyRosterEntry, MonthlySnapshot
+from students import snapshots
+
+
+class MonthlySnapshotTests(TestCase):
+    def setUp(self):
+        self.campus = Campus.objects.create(name="Main Campus")
+        self.program = Program.objects.create(name="Hifz")
+        self.class_a = Class.objects.create(name="Class A", campus=self.campus, program=self.program, shift='Morning')
+        self.class_b = Class.objects.create(name="Class B", campus=self.campus, program=self.program, shift='Evening')
+        self.students = [
+            Student.objects.create(name=f"Student {i}", father_name="Father", mobile_number="+923001234567")
+            for i in range(4)
+        ]
+        # start_date is auto_now_add, so history is written with update()
+        self._enroll(self.students[0], self.class_a, date(2026, 1, 10))
+        self._enroll(self.students[1], self.class_a, date(2026, 1, 20), end=date(2026, 2, 15))
+        self._enroll(self.students[1], self.class_b, date(2026, 2, 15))
+        self._enroll(self.students[2], self.class_b, date(2026, 3, 5))
+        self._enroll(self.students[3], self.class_a, date(2026, 2, 1), end=date(2026, 2, 28))
+
+    def _enroll(self, student, enrolled_class, start, end=None):
+        enrollment = StudentEnrollment.objects.create(student=student, enrolled_class=enrolled_class)
+        StudentEnrollment.objects.filter(pk=enrollment.pk).update(start_date=start, end_date=end, is_active=end is None)
+
+    def _roster(self, month):
+        return set(MonthlyRosterEntry.objects.filter(month=month).values_list('enrollment_id', 'student_id', 'enrolled_class_id'))
+
+    def _counts(self, month):
+        return {
+            (s.scope, s.scope_id): (s.student_count, s.joined_count, s.left_count)
+            for s in MonthlySnapshot.objects.filter(month=month)
+        }
+
+    def test_month_counts(self):
+        for month in ('2026-01', '2026-02', '2026-03'):
+            snapshots.build_month(month)
+
+        february = self._counts(date(2026, 2, 1))
+        self.assertEqual(february[('class', self.class_a.id)], (3, 1, 2))
+        self.assertEqual(february[('class', self.class_b.id)], (1, 1, 0))
+        # Student 1 moved classes but is counted once for the campus
+        self.assertEqual(february[('campus', self.campus.id)], (3, 2, 2))
+
+        march = self._counts(date(2026, 3, 1))
+        self.assertEqual(march[('class', self.class_a.id)], (1, 0, 0))
+        self.assertEqual(march[('program', self.program.id)], (3, 1, 0))
+
+    def test_incremental_build_matches_range_scan(self):
+        for month in ('2026-01', '2026-02', '2026-03', '2026-04'):
+            snapshots.build_month(month)
+        incremental = {m: (self._roster(m), self._counts(m)) for m in (date(2026, 3, 1), date(2026, 4, 1))}
+
+        for month in incremental:
+            MonthlySnapshot.objects.filter(month=snapshots.previous_month(month)).delete()
+            snapshots.build_month(month)
+            self.assertEqual((self._roster(month), self._counts(month)), incremental[month])
+
+    def test_build_snapshots_command(self):
+        out = StringIO()
+        call_command('build_snapshots', stdout=out)
+        built = MonthlySnapshot.objects.values_list('month', flat=True).distinct()
+        self.assertIn(date(2026, 1, 1), built)
+        self.assertIn(snapshots.parse_month(date.today()), built)
+
+        # A second run only rebuilds the current month
+        self.assertEqual(snapshots.months_to_build(), [snapshots.parse_month(date.today())])
+        self.assertIn("month(s)", out.getvalue())
+
+    def test_month_built_early_is_completed_after_it_ends(self):
+        StudentEnrollment.objects.all().delete()
+        early, late = self.students[:2]
+        self._enroll(early, self.class_a, date(2026, 8, 3))
+
+        with mock.patch('students.snapshots.timezone.localdate', return_value=date(2026, 8, 15)):
+            snapshots.build_snapshots()
+        self._enroll(late, self.class_a, date(2026, 8, 25))
+        with mock.patch('students.snapshots.timezone.localdate', return_value=date(2026, 9, 2)):
+            self.assertEqual(snapshots.months_to_build(), [date(2026, 8, 1), date(2026, 9, 1)])
+            snapshots.build_snapshots()
+
+        for month in (date(2026, 8, 1), date(2026, 9, 1)):
+            students = {student_id for _, student_id, _ in self._roster(month)}
+            self.assertEqual(students, {early.id, late.id}, month)
@@ -0,0 +1,95 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from administration.models import Campus, Program, Class
+from students.models import Student, StatCounter
+from students.services import enroll_student, change_class, deactivate_student
+from students import stats
+
+
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        self.campus = Campus.objects.create(name="Main Campus")
+        self.other_campus = Campus.objects.create(name="North Campus")
+        self.program = Program.objects.create(name="Hifz")
+        self.class_a = Class.objects.create(name="Class A", campus=self.campus, program=self.program, shift='Morning')
+        self.class_b = Class.objects.create(name="Class B", campus=self.other_campus, program=self.program, shift='Morning')
+        self.student = Student.objects.create(name="Test Student", father_name="Father", mobile_number="+923001234567")
+        self.admin = User.objects.create_superuser('admin', 'admin@test.com', 'password')
+
+    def test_query_count_does_not_grow_with_campuses(self):
+        enroll_student(self.student, self.class_a)
+        with self.assertNumQueries(7):
+            stats.dashboard_stats()
+
+        for i in range(5):
+            Campus.objects.create(name=f"Extra {i}")
+            Program.objects.create(name=f"Extra {i}")
+        with self.assertNumQueries(7):
+            payload = stats.dashboard_stats()
+
+        breakdown = {row['name']: row['student_count'] for row in payload['campus_breakdown']}
+        self.assertEqual(breakdown["Main Campus"], 1)
+        self.assertEqual(breakdown["Extra 0"], 0)
+        self.assertEqual(payload['students'], {"total": 1, "active": 1, "left": 0})
+
+    @override_settings(DASHBOARD_COUNTERS=True)
+    def test_counters_follow_service_layer(self):
+        stats.rebuild_counters()
+
+        enroll_student(self.student, self.class_a)
+        enroll_student(self.student, self.class_b)
+        deactivate_student(self.student, "Left", self.admin)
+
+        self.assertEqual(stats.check_counters(), {})
+        payload = stats.dashboard_stats()
+        self.assertEqual(payload['students']['left'], 1)
+        self.assertEqual(payload['enrollments']['active'], 0)
+
+    @override_settings(DASHBOARD_COUNTERS=True)
+    def test_change_class_keeps_counters_consistent(self):
+        stats.rebuild_counters()
+        enroll_student(self.student, self.class_a)
+        change_class(self.student, self.class_a.id, self.class_b, "Transfer", self.admin)
+
+        self.assertEqual(stats.check_counters(), {})
+        counters = stats.read_counters()
+        self.assertEqual(counters[stats.campus_key(self.campus.id)], 0)
+        self.assertEqual(counters[stats.campus_key(self.other_campus.id)], 1)
+
+    @override_settings(DASHBOARD_COUNTERS=True)
+    def test_rebuild_command_repairs_drift(self):
+        stats.rebuild_counters()
+        StatCounter.objects.filter(key=stats.STUDENTS_TOTAL).update(value=42)
+        self.assertIn(stats.STUDENTS_TOTAL, stats.check_counters())
+
+        call_command('rebuild_stats', stdout=StringIO())
+        self.assertEqual(stats.check_counters(), {})
+
+    @override_settings(DASHBOARD_COUNTERS=True)
+    def test_campus_counters_move_by_distinct_student_deltas(self):
+        class_a2 = Class.objects.create(name="Class A2", campus=self.campus, program=self.program, shift='Evening')
+        class_b2 = Class.objects.create(name="Class B2", campus=self.other_campus, program=self.program, shift='Evening')
+        others = Student.objects.bulk_create(
+            Student(name=f"Other {i}", father_name="Father", mobile_number="+923001234567") for i in range(5)
+        )
+        for other in others:
+            enroll_student(other, self.class_a)
+        stats.rebuild_counters()
+
+        # A second class in the same campus is not a second student
+        enroll_student(self.student, self.class_a)
+        enroll_student(self.student, class_a2)
+        self.assertEqual(stats.check_counters(), {})
+        self.assertEqual(stats.read_counters()[stats.campus_key(self.campus.id)], 6)
+
+        # Applied as a delta: a concurrent writer's increment is not overwritten by a recount
+        key = stats.campus_key(self.campus.id)
+        StatCounter.objects.filter(key=key).update(value=100)
+        change_class(self.student, self.class_a.id, self.class_b, "Transfer", self.admin)
+        self.assertEqual(stats.read_counters()[key], 100)
+        change_class(self.student, class_a2.id, class_b2, "Transfer", self.admin)
+        self.assertEqual(stats.read_counters()[key], 99)
@@ -30,7 +30,7 @@ export default function CampusesPage() {
 
   const fetchCampuses = async () => {
     try {
-      const { data } = await api.get("/campuses/");
+      const { data } = await api.get("/campuses/?paginate=false");
       setCampuses(data);
     } catch (error) {
       console.error("Failed to fetch campuses", error);
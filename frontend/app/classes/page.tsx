@@ -2,14 +2,11 @@
 
 import { useState, useEffect } from "react";
 import { Plus, Search, GraduationCap } from "lucide-react";
-import api, { Class } from "@/lib/api";
+import api, { Campus, Class, Program, getReferenceData } from "@/lib/api";
 import Badge from "@/components/Badge";
 import Modal from "@/components/Modal";
 import { useAuth } from "@/lib/auth";
 
-interface Campus { id: number; name: string; }
-interface Program { id: number; name: string; }
-
 export default function ClassesPage() {
     const { user } = useAuth();
     const [classes, setClasses] = useState<Class[]>([]);
@@ -33,14 +30,14 @@ export default function ClassesPage() {
 
     const fetchData = async () => {
         try {
-            const [classRes, campusRes, programRes] = await Promise.all([
-                api.get("/classes/"),
-                api.get("/campuses/"),
-                api.get("/programs/")
+            // The table needs live occupancy; the form dropdowns come from the reference bundle
+            const [classRes, reference] = await Promise.all([
+                api.get("/classes/?paginate=false"),
+                getReferenceData()
             ]);
             setClasses(classRes.data);
-            setCampuses(campusRes.data);
-            setPrograms(programRes.data);
+            setCampuses(reference.campuses);
+            setPrograms(reference.programs);
         } catch (error) {
             console.error("Failed to fetch data", error);
         } finally {
@@ -139,7 +136,7 @@ export default function ClassesPage() {
                                 <td className="px-6 py-4">
                                     <Badge variant="outline" className="text-gray-900 border-gray-400 font-medium">{shiftLabels[cls.shift] || cls.shift}</Badge>
                                 </td>
-                                <td className="px-6 py-4 text-gray-900 font-bold">{cls.capacity || "—"}</td>
+                                <td className="px-6 py-4 text-gray-900 font-bold">{cls.capacity ? `${cls.active_count ?? 0}/${cls.capacity}` : "—"}</td>
                                 {user?.isAdmin && (
                                     <td className="px-6 py-4">
                                         <button className="text-[var(--color-accent)] hover:text-amber-700 font-bold text-sm underline">ایڈیٹ</button>
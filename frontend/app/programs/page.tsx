@@ -29,7 +29,7 @@ export default function ProgramsPage() {
 
     const fetchPrograms = async () => {
         try {
-            const { data } = await api.get("/programs/");
+            const { data } = await api.get("/programs/?paginate=false");
             setPrograms(data);
         } catch (error) {
             console.error("Failed to fetch programs", error);
@@ -4,7 +4,7 @@ import { useState, useEffect } from "react";
 import { ArrowRight, Save } from "lucide-react";
 import Link from "next/link";
 import { useRouter } from "next/navigation";
-import api, { Class } from "@/lib/api";
+import api, { Class, getReferenceData } from "@/lib/api";
 import { formatCNIC, formatMobile, validateCNIC, validateMobile } from "@/lib/validation";
 
 export default function AddStudent() {
@@ -27,8 +27,8 @@ export default function AddStudent() {
 
     useEffect(() => {
         // Fetch Classes for Dropdown
-        api.get("/classes/").then(({ data }) => {
-            setClasses(data);
+        getReferenceData().then((data) => {
+            setClasses(data.classes);
             setLoadingClasses(false);
         }).catch(err => console.error("Failed to load classes", err));
     }, []);
@@ -18,7 +18,7 @@ export default function StudentList() {
 
     const fetchStudents = async () => {
         try {
-            const { data } = await api.get("/students/");
+            const { data } = await api.get("/students/?paginate=false&expand=active_enrollments");
             setStudents(data);
         } catch (error) {
             console.error("Failed to fetch students", error);
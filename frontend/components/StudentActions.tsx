@@ -3,7 +3,7 @@
 import { useState, useEffect } from "react";
 import { useRouter } from "next/navigation";
 import Modal from "@/components/Modal";
-import api, { Class, Student } from "@/lib/api";
+import api, { Class, Student, getReferenceData } from "@/lib/api";
 import { useAuth } from "@/lib/auth";
 import { formatCNIC, formatMobile, validateCNIC, validateMobile } from "@/lib/validation";
 
@@ -51,7 +51,7 @@ export default function StudentActions({ student, currentClassId }: StudentActio
 
     useEffect(() => {
         if ((showChangeClass || showEnroll) && classes.length === 0) {
-            api.get("/classes/").then(({ data }) => setClasses(data));
+            getReferenceData().then((data) => setClasses(data.classes));
         }
         if (showChangeClass) {
             // Default to passed currentClassId or first active enrollment
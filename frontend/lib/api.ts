@@ -82,10 +82,54 @@ export interface Enrollment {
 export interface Class {
     id: number;
     name: string;
+    campus?: number;
     campus_name: string;
+    program?: number;
     program_name: string;
     shift: string;
     capacity?: number;
+    active_count?: number;
 }
 
+export interface Campus {
+    id: number;
+    name: string;
+    location?: string;
+    capacity?: number;
+}
+
+export interface Program {
+    id: number;
+    name: string;
+    description?: string;
+}
+
+export interface ReferenceData {
+    version: string;
+    campuses: Campus[];
+    programs: Program[];
+    classes: Class[];
+}
+
+// Active campuses, programs and classes in one request. Kept for the life of
+// the page; the browser revalidates it with the ETag, so a reload costs a 304
+let referenceData: Promise<ReferenceData> | null = null;
+
+export function getReferenceData(refresh = false): Promise<ReferenceData> {
+    if (!referenceData || refresh) {
+        referenceData = api.get<ReferenceData>("/reference/").then(({ data }) => data);
+        referenceData.catch(() => { referenceData = null; });
+    }
+    return referenceData;
+}
+
+// Campus, program and class writes make the bundle stale
+api.interceptors.response.use((response) => {
+    const { method, url } = response.config;
+    if (method !== "get" && /^\/?(campuses|programs|classes)\//.test(url || "")) {
+        referenceData = null;
+    }
+    return response;
+});
+
 export default api;